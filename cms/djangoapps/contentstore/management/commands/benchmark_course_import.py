@@ -0,0 +1,155 @@
+"""
+Django management command to compare the time taken to import a large
+synthetic course archive with its static files imported before its blocks,
+one at a time, and with a pool of workers while its blocks are imported.
+"""
+
+
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from lxml import etree
+from opaque_keys.edx.locator import CourseLocator
+from PIL import Image
+
+from cms.djangoapps.contentstore.utils import delete_course
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+COURSE_DIR = 'course'
+
+
+def _write_xml(file_path, element):
+    """
+    Write an lxml element to file_path.
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as xml_file:
+        xml_file.write(etree.tostring(element, pretty_print=True))
+
+
+def make_course_archive(archive_path, num_chapters, num_html_blocks, num_images, num_files, file_size):
+    """
+    Write an OLX archive of a course with num_chapters chapters of 3 sequentials
+    of 3 verticals, num_html_blocks html blocks spread among the verticals,
+    num_images png images and num_files files of file_size random bytes.
+    """
+    root_dir = tempfile.mkdtemp()
+    try:
+        course_dir = os.path.join(root_dir, COURSE_DIR)
+        _write_xml(os.path.join(course_dir, 'course.xml'), etree.Element(
+            'course', url_name='course', org='edX', course='ImportBenchmark'
+        ))
+        course = etree.Element('course', display_name='Import Benchmark')
+        verticals = []
+        for chapter_index in range(num_chapters):
+            chapter = etree.SubElement(course, 'chapter', display_name='Chapter {}'.format(chapter_index))
+            for sequential_index in range(3):
+                sequential = etree.SubElement(chapter, 'sequential', display_name='Sequential {}'.format(
+                    sequential_index
+                ))
+                for vertical_index in range(3):
+                    verticals.append(etree.SubElement(sequential, 'vertical', display_name='Unit {}'.format(
+                        vertical_index
+                    )))
+        for html_index in range(num_html_blocks):
+            html = etree.SubElement(
+                verticals[html_index % len(verticals)], 'html', url_name='html_{}'.format(html_index)
+            )
+            etree.SubElement(html, 'p').text = 'Block {}'.format(html_index)
+            etree.SubElement(html, 'img', src='/static/image_{}.png'.format(html_index % max(num_images, 1)))
+        _write_xml(os.path.join(course_dir, 'course', 'course.xml'), course)
+
+        static_dir = _makedirs(course_dir, 'static')
+        for image_index in range(num_images):
+            image = Image.new('RGB', (640, 480), (image_index % 256, 64, 128))
+            image.save(os.path.join(static_dir, 'image_{}.png'.format(image_index)))
+        for file_index in range(num_files):
+            with open(os.path.join(static_dir, 'handout_{}.pdf'.format(file_index)), 'wb') as static_file:
+                static_file.write(os.urandom(file_size))
+
+        with tarfile.open(archive_path, 'w:gz') as archive:
+            archive.add(course_dir, arcname=COURSE_DIR)
+    finally:
+        shutil.rmtree(root_dir)
+
+
+def _makedirs(*path_parts):
+    """
+    Create the directory at the joined path_parts if needed, and return its path.
+    """
+    dir_path = os.path.join(*path_parts)
+    os.makedirs(dir_path, exist_ok=True)
+    return dir_path
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py cms benchmark_course_import --html-blocks 2000 --files 1000 --settings=devstack
+    """
+
+    help = 'Compares the time taken to import a synthetic course archive with each static import strategy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chapters', help='Number of chapters.', default=20, type=int)
+        parser.add_argument('--html-blocks', help='Number of html blocks.', default=1000, type=int)
+        parser.add_argument('--images', help='Number of png images.', default=200, type=int)
+        parser.add_argument('--files', help='Number of other static files.', default=500, type=int)
+        parser.add_argument('--file-size', help='Size of the other static files in bytes.', default=100000, type=int)
+        parser.add_argument('--workers', help='Number of static import workers.', default=4, type=int)
+
+    def handle(self, *args, **options):
+        work_dir = tempfile.mkdtemp()
+        try:
+            archive_path = os.path.join(work_dir, 'course.tar.gz')
+            make_course_archive(
+                archive_path, options['chapters'], options['html_blocks'], options['images'], options['files'],
+                options['file_size'],
+            )
+            self.stdout.write('{}: {:,d} bytes, {} html blocks, {} static files'.format(
+                archive_path, os.path.getsize(archive_path), options['html_blocks'],
+                options['images'] + options['files'],
+            ))
+
+            for name, workers in (('serial', 1), ('{} workers'.format(options['workers']), options['workers'])):
+                self._benchmark_import(name, archive_path, work_dir, workers)
+        finally:
+            shutil.rmtree(work_dir)
+
+    def _benchmark_import(self, name, archive_path, work_dir, workers):
+        """
+        Extract and import the course archive into a new course, and print the time taken.
+        """
+        course_key = CourseLocator('edX', 'ImportBenchmark', 'w{}_{}'.format(workers, int(time.time())))
+        data_dir = tempfile.mkdtemp(dir=work_dir)
+        progress = {}
+
+        def record_progress(stage, num_imported, total):
+            progress[stage] = (num_imported, total, time.time())
+
+        start = time.time()
+        with tarfile.open(archive_path) as archive:
+            archive.extractall(data_dir)
+        try:
+            import_course_from_xml(
+                modulestore(), ModuleStoreEnum.UserID.mgmt_command, data_dir, [COURSE_DIR],
+                load_error_modules=False, static_content_store=contentstore(), target_id=course_key,
+                create_if_not_present=True, static_import_workers=workers, progress_callback=record_progress,
+            )
+            seconds = time.time() - start
+            stages = ', '.join(
+                '{} {}/{} after {:.2f} s'.format(stage, num_imported, total, end - start)
+                for stage, (num_imported, total, end) in sorted(progress.items())
+            )
+            self.stdout.write('  {:<12} {:>8.2f} s ({})'.format(name, seconds, stages))
+        finally:
+            delete_course(course_key, ModuleStoreEnum.UserID.mgmt_command)
+            contentstore().delete_all_course_assets(course_key)
+            shutil.rmtree(data_dir)
@@ -18,6 +18,7 @@ from cms.djangoapps.contentstore.proctoring import register_special_exams
 from common.djangoapps.track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 from common.djangoapps.util.module_utils import yield_dynamic_descriptor_descendants
 from lms.djangoapps.grades.api import task_compute_all_grades_for_course
+from openedx.core.djangoapps.contentserver.caching import del_course_asset_index
 from openedx.core.djangoapps.credit.signals import on_course_publish
 from openedx.core.lib.gating import api as gating_api
 from xmodule.modulestore.django import SignalHandler, modulestore
@@ -63,6 +64,10 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     # to perform any 'on_publish' workflow
     on_course_publish(course_key)
 
+    # Course imports and reruns add assets without going through the asset views, which otherwise
+    # keep the asset index of the course used to rewrite static urls up to date.
+    del_course_asset_index(course_key)
+
     # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
     from cms.djangoapps.contentstore.tasks import update_outline_from_modulestore_task, update_search_index
     update_outline_from_modulestore_task.delay(str(course_key))
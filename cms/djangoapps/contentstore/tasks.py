@@ -9,7 +9,7 @@ import os
 import shutil
 import tarfile
 from datetime import datetime
-from tempfile import NamedTemporaryFile, mkdtemp
+from tempfile import NamedTemporaryFile
 
 from ccx_keys.locator import CCXLocator
 from celery import shared_task
@@ -50,7 +50,7 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar, export_library_to_tar
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 from .outlines import update_outline_from_modulestore
@@ -296,20 +296,20 @@ def create_export_tarball(course_module, course_key, context, status=None):
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        if status:
-            status.set_state('Compressing')
-            status.increment_completed_steps()
+        # The course is exported directly into the archive, which is compressed as it's written.
         LOGGER.debug('tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+        with tarfile.open(fileobj=export_file, mode='w:gz') as tar_file:
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_tar(modulestore(), contentstore(), course_key, tar_file, name)
+            else:
+                export_course_to_tar(modulestore(), contentstore(), course_module.id, tar_file, name)
+
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
+        export_file.seek(0)
 
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
@@ -342,9 +342,6 @@ def create_export_tarball(course_module, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
 
     return export_file
 
@@ -383,6 +380,24 @@ class CourseImportTask(UserTask):  # pylint: disable=abstract-method
         return f'Import of {key} from {filename}'
 
 
+def _import_progress_logger(courselike_key):
+    """
+    Return a progress_callback for the import of courselike_key, logging the
+    number of static files and blocks imported every 10%.
+    """
+    logged_tenths = {}
+
+    def log_progress(stage, num_imported, total):
+        """
+        Log the progress of a stage of the import if it reached the next 10%.
+        """
+        tenths = num_imported * 10 // total
+        if tenths > logged_tenths.get(stage, 0) or num_imported == 1:
+            logged_tenths[stage] = tenths
+            LOGGER.info('Course import %s: %s/%s %s imported', courselike_key, num_imported, total, stage)
+    return log_progress
+
+
 @shared_task(base=CourseImportTask, bind=True)
 # Note: The decorator @set_code_owner_attribute could not be used because  # lint-amnesty, pylint: disable=too-many-statements
 #   the implementation of this task breaks with any additional decorators.
@@ -531,7 +546,9 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             settings.GITHUB_REPO_ROOT, [dirpath],
             load_error_modules=False,
             static_content_store=contentstore(),
-            target_id=courselike_key
+            target_id=courselike_key,
+            static_import_workers=settings.COURSE_IMPORT_STATIC_CONTENT_WORKERS,
+            progress_callback=_import_progress_logger(courselike_key),
         )
 
         new_location = courselike_items[0].location
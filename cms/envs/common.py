@@ -152,6 +152,9 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Format in which block structures are serialized: 'zpickle' or 'columnar'.
+    SERIALIZATION_FORMAT='zpickle',
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -839,6 +842,19 @@ CONTENTSTORE = {
     'DOC_STORE_CONFIG': DOC_STORE_CONFIG
 }
 
+# .. setting_name: COURSE_ASSETS_DISK_CACHE
+# .. setting_default: {'DIRECTORY': None, 'MAX_BYTES': 10 * 1024 * 1024 * 1024, 'MIN_SIZE': 1024 * 1024}
+# .. setting_description: Node-local disk cache for course assets served by the contentserver. Assets of at
+#   least MIN_SIZE bytes are copied from the contentstore into DIRECTORY in the background the first time
+#   they are served, and served from there afterwards; the least recently served files are removed to keep
+#   the directory under MAX_BYTES. DIRECTORY can be shared by all the processes of a node. The cache is disabled when DIRECTORY
+#   is None.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_BYTES': 10 * 1024 * 1024 * 1024,
+    'MIN_SIZE': 1024 * 1024,
+}
+
 MODULESTORE_BRANCH = 'draft-preferred'
 
 MODULESTORE = {
@@ -939,6 +955,17 @@ CODE_JAIL = {
     # Keys should be course run ids.
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pools of warm sandbox workers, which run code that needs no files in
+    # the sandbox without starting a new sandboxed Python each time.
+    'pool': {
+        # Number of workers per limit overrides context. 0 disables pooling.
+        'size': 0,
+        # Number of workers for specific limit overrides contexts.
+        'size_overrides': {},
+        # Number of executions after which a worker is replaced.
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1055,6 +1082,13 @@ MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 COURSE_METADATA_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# .. setting_name: COURSE_IMPORT_STATIC_CONTENT_WORKERS
+# .. setting_default: 4
+# .. setting_description: Number of threads saving the static files of a course or library imported from an OLX
+#   archive into the contentstore, while its blocks are imported. Set to 1 to import the static files before
+#   the blocks, one at a time.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 4
+
 
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
@@ -1974,6 +2008,20 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES
+# .. setting_default: 64 * 1024 * 1024
+# .. setting_description: Maximum total serialized size of the split modulestore course structures kept in
+#   memory by each process, in front of the course_structure_cache. Structures are immutable by id, so
+#   they are only evicted to stay under this size, least recently used first. 0 disables this cache.
+COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES = 64 * 1024 * 1024
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_CODEC
+# .. setting_default: 'zpickle'
+# .. setting_description: Codec used to serialize split modulestore course structures in the
+#   course_structure_cache: 'zpickle', 'bson-zlib', or 'bson-lz4' if the lz4 package is installed. Each
+#   codec uses its own cache keys, so processes using different codecs can share the cache during a rollout.
+COURSE_STRUCTURE_CACHE_CODEC = 'zpickle'
+
 ############################ OAUTH2 Provider ###################################
 
 
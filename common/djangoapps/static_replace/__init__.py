@@ -2,6 +2,7 @@
 
 import logging
 import re
+from functools import lru_cache
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
@@ -13,6 +14,9 @@ from xmodule.contentstore.content import StaticContent
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# The most staticfiles_storage lookups remembered by each process.
+STATICFILES_URL_CACHE_MAX_ENTRIES = 10000
+
 
 def _url_replace_regex(prefix):
     """
@@ -29,6 +33,83 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@lru_cache(maxsize=1024)
+def _compiled_url_replace_regex(static_url=None, data_dir=None, course_urls=False, jump_to_id_urls=False):
+    """
+    Return the compiled _url_replace_regex matching, in a single scan, static urls
+    (unless static_url is None) that aren't in data_dir, /course/ urls and
+    /jump_to_id/ urls. The prefix of each kind of url is also captured in a group
+    named 'static', 'course' or 'jump_to_id'.
+    """
+    prefixes = []
+    if static_url is not None:
+        prefixes.append('(?P<static>(?:{static_url}|/static/)(?!{data_dir}))'.format(
+            static_url=static_url,
+            data_dir=data_dir
+        ))
+    if course_urls:
+        prefixes.append('(?P<course>/course/)')
+    if jump_to_id_urls:
+        prefixes.append('(?P<jump_to_id>/jump_to_id/)')
+    return re.compile(_url_replace_regex('|'.join(prefixes)))
+
+
+class _StaticfilesUrlCache(object):
+    """
+    Remembers the urls of the paths found in staticfiles_storage, and the paths
+    that aren't there, so that each is only looked up once per process.
+
+    Nothing is remembered in DEBUG mode, where static files can change.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._storage = None
+        self._static_url = None
+        self._urls = {}
+
+    def url(self, path, check_exists=True):
+        """
+        Return the url of `path` in staticfiles_storage, or None if `check_exists`
+        and it isn't there. Errors raised by the storage aren't remembered.
+        """
+        if settings.DEBUG:
+            return self._lookup(path, check_exists)
+
+        # The urls depend on the storage and on STATIC_URL, which tests can change.
+        if self._storage is not staticfiles_storage or self._static_url != settings.STATIC_URL:
+            self._storage = staticfiles_storage
+            self._static_url = settings.STATIC_URL
+            self._urls = {}
+        key = (path, check_exists)
+        try:
+            return self._urls[key]
+        except KeyError:
+            pass
+
+        url = self._lookup(path, check_exists)
+        if len(self._urls) >= self.max_entries:
+            self._urls = {}
+        self._urls[key] = url
+        return url
+
+    def clear(self):
+        """
+        Forget all the urls looked up so far.
+        """
+        self._urls = {}
+
+    def _lookup(self, path, check_exists):
+        """
+        Look `path` up in staticfiles_storage.
+        """
+        if check_exists and not staticfiles_storage.exists(path):
+            return None
+        return staticfiles_storage.url(path)
+
+
+STATICFILES_URL_CACHE = _StaticfilesUrlCache(STATICFILES_URL_CACHE_MAX_ENTRIES)
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -70,7 +151,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):  # lint-amnes
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex(jump_to_id_urls=True).sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -90,7 +171,19 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex(course_urls=True).sub(replace_course_url, text)
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Return whether `full_url` is a link to an XBlock resource, which shouldn't be rewritten.
+    """
+    # Probably wasn't a good idea that /static works for actual static assets and
+    # for magical course asset URLs....
+    starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -108,26 +201,13 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex('(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(str(settings.STATIC_URL), data_dir).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -147,6 +227,67 @@ def make_static_urls_absolute(request, html):
     )
 
 
+def _replace_static_url(original, prefix, quote, rest, data_directory, course_id, static_asset_path,
+                        static_paths_out):
+    """
+    Replace a single matched static url, see replace_static_urls.
+    """
+    original_uri = "".join([prefix, rest])
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        static_paths_out.append((original_uri, original_uri))
+        return original
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        static_paths_out.append((original_uri, original_uri))
+        return original
+
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        url = None
+        try:
+            url = STATICFILES_URL_CACHE.url(rest)
+        except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+            log.warning("staticfiles_storage couldn't find path {}: {}".format(
+                rest, str(err)))
+
+        if url is None:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            # Import is placed here to avoid model import at project startup.
+            from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+            from openedx.core.djangoapps.contentserver.caching import get_course_asset_index
+            base_url = AssetBaseUrlConfig.get_base_url()
+            excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+            url = StaticContent.get_canonicalized_asset_path(
+                course_id, rest, base_url, excluded_exts, asset_index=get_course_asset_index(course_id)
+            )
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            url = STATICFILES_URL_CACHE.url(rest)
+            if url is None:
+                url = STATICFILES_URL_CACHE.url(course_path, check_exists=False)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+            log.warning("staticfiles_storage couldn't find path {}: {}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    static_paths_out.append((original_uri, url))
+    return "".join([quote, url, quote])
+
+
 def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path='', static_paths_out=None):
     """
     Replace /static/$stuff urls either with their correct url as generated by collectstatic,
@@ -170,59 +311,51 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         """
         Replace a single matched url.
         """
-        original_uri = "".join([prefix, rest])
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+        return _replace_static_url(
+            original, prefix, quote, rest, data_directory, course_id, static_asset_path, static_paths_out
+        )
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
-                log.warning("staticfiles_storage couldn't find path {}: {}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
-
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
-                log.warning("staticfiles_storage couldn't find path {}: {}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
-
-        static_paths_out.append((original_uri, url))
-        return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None,
+                 static_paths_out=None):
+    """
+    Apply replace_static_urls, then replace_course_urls if course_id is given and
+    replace_jump_to_id_urls if jump_to_id_base_url is given, in a single scan of `text`.
+
+    The arguments are those of these functions.
+    """
+    if static_paths_out is None:
+        static_paths_out = []
+
+    course_url_base = '/courses/{}/'.format(course_id)
+
+    def replace_url(match):
+        """
+        Replace a single matched url of any kind.
+        """
+        original = match.group(0)
+        quote = match.group('quote')
+        rest = match.group('rest')
+        groups = match.groupdict()
+
+        if groups.get('course') is not None:
+            return "".join([quote, course_url_base, rest, quote])
+        if groups.get('jump_to_id') is not None:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+
+        prefix = match.group('prefix')
+        if _is_xblock_resource_url(prefix + rest):
+            return original
+        return _replace_static_url(
+            original, prefix, quote, rest, data_directory, course_id, static_asset_path, static_paths_out
+        )
+
+    regex = _compiled_url_replace_regex(
+        str(settings.STATIC_URL),
+        static_asset_path or data_directory,
+        course_urls=course_id is not None,
+        jump_to_id_urls=jump_to_id_base_url is not None,
+    )
+    return regex.sub(replace_url, text)
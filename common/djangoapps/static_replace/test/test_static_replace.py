@@ -14,11 +14,20 @@ from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 
 from common.djangoapps.static_replace import (
+    STATICFILES_URL_CACHE,
+    _compiled_url_replace_regex,
     _url_replace_regex,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
+)
+from openedx.core.djangoapps.contentserver.caching import (
+    del_cached_content,
+    del_course_asset_index,
+    get_course_asset_index
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -114,12 +123,15 @@ def test_storage_url_not_exists(mock_storage):
 @patch('xmodule.modulestore.django.modulestore', autospec=True)
 @patch('common.djangoapps.static_replace.models.AssetBaseUrlConfig.get_base_url')
 @patch('common.djangoapps.static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
-def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_static_content):
+@patch('openedx.core.djangoapps.contentserver.caching.get_course_asset_index')
+def test_mongo_filestore(mock_get_course_asset_index, mock_get_excluded_extensions, mock_get_base_url,
+                         mock_modulestore, mock_static_content):
 
     mock_modulestore.return_value = Mock(MongoModuleStore)
     mock_static_content.get_canonicalized_asset_path.return_value = "c4x://mock_url"
     mock_get_base_url.return_value = ''
     mock_get_excluded_extensions.return_value = ['foobar']
+    mock_get_course_asset_index.return_value = {'file.png': (False, None)}
 
     # No namespace => no change to path
     assert replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY) == '"/static/data_dir/file.png"'
@@ -128,7 +140,10 @@ def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_m
     assert '"' + mock_static_content.get_canonicalized_asset_path.return_value + '"' == \
         replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, course_id=COURSE_KEY)
 
-    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', '', ['foobar'])
+    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(
+        COURSE_KEY, 'file.png', '', ['foobar'], asset_index={'file.png': (False, None)}
+    )
+    mock_get_course_asset_index.assert_called_once_with(COURSE_KEY)
 
 
 @patch('common.djangoapps.static_replace.settings', autospec=True)
@@ -251,6 +266,71 @@ def test_static_url_with_xblock_resource_on_cdn(mock_modulestore, mock_storage):
     assert replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY) == post_text
 
 
+@patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
+def test_staticfiles_lookups_remembered(mock_storage):
+    mock_storage.exists.side_effect = lambda path: path == 'file.png'
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    text = '"/static/file.png" "/static/other.png" "/static/file.png"'
+
+    for __ in range(2):
+        assert replace_static_urls(text, DATA_DIRECTORY) == \
+            '"/static/hashed/file.png" "/static/hashed/data_dir/other.png" "/static/hashed/file.png"'
+    assert mock_storage.exists.call_count == 2
+    assert mock_storage.url.call_count == 2
+
+    STATICFILES_URL_CACHE.clear()
+    replace_static_urls(text, DATA_DIRECTORY)
+    assert mock_storage.exists.call_count == 4
+
+
+def test_compiled_regex_reused():
+    assert _compiled_url_replace_regex('/static/', DATA_DIRECTORY, True, True) is \
+        _compiled_url_replace_regex('/static/', DATA_DIRECTORY, True, True)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('options', [
+    {},
+    {'course_id': COURSE_KEY},
+    {'course_id': COURSE_KEY, 'jump_to_id_base_url': '/courses/org/course/run/jump_to_id/'},
+    {'static_asset_path': 'static_asset_path', 'jump_to_id_base_url': '/courses/org/course/run/jump_to_id/'},
+])
+@patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
+@patch('xmodule.modulestore.django.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage, options):
+    """
+    Make sure that replace_urls rewrites html like the separate url rewriting functions.
+    """
+    mock_storage.exists.return_value = False
+    mock_storage.url.side_effect = lambda path: '/static/' + path
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+
+    # xss-lint: disable=python-wrap-html
+    text = (
+        '<img src="/static/file.png"/><a href="/course/info">Info</a>'
+        '<a href=\'/jump_to_id/block_id\'>Next</a><a href="/static/raw.txt?raw">Raw</a>'
+        '<img src="/static/xblock/resources/some.xblock/public/image.png"/>'
+    )
+    course_id = options.get('course_id')
+    jump_to_id_base_url = options.get('jump_to_id_base_url')
+    static_asset_path = options.get('static_asset_path', '')
+
+    expected_static_paths = []
+    expected = replace_static_urls(
+        text, DATA_DIRECTORY, course_id, static_asset_path, static_paths_out=expected_static_paths
+    )
+    if course_id is not None:
+        expected = replace_course_urls(expected, course_id)
+    if jump_to_id_base_url is not None:
+        expected = replace_jump_to_id_urls(expected, course_id, jump_to_id_base_url)
+
+    static_paths = []
+    assert replace_urls(
+        text, DATA_DIRECTORY, course_id, static_asset_path, jump_to_id_base_url, static_paths_out=static_paths
+    ) == expected
+    assert static_paths == expected_static_paths
+
+
 @ddt.ddt
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
@@ -784,3 +864,46 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
         with check_mongo_calls(mongo_calls):
             asset_path = StaticContent.get_canonicalized_asset_path(self.courses[prefix].id, start, base_url, exts)
             assert re.match(expected, asset_path) is not None
+
+    @ddt.data('split', 'old')
+    def test_canonical_asset_path_with_asset_index(self, prefix):
+        course_key = self.courses[prefix].id
+        paths = [
+            name.format(prefix, prefix) for name in (
+                '{}_ünlöck.png', '/{}_lock.png', 'special/weird {}_ünlöck.png', '{}_excluded.html',
+                '/{}_not_excluded.htm', 'missing_{}.png', '/{}_ünlöck.png?config=/static/{}_lock.png',
+            )
+        ]
+        store = contentstore()
+        del_course_asset_index(course_key)
+        with patch.object(store, 'get_all_content_for_course', wraps=store.get_all_content_for_course) as mock_get_all:
+            asset_index = get_course_asset_index(course_key)
+            assert get_course_asset_index(course_key) is asset_index
+        assert mock_get_all.call_count == 1
+
+        for base_url in ('', 'dev'):
+            for path in paths:
+                expected = StaticContent.get_canonicalized_asset_path(course_key, path, base_url, ['.html'])
+                with check_mongo_calls(0):
+                    asset_path = StaticContent.get_canonicalized_asset_path(
+                        course_key, path, base_url, ['.html'], asset_index=asset_index
+                    )
+                assert asset_path == expected
+
+    def test_asset_index_invalidated(self):
+        course_key = self.courses['split'].id
+        del_course_asset_index(course_key)
+        assert 'index_invalidated.png' not in get_course_asset_index(course_key)
+
+        content = self.create_arbitrary_content('split', 'index_invalidated.png')
+        content_digest = AssetManager.find(content.location, as_stream=True).content_digest
+        del_cached_content(content.location)
+        assert get_course_asset_index(course_key)['index_invalidated.png'] == (False, content_digest)
+
+        contentstore().set_attr(content.location, 'locked', True)
+        del_cached_content(content.location)
+        assert get_course_asset_index(course_key)['index_invalidated.png'] == (True, content_digest)
+
+        contentstore().delete(content.get_id())
+        del_cached_content(content.location)
+        assert 'index_invalidated.png' not in get_course_asset_index(course_key)
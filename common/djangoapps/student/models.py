@@ -254,6 +254,28 @@ def anonymous_id_for_user(user, course_id, save='DEPRECATED'):
     return anonymous_user_id
 
 
+def prefetch_anonymous_ids_for_users(users, course_id):
+    """
+    Caches the stored anonymous ids of the given users for the given course
+    on the user objects, using a single query, so that subsequent calls to
+    anonymous_id_for_user for these users and course don't query the database.
+
+    Users without a stored anonymous id for the course are left untouched.
+    """
+    users_by_id = {user.id: user for user in users if not user.is_anonymous}
+    anonymous_user_ids = AnonymousUserId.objects.filter(
+        user_id__in=list(users_by_id), course_id=course_id,
+    ).order_by('id').values_list('user_id', 'anonymous_user_id')
+
+    # As in anonymous_id_for_user, prefer the most recently created id,
+    # which is the last one seen here.
+    for user_id, anonymous_user_id in anonymous_user_ids:
+        user = users_by_id[user_id]
+        if not hasattr(user, '_anonymous_id'):
+            user._anonymous_id = {}  # pylint: disable=protected-access
+        user._anonymous_id[course_id] = anonymous_user_id  # pylint: disable=protected-access
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -0,0 +1,229 @@
+"""
+Event tracker backend that sends events to another backend from a background thread.
+
+Serializing an event and writing it to a log or a database is done on the
+thread emitting the event by the other backends.  Wrapping a backend with
+:class:`AsyncBackend` moves this work to a background thread, which sends the
+queued events in batches, e.g.::
+
+  TRACKING_BACKENDS = {
+      'logger': {
+          'ENGINE': 'common.djangoapps.track.backends.asynchronous.AsyncBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'common.djangoapps.track.backends.logger.LoggerBackend',
+                  'OPTIONS': {'name': 'tracking'},
+              },
+              'max_queue_size': 10000,
+          }
+      }
+  }
+
+The wrapped backend can be any backend with a ``send`` method, including the
+eventtracking backends of ``EVENT_TRACKING_BACKENDS``.  Backends with a
+``send_batch`` method, like :class:`~common.djangoapps.track.backends.mongodb.MongoBackend`,
+are sent whole batches.
+
+The queue is bounded: when it's full, events are dropped rather than blocking
+the requests emitting them.  The queued events are sent by
+:func:`close_all_backends` when the process exits, including celery pool
+processes, which exit without running ``atexit`` handlers, and gunicorn
+workers, through the ``worker_exit`` server hook.  A process forked from one
+with queued events starts with an empty queue and its own background thread,
+and leaves the events to its parent.
+"""
+
+
+import atexit
+import logging
+import os
+import threading
+import weakref
+from queue import Empty, Full, Queue
+
+from celery.signals import worker_process_shutdown
+from django.utils.module_loading import import_string
+
+from common.djangoapps.track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Only every DROPPED_EVENTS_LOG_INTERVAL-th dropped event is logged.
+DROPPED_EVENTS_LOG_INTERVAL = 1000
+
+_STOP = object()
+
+# The backends of this process, to reset after a fork and to close on exit.
+_BACKENDS = weakref.WeakSet()
+
+
+def close_all_backends(**kwargs):  # pylint: disable=unused-argument
+    """
+    Send the queued events of all the backends of this process, and stop
+    their background threads.
+    """
+    for backend in list(_BACKENDS):
+        backend.close()
+
+
+def _reset_backends_after_fork():
+    """
+    Give the backends of a forked process a new lock and queue, as the
+    background thread holding them wasn't forked.
+    """
+    for backend in list(_BACKENDS):
+        backend._reset()  # pylint: disable=protected-access
+
+
+atexit.register(close_all_backends)
+worker_process_shutdown.connect(close_all_backends, weak=False)
+os.register_at_fork(after_in_child=_reset_backends_after_fork)
+
+
+class AsyncBackend(BaseBackend):
+    """
+    Event tracker backend that queues the events, and sends them to another
+    backend in batches from a background thread.
+    """
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, **kwargs):
+        """
+        :Parameters:
+          - `backend`: the configuration of the wrapped backend, a dict
+            with an ``ENGINE`` and optional ``OPTIONS``
+          - `max_queue_size`: the most events waiting to be sent, events
+            sent when the queue is full are dropped
+          - `batch_size`: the most events sent to the wrapped backend at once,
+            the events queued while a batch is sent are sent in the next one
+        """
+        super(AsyncBackend, self).__init__(**kwargs)  # lint-amnesty, pylint: disable=super-with-arguments
+
+        self.backend = import_string(backend['ENGINE'])(**backend.get('OPTIONS', {}))
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+
+        self._stats = {'queued': 0, 'sent': 0, 'dropped': 0, 'batches': 0, 'errors': 0}
+        self._reset()
+        _BACKENDS.add(self)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        event_queue = self._get_queue()
+        try:
+            event_queue.put_nowait(event)
+        except Full:
+            dropped = self._increment('dropped')
+            if dropped % DROPPED_EVENTS_LOG_INTERVAL == 1:
+                log.warning('Event tracker queue is full, %d events dropped so far', dropped)
+        else:
+            self._increment('queued')
+
+    def close(self, timeout=10):
+        """
+        Send the queued events and stop the background thread, waiting at most
+        `timeout` seconds for it.
+        """
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is None:
+            return
+        # The stop marker is queued after the events, waiting if the queue is full.
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except Full:
+            pass
+        worker.join(timeout)
+        if worker.is_alive():
+            log.warning('Event tracker queue not flushed after %s seconds, %d events left', timeout, self.queue_depth)
+
+    @property
+    def queue_depth(self):
+        """The number of events waiting to be sent."""
+        event_queue = self._queue
+        return event_queue.qsize() if event_queue is not None else 0
+
+    def stats(self):
+        """
+        Return the number of events queued, sent to the wrapped backend and
+        dropped, of batches sent and of errors raised by the wrapped backend
+        in this process, and the current queue depth.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self.queue_depth
+        return stats
+
+    def _reset(self):
+        """
+        Forget the queue and background thread, which are created again by the
+        next event sent.
+        """
+        self._lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+
+    def _get_queue(self):
+        """
+        Return the queue of events, starting the background thread if it isn't
+        running.
+        """
+        if self._worker is not None:
+            return self._queue
+        with self._lock:
+            if self._worker is None:
+                self._queue = Queue(self.max_queue_size)
+                self._worker = threading.Thread(
+                    target=self._run, args=(self._queue,), name='event-tracker-worker', daemon=True
+                )
+                self._worker.start()
+            return self._queue
+
+    def _run(self, event_queue):
+        """
+        Send the events of `event_queue` in batches until the stop marker is found.
+        """
+        stopping = False
+        while not stopping:
+            batch = []
+            event = event_queue.get()
+            try:
+                while event is not _STOP:
+                    batch.append(event)
+                    if len(batch) == self.batch_size:
+                        break
+                    event = event_queue.get_nowait()
+            except Empty:
+                pass
+            stopping = event is _STOP
+            if batch:
+                self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        """
+        Send a batch of events to the wrapped backend.
+        """
+        send_batch = getattr(self.backend, 'send_batch', None)
+        if send_batch is not None:
+            self._send(send_batch, batch, len(batch))
+        else:
+            for event in batch:
+                self._send(self.backend.send, event, 1)
+        self._increment('batches')
+
+    def _send(self, send, events, num_events):
+        """
+        Send events with the given method of the wrapped backend, logging its errors.
+        """
+        try:
+            send(events)
+        except Exception:  # pylint: disable=broad-except
+            self._increment('errors')
+            log.exception('Error sending %d events to the event tracker backend', num_events)
+        else:
+            self._increment('sent', num_events)
+
+    def _increment(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+            return self._stats[name]
@@ -1,13 +1,12 @@
 """Event tracker backend that saves events to a python logger."""
 
 
-import json
 import logging
 
 from django.conf import settings
 
 from common.djangoapps.track.backends import BaseBackend
-from common.djangoapps.track.utils import DateTimeJSONEncoder
+from common.djangoapps.track.utils import encode_event
 
 log = logging.getLogger('common.djangoapps.track.backends.logger')
 application_log = logging.getLogger('common.djangoapps.track.backends.application_log')  # pylint: disable=invalid-name
@@ -33,17 +32,15 @@ class LoggerBackend(BaseBackend):
         self.event_logger = logging.getLogger(name)
 
     def send(self, event):
+        # TODO: remove trucation of the serialized event, either at a
+        # higher level during the emittion of the event, or by
+        # providing warnings when the events exceed certain size.
         try:
-            event_str = json.dumps(event, cls=DateTimeJSONEncoder)
+            event_str = encode_event(event, settings.TRACK_MAX_EVENT)
         except UnicodeDecodeError:
             application_log.exception(
                 "UnicodeDecodeError Event_data: %r", event
             )
             raise
 
-        # TODO: remove trucation of the serialized event, either at a
-        # higher level during the emittion of the event, or by
-        # providing warnings when the events exceed certain size.
-        event_str = event_str[:settings.TRACK_MAX_EVENT]
-
         self.event_logger.info(event_str)
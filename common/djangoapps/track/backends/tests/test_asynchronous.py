@@ -0,0 +1,160 @@
+"""Tests for the asynchronous event tracker backend."""
+
+
+import json
+import os
+import threading
+
+from celery.signals import worker_process_shutdown
+from django.test import TestCase
+
+from common.djangoapps.track.backends import BaseBackend
+from common.djangoapps.track.backends.asynchronous import AsyncBackend
+
+RECORDING_BACKEND = 'common.djangoapps.track.backends.tests.test_asynchronous.RecordingBackend'
+BATCH_RECORDING_BACKEND = 'common.djangoapps.track.backends.tests.test_asynchronous.BatchRecordingBackend'
+
+
+class RecordingBackend(BaseBackend):
+    """
+    Backend recording the events sent to it, which waits for `release` to be set
+    before sending them, and fails to send the events equal to `fail`.
+    """
+    def __init__(self, fail=None, **kwargs):
+        super(RecordingBackend, self).__init__(**kwargs)  # lint-amnesty, pylint: disable=super-with-arguments
+        self.fail = fail
+        self.events = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def send(self, event):
+        self.release.wait()
+        if event == self.fail:
+            raise ValueError(event)
+        self.events.append(event)
+
+
+class BatchRecordingBackend(RecordingBackend):
+    """
+    Backend recording the batches of events sent to it.
+    """
+    def __init__(self, **kwargs):
+        super(BatchRecordingBackend, self).__init__(**kwargs)  # lint-amnesty, pylint: disable=super-with-arguments
+        self.batches = []
+
+    def send_batch(self, events):
+        self.release.wait()
+        self.batches.append(list(events))
+
+
+class TestAsyncBackend(TestCase):
+    """
+    Tests for AsyncBackend.
+    """
+
+    def make_backend(self, engine=RECORDING_BACKEND, options=None, **kwargs):
+        """
+        Return an AsyncBackend wrapping a backend, which is closed at the end of the test.
+        """
+        backend = AsyncBackend(backend={'ENGINE': engine, 'OPTIONS': options or {}}, **kwargs)
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_events_sent_on_close(self):
+        backend = self.make_backend()
+        events = [{'test': i} for i in range(50)]
+        for event in events:
+            backend.send(event)
+        backend.close()
+
+        assert backend.backend.events == events
+        stats = backend.stats()
+        assert (stats['queued'], stats['sent'], stats['dropped'], stats['queue_depth']) == (50, 50, 0, 0)
+
+    def test_events_sent_in_batches(self):
+        backend = self.make_backend(BATCH_RECORDING_BACKEND, batch_size=4)
+        backend.backend.release.clear()
+        self.addCleanup(backend.backend.release.set)
+        backend.send({'test': 0})
+        for i in range(1, 10):
+            backend.send({'test': i})
+        backend.backend.release.set()
+        backend.close()
+
+        batches = backend.backend.batches
+        assert [event for batch in batches for event in batch] == [{'test': i} for i in range(10)]
+        assert max(len(batch) for batch in batches) == 4
+        assert backend.stats()['batches'] == len(batches)
+
+    def test_events_dropped_when_queue_full(self):
+        backend = self.make_backend(max_queue_size=5, batch_size=1)
+        backend.backend.release.clear()
+        self.addCleanup(backend.backend.release.set)
+        for i in range(20):
+            backend.send({'test': i})
+        stats = backend.stats()
+        # The worker may have taken an event from the queue before blocking.
+        assert stats['dropped'] in (14, 15)
+        assert stats['queued'] + stats['dropped'] == 20
+
+        backend.backend.release.set()
+        backend.close()
+        assert len(backend.backend.events) == backend.stats()['queued']
+
+    def test_errors_not_stopping_worker(self):
+        backend = self.make_backend(options={'fail': {'test': 1}})
+        for i in range(3):
+            backend.send({'test': i})
+        backend.close()
+
+        assert backend.backend.events == [{'test': 0}, {'test': 2}]
+        stats = backend.stats()
+        assert (stats['sent'], stats['errors']) == (2, 1)
+
+    def test_send_after_close(self):
+        backend = self.make_backend()
+        backend.send({'test': 0})
+        backend.close()
+        backend.send({'test': 1})
+        backend.close()
+
+        assert backend.backend.events == [{'test': 0}, {'test': 1}]
+
+    def test_events_sent_on_worker_process_shutdown(self):
+        backend = self.make_backend()
+        backend.send({'test': 0})
+        worker_process_shutdown.send(sender=None, pid=os.getpid(), exitcode=0)
+
+        assert backend.backend.events == [{'test': 0}]
+        assert backend.stats()['queue_depth'] == 0
+
+    def test_fork(self):
+        backend = self.make_backend()
+        backend.backend.release.clear()
+        self.addCleanup(backend.backend.release.set)
+        for i in range(3):
+            backend.send({'test': i})
+
+        # Fork while the lock is held, as the background thread of the parent may do.
+        read_fd, write_fd = os.pipe()
+        with backend._lock:  # pylint: disable=protected-access
+            pid = os.fork()
+        if pid == 0:
+            try:
+                os.close(read_fd)
+                backend.backend.release.set()
+                backend.send({'test': 'child'})
+                backend.close(timeout=5)
+                os.write(write_fd, json.dumps(backend.backend.events).encode('utf-8'))
+            finally:
+                os._exit(0)  # pylint: disable=protected-access
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as child_output:
+            child_events = json.loads(child_output.read().decode('utf-8') or 'null')
+        os.waitpid(pid, 0)
+
+        # The child sent its own events, and left the queued events to the parent.
+        assert child_events == [{'test': 'child'}]
+        backend.backend.release.set()
+        backend.close()
+        assert backend.backend.events == [{'test': i} for i in range(3)]
@@ -36,3 +36,11 @@ class TestMongoBackend(TestCase):  # lint-amnesty, pylint: disable=missing-class
 
         assert events[0] == first_argument(calls[0])
         assert events[1] == first_argument(calls[1])
+
+    def test_mongo_backend_batch(self):
+        events = [{'test': 1}, {'test': 2}]
+
+        self.backend.send_batch(events)
+
+        self.backend.collection.insert_many.assert_called_once_with(events, ordered=False)
+        assert self.backend.collection.insert_many.call_args[0][0][0] is not events[0]
@@ -0,0 +1,213 @@
+"""
+Django management command to compare the time taken to process and serialize
+a corpus of representative courseware events with the previous serialization
+of the logger backend and with encode_event.
+"""
+
+
+import copy
+import json
+import timeit
+from datetime import datetime
+from uuid import UUID
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.djangoapps.track.shim import LegacyFieldMappingProcessor
+from common.djangoapps.track.utils import DateTimeJSONEncoder, encode_event
+
+COURSE_ID = 'course-v1:edX+DemoX+Demo_Course'
+PROBLEM_ID = 'block-v1:edX+DemoX+Demo_Course+type@problem+block@d1b84dcd39b0423d9e288f27f0f7f242'
+VIDEO_ID = 'block-v1:edX+DemoX+Demo_Course+type@video+block@0b9e39477cf34507a7a48f74be381fdd'
+
+
+def _context(path, **extra):
+    """
+    Return the context of an event emitted by a request to `path`.
+    """
+    context = {
+        'course_id': COURSE_ID,
+        'org_id': 'edX',
+        'user_id': 42,
+        'path': path,
+        'username': 'learner',
+        'session': 'c84b50f2ae5ac1ee3c57e53b77c8a3b3',
+        'ip': '203.0.113.7',
+        'agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0 Safari/537.36',
+        'host': 'courses.example.com',
+        'referer': 'https://courses.example.com/courses/{}/courseware/'.format(COURSE_ID),
+        'accept_language': 'en-US,en;q=0.9',
+        'client_id': '1234567890.1234567890',
+        'timestamp': datetime(2021, 3, 1, 12, 30, 15, 123456),
+    }
+    context.update(extra)
+    return context
+
+
+def _problem_check(num_inputs):
+    """
+    Return a problem_check server event of a problem with `num_inputs` inputs.
+    """
+    input_ids = ['{}_{}_1'.format(PROBLEM_ID.split('@')[-1], index + 2) for index in range(num_inputs)]
+    return {
+        'name': 'problem_check',
+        'context': _context(
+            '/courses/{}/xblock/{}/handler/xmodule_handler/problem_check'.format(COURSE_ID, PROBLEM_ID),
+            module={'display_name': 'Multiple Choice Questions', 'usage_key': PROBLEM_ID},
+            asides={},
+        ),
+        'data': {
+            'state': {
+                'seed': 1,
+                'done': True,
+                'student_answers': {input_id: 'choice_{}'.format(index) for index, input_id in enumerate(input_ids)},
+                'correct_map': {
+                    input_id: {
+                        'correctness': 'correct', 'npoints': None, 'msg': '', 'hint': '', 'hintmode': None,
+                        'queuestate': None, 'answervariable': None,
+                    }
+                    for input_id in input_ids
+                },
+                'input_state': {input_id: {} for input_id in input_ids},
+            },
+            'problem_id': PROBLEM_ID,
+            'answers': {input_id: 'choice_1' for input_id in input_ids},
+            'grade': num_inputs,
+            'max_grade': num_inputs,
+            'correct_map': {input_id: {'correctness': 'correct', 'npoints': None} for input_id in input_ids},
+            'success': 'correct',
+            'attempts': 1,
+            'submission': {
+                input_id: {
+                    'question': 'Which of the following countries has the largest population? ' * 2,
+                    'answer': 'Indonesia',
+                    'response_type': 'multiplechoiceresponse',
+                    'input_type': 'choicegroup',
+                    'correct': True,
+                    'variant': '',
+                    'group_label': '',
+                }
+                for input_id in input_ids
+            },
+        },
+    }
+
+
+def _play_video():
+    """
+    Return a play_video browser event.
+    """
+    return {
+        'name': 'play_video',
+        'context': _context('/event', event_source='browser', page='https://courses.example.com/courseware/'),
+        'data': {'id': VIDEO_ID.split('@')[-1], 'currentTime': 31.5, 'code': 'html5', 'duration': 195.0},
+    }
+
+
+def _seq_goto():
+    """
+    Return a seq_goto browser event.
+    """
+    return {
+        'name': 'seq_goto',
+        'context': _context('/event', event_source='browser'),
+        'data': {'old': 1, 'new': 3, 'id': 'block-v1:edX+DemoX+Demo_Course+type@sequential+block@basic_questions'},
+    }
+
+
+def _enrollment_activated():
+    """
+    Return an edx.course.enrollment.activated server event.
+    """
+    return {
+        'name': 'edx.course.enrollment.activated',
+        'context': _context('/api/enrollment/v1/enrollment'),
+        'data': {'course_id': COURSE_ID, 'user_id': 42, 'mode': 'audit'},
+    }
+
+
+def _grade_calculated():
+    """
+    Return an edx.grades.course.grade_calculated server event.
+    """
+    return {
+        'name': 'edx.grades.course.grade_calculated',
+        'context': _context('/courses/{}/progress'.format(COURSE_ID)),
+        'data': {
+            'user_id': 42,
+            'course_id': COURSE_ID,
+            'course_version': '5fc8f4a2e2ae7c0cbd6cbf22',
+            'course_edited_timestamp': '2021-02-26 10:22:47.318000+00:00',
+            'event_transaction_id': str(UUID('0b4d1c52-a9d1-4b52-b3c9-5d9d3d9c1cd2')),
+            'event_transaction_type': 'edx.grades.problem.submitted',
+            'percent_grade': 0.37,
+            'letter_grade': '',
+            'grading_policy_hash': 'cuBp7IC2JKd6eH8ycDAAaNkrXjM=',
+        },
+    }
+
+
+CORPUS = {
+    'problem_check (3 inputs)': _problem_check(3),
+    'problem_check (40 inputs)': _problem_check(40),
+    'play_video': _play_video(),
+    'seq_goto': _seq_goto(),
+    'enrollment.activated': _enrollment_activated(),
+    'grade_calculated': _grade_calculated(),
+}
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_event_encoding --settings=devstack
+    """
+
+    help = 'Compares the time taken to process and serialize representative courseware events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            help='Number of times each event is processed and serialized.',
+            default=2000,
+            type=int,
+        )
+        parser.add_argument(
+            '--max-event',
+            help='Length the serialized events are truncated to, TRACK_MAX_EVENT by default.',
+            default=None,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        max_event = options['max_event'] or settings.TRACK_MAX_EVENT
+        processor = LegacyFieldMappingProcessor()
+
+        def previous_encoding(event):
+            return json.dumps(event, cls=DateTimeJSONEncoder)[:max_event]
+
+        def microseconds(function, events, repeat=5):
+            return min(timeit.repeat(lambda: [function(event) for event in events], number=1, repeat=repeat)) * 1e6
+
+        self.stdout.write('{:<28} {:>8} {:>12} {:>12} {:>12}'.format(
+            'event', 'length', 'shim', 'json.dumps', 'encode_event'
+        ))
+        for name, raw_event in CORPUS.items():
+            event = copy.deepcopy(raw_event)
+            processor(event)
+            if previous_encoding(event) != encode_event(event, max_event):
+                raise CommandError('The {} event was serialized differently'.format(name))
+
+            # The processor changes the events, so each copy is only processed once.
+            copies = [copy.deepcopy(raw_event) for __ in range(iterations)]
+            shim_microseconds = microseconds(processor, copies, repeat=1)
+            events = [event] * iterations
+            self.stdout.write('{:<28} {:>8,d} {:>10.2f}us {:>10.2f}us {:>10.2f}us'.format(
+                name,
+                len(encode_event(event)),
+                shim_microseconds / iterations,
+                microseconds(previous_encoding, events) / iterations,
+                microseconds(lambda event: encode_event(event, max_event), events) / iterations,
+            ))
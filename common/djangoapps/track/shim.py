@@ -15,6 +15,10 @@ CONTEXT_FIELDS_TO_INCLUDE = [
     'accept_language'
 ]
 
+# These fields are present elsewhere in the event once the context fields are moved,
+# and client_id is only used for Segment web analytics and does not concern researchers.
+CONTEXT_FIELDS_TO_REMOVE = frozenset(CONTEXT_FIELDS_TO_INCLUDE + ['client_id'])
+
 
 class LegacyFieldMappingProcessor(object):
     """Ensures all required fields are included in emitted events"""
@@ -50,27 +54,18 @@ class LegacyFieldMappingProcessor(object):
 
     def move_from_context(self, field, event, default_value=''):
         """Move a field from the context to the top level of the event."""
-        context = event.get('context', {})
-        if field in context:
-            event[field] = context[field]
-            del context[field]
-        else:
-            event[field] = default_value
+        context = event.get('context')
+        event[field] = context.pop(field, default_value) if context is not None else default_value
 
 
 def remove_shim_context(event):
     """
     Remove obsolete fields from event context.
     """
-    if 'context' in event:
-        context = event['context']
-        # These fields are present elsewhere in the event at this point
-        context_fields_to_remove = set(CONTEXT_FIELDS_TO_INCLUDE)
-        # This field is only used for Segment web analytics and does not concern researchers
-        context_fields_to_remove.add('client_id')
-        for field in context_fields_to_remove:
-            if field in context:
-                del context[field]
+    context = event.get('context')
+    if context is not None:
+        for field in CONTEXT_FIELDS_TO_REMOVE.intersection(context):
+            del context[field]
 
 
 class GoogleAnalyticsProcessor(object):
@@ -1,12 +1,14 @@
 # lint-amnesty, pylint: disable=missing-module-docstring
 
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
 
 from django.test import TestCase
+from opaque_keys.edx.keys import CourseKey
 from pytz import UTC
 
-from common.djangoapps.track.utils import DateTimeJSONEncoder
+from common.djangoapps.track.utils import DateTimeJSONEncoder, EventJSONEncoder, encode_event
 
 
 class TestDateTimeJSONEncoder(TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -36,3 +38,47 @@ class TestDateTimeJSONEncoder(TestCase):  # lint-amnesty, pylint: disable=missin
         assert from_json['a_datetime'] == an_iso_datetime
         assert from_json['a_tz_datetime'] == an_iso_datetime
         assert from_json['a_date'] == an_iso_date
+
+
+class TestEventJSONEncoder(TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
+    def test_encoding(self):
+        course_key = CourseKey.from_string('course-v1:edX+DemoX+Demo_Course')
+        obj = {
+            'a_datetime': datetime(2012, 5, 1, 7, 27, 10, 20000),
+            'a_tz_datetime': datetime(2012, 5, 1, 9, 27, 10, 20000, tzinfo=timezone(timedelta(hours=2))),
+            'a_date': datetime(2012, 5, 1).date(),
+            'a_uuid': UUID('0b4d1c52-a9d1-4b52-b3c9-5d9d3d9c1cd2'),
+            'a_course_key': course_key,
+            'a_usage_key': course_key.make_usage_key('problem', 'abc'),
+            'a_list': [1, 'two', None],
+        }
+
+        from_json = json.loads(json.dumps(obj, cls=EventJSONEncoder))
+
+        assert from_json == {
+            'a_datetime': '2012-05-01T07:27:10.020000+00:00',
+            'a_tz_datetime': '2012-05-01T07:27:10.020000+00:00',
+            'a_date': '2012-05-01',
+            'a_uuid': '0b4d1c52-a9d1-4b52-b3c9-5d9d3d9c1cd2',
+            'a_course_key': 'course-v1:edX+DemoX+Demo_Course',
+            'a_usage_key': 'block-v1:edX+DemoX+Demo_Course+type@problem+block@abc',
+            'a_list': [1, 'two', None],
+        }
+
+    def test_same_encoding_as_datetime_encoder(self):
+        obj = {
+            'time': datetime(2012, 5, 1, 7, 27, 10, 20000),
+            'tz_time': datetime(2012, 5, 1, 7, 27, 10, tzinfo=UTC),
+            'event': {'answers': {'q': ['\u00e9', 1.5]}},
+        }
+        assert encode_event(obj) == json.dumps(obj, cls=DateTimeJSONEncoder)
+
+    def test_max_length(self):
+        obj = {'event': 'x' * 100}
+        event_str = encode_event(obj)
+        assert encode_event(obj, max_length=50) == event_str[:50]
+        assert encode_event(obj, max_length=1000) == event_str
+
+    def test_unknown_type(self):
+        with self.assertRaises(TypeError):
+            encode_event({'an_object': object()})
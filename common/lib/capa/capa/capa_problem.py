@@ -20,6 +20,7 @@ import re
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
+from functools import lru_cache
 from xml.sax.saxutils import unescape
 
 import six
@@ -76,6 +77,9 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+# Maximum number of parsed problems kept in each process, see _parse_problem_text.
+PARSED_PROBLEM_CACHE_SIZE = 256
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -91,6 +95,8 @@ class LoncapaSystem(object):
     Attributes:
         i18n: an object implementing the `gettext.Translations` interface so
             that we can use `.ugettext` to localize strings.
+        safe_exec_cache: the cache of sandboxed code results, such as a
+            `SafeExecResultCache`.  Defaults to `cache`.
 
     See :class:`ModuleSystem` for documentation of other attributes.
 
@@ -110,7 +116,8 @@ class LoncapaSystem(object):
         seed,      # Why do we do this if we have self.seed?
         STATIC_URL,
         xqueue,
-        matlab_api_key=None
+        matlab_api_key=None,
+        safe_exec_cache=None,
     ):
         self.ajax_url = ajax_url
         self.anonymous_student_id = anonymous_student_id
@@ -126,6 +133,7 @@ class LoncapaSystem(object):
         self.STATIC_URL = STATIC_URL                    # pylint: disable=invalid-name
         self.xqueue = xqueue
         self.matlab_api_key = matlab_api_key
+        self.safe_exec_cache = safe_exec_cache or cache
 
 
 @python_2_unicode_compatible
@@ -179,19 +187,12 @@ class LoncapaProblem(object):
         self.done = state.get('done', False)
         self.input_state = state.get('input_state', {})
 
-        # Convert startouttext and endouttext to proper <text></text>
-        problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
-        problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
-        self.problem_text = problem_text
-
-        # parse problem XML file into an element tree
-        if isinstance(problem_text, six.text_type):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode('utf-8')
-        self.tree = etree.XML(problem_text)
-
+        # Parse the problem XML into an element tree, or copy the tree already parsed
+        # for another learner, since it doesn't depend on the seed or the student state.
         try:
-            self.make_xml_compatible(self.tree)
+            self.problem_text, tree = _parse_problem_text(problem_text)
+        except etree.XMLSyntaxError:
+            raise
         except Exception:
             capa_module = self.capa_module
             log.exception(
@@ -201,6 +202,7 @@ class LoncapaProblem(object):
                 capa_module.data
             )
             raise
+        self.tree = deepcopy(tree)
 
         # handle any <include file="foo"> tags
         self._process_includes()
@@ -236,7 +238,8 @@ class LoncapaProblem(object):
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
-    def make_xml_compatible(self, tree):
+    @staticmethod
+    def make_xml_compatible(tree):
         """
         Adjust tree xml in-place for compatibility before creating
         a problem from it.
@@ -888,10 +891,15 @@ class LoncapaProblem(object):
         variables for problem answer checking.
 
         Problem XML goes to Python execution context. Runs everything in script tags.
+
+        If the problem has anonymous_scripts="true", its scripts are run without the
+        learner's anonymous_student_id, so that their cached results are shared by all
+        learners with the same seed.
         """
+        anonymous_scripts = tree.get('anonymous_scripts') == 'true'
         context = {}
         context['seed'] = self.seed
-        context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+        context['anonymous_student_id'] = None if anonymous_scripts else self.capa_system.anonymous_student_id
         all_code = ''
 
         python_path = []
@@ -929,7 +937,7 @@ class LoncapaProblem(object):
                     random_seed=self.seed,
                     python_path=python_path,
                     extra_files=extra_files,
-                    cache=self.capa_system.cache,
+                    cache=self.capa_system.safe_exec_cache,
                     limit_overrides_context=get_course_id_from_capa_module(
                         self.capa_module
                     ),
@@ -941,6 +949,9 @@ class LoncapaProblem(object):
                 msg = Text("Error while executing script code: %s" % str(err))
                 raise responsetypes.LoncapaProblemError(msg)
 
+        if anonymous_scripts:
+            context['anonymous_student_id'] = self.capa_system.anonymous_student_id
+
         # Store code source in context, along with the Python path needed to run it correctly.
         context['script_code'] = all_code
         context['python_path'] = python_path
@@ -1085,10 +1096,7 @@ class LoncapaProblem(object):
 
             answer_id = 1
             input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
-                id=responsetype_id
-            )
+            inputfields = response.xpath("|".join(['.//' + x for x in input_tags]))
 
             # assign one answer_id for each input type
             for entry in inputfields:
@@ -1222,3 +1230,27 @@ class LoncapaProblem(object):
                 'label': HTML(label.strip()) if label else '',
                 'descriptions': descriptions
             }
+
+
+@lru_cache(maxsize=PARSED_PROBLEM_CACHE_SIZE)
+def _parse_problem_text(problem_text):
+    """
+    Convert the startouttext and endouttext of problem_text to proper <text></text>,
+    and return the converted text along with its XML tree, made compatible.
+
+    Every learner gets a LoncapaProblem built from the same problem text, so the
+    result is cached, keyed by the problem text itself so that editing a problem
+    can't leave a stale tree behind. The tree is shared: it must be copied before
+    being modified.
+    """
+    problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
+    problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
+
+    # parse problem XML file into an element tree
+    xml = problem_text
+    if isinstance(xml, six.text_type):
+        # etree chokes on Unicode XML with an encoding declaration
+        xml = xml.encode('utf-8')
+    tree = etree.XML(xml)
+    LoncapaProblem.make_xml_compatible(tree)
+    return problem_text, tree
@@ -0,0 +1,201 @@
+"""
+Compiled formulas, for evaluating a math expression at many sample points.
+
+`calc.evaluator` parses its expression every time it is called, which makes
+checking a FormulaResponse at many sample points mostly a matter of parsing the
+same two strings over and over again. A `CompiledFormula` parses its expression
+once, and then evaluates the parse tree for all the sample points at once, on
+NumPy arrays holding one value of each variable per sample point.
+"""
+
+
+from functools import lru_cache, reduce
+
+import numpy
+from calc import (
+    ParseAugmenter,
+    add_defaults,
+    check_parens,
+    eval_atom,
+    eval_number,
+    eval_parallel,
+    eval_power,
+    eval_product,
+    eval_sum
+)
+
+# Maximum number of compiled formulas kept by get_compiled_formula.
+COMPILED_FORMULA_CACHE_SIZE = 1024
+
+
+def _operands(parse_result):
+    """
+    Return the numbers or arrays of the parse_result, without its operators.
+    """
+    return [token for token in parse_result if not isinstance(token, str)]
+
+
+def _vectorized_atom(parse_result):
+    """
+    Return the value wrapped by the atom, ignoring any parenthesis.
+    """
+    return _operands(parse_result)[0]
+
+
+def _vectorized_power(parse_result):
+    """
+    Exponentiate the operands, right to left.
+    """
+    return reduce(lambda exponent, base: base ** exponent, reversed(_operands(parse_result)))
+
+
+def _vectorized_parallel(parse_result):
+    """
+    Compute the operands according to the parallel resistors operator,
+    with a NaN wherever one of them is zero.
+    """
+    operands = _operands(parse_result)
+    if len(operands) == 1:
+        return operands[0]
+    has_zero = reduce(numpy.logical_or, [numpy.equal(operand, 0) for operand in operands])
+    reciprocals = [1. / numpy.where(has_zero, 1., operand) for operand in operands]
+    return numpy.where(has_zero, float('nan'), 1. / sum(reciprocals))
+
+
+def _vectorized_product(parse_result):
+    """
+    Multiply and divide the operands.
+    """
+    product = 1.0
+    divide = False
+    for token in parse_result:
+        if isinstance(token, str):
+            divide = token == '/'
+        elif divide:
+            product = product / token
+        else:
+            product = product * token
+    return product
+
+
+def _vectorized_sum(parse_result):
+    """
+    Add and subtract the operands, allowing a leading sign.
+    """
+    total = 0.0
+    subtract = False
+    for token in parse_result:
+        if isinstance(token, str):
+            subtract = token == '-'
+        elif subtract:
+            total = total - token
+        else:
+            total = total + token
+    return total
+
+
+class CompiledFormula:
+    """
+    A math expression, parsed once and evaluated at any number of sample points.
+
+    Creating a CompiledFormula raises the same exceptions as `calc.evaluator`
+    when the expression can't be parsed, or uses variables or functions that
+    aren't defined. Evaluating it gives the same results as calling
+    `calc.evaluator` at each of the sample points, and raises the same
+    exceptions.
+    """
+
+    def __init__(self, math_expr, variables, case_sensitive=False):
+        """
+        Parse math_expr, which may use the variables named in variables
+        besides the default ones.
+        """
+        self.math_expr = math_expr
+        self.variables = tuple(variables)
+        self.case_sensitive = case_sensitive
+        self._interpreter = None
+        if math_expr.strip() == "":
+            return
+
+        check_parens(math_expr)
+        interpreter = ParseAugmenter(math_expr, case_sensitive)
+        interpreter.parse_algebra()
+        all_variables, all_functions = add_defaults(dict.fromkeys(self.variables), dict(), case_sensitive)
+        interpreter.check_variables(all_variables, all_functions)
+        self._interpreter = interpreter
+
+    def _casify(self, name):
+        """
+        Return the name the variable or function is looked up with.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _reduce(self, variables, actions):
+        """
+        Evaluate the parse tree with the given variables and node actions.
+        """
+        all_variables, all_functions = add_defaults(variables, dict(), self.case_sensitive)
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[self._casify(x[0])],
+            'function': lambda x: all_functions[self._casify(x[0])](x[1]),
+        }
+        evaluate_actions.update(actions)
+        return self._interpreter.reduce_tree(evaluate_actions)
+
+    def evaluate(self, var_dict_list):
+        """
+        Return the list of values of the formula, one for each dictionary of
+        variable values in var_dict_list.
+
+        The formula is first evaluated at all the sample points at once, with
+        any floating point error raised rather than ignored. Evaluating it one
+        sample point at a time behaves differently from NumPy arrays in these
+        cases (e.g. a division by zero raises ZeroDivisionError, and a negative
+        number to a fractional power is complex), so when the arrays can't be
+        evaluated, the formula is evaluated at each sample point instead.
+        """
+        num_samples = len(var_dict_list)
+        if self._interpreter is None:
+            return [float('nan')] * num_samples
+
+        try:
+            with numpy.errstate(divide='raise', over='raise', invalid='raise', under='ignore'):
+                variables = {
+                    name: numpy.array([var_dict[name] for var_dict in var_dict_list])
+                    for name in self.variables
+                }
+                values = self._reduce(variables, {
+                    'atom': _vectorized_atom,
+                    'power': _vectorized_power,
+                    'parallel': _vectorized_parallel,
+                    'product': _vectorized_product,
+                    'sum': _vectorized_sum,
+                })
+            if numpy.shape(values) in ((), (num_samples,)):
+                return numpy.broadcast_to(values, (num_samples,)).tolist()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+        return [
+            self._reduce(var_dict, {
+                'atom': eval_atom,
+                'power': eval_power,
+                'parallel': eval_parallel,
+                'product': eval_product,
+                'sum': eval_sum,
+            })
+            for var_dict in var_dict_list
+        ]
+
+
+@lru_cache(maxsize=COMPILED_FORMULA_CACHE_SIZE)
+def get_compiled_formula(math_expr, variables, case_sensitive=False):
+    """
+    Return the CompiledFormula of math_expr using the tuple of variables,
+    shared by every caller in this process.
+
+    This is meant for the answers of problems, which are checked against many
+    student answers. Expressions that can't be compiled aren't cached.
+    """
+    return CompiledFormula(math_expr, variables, case_sensitive)
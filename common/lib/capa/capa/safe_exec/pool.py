@@ -0,0 +1,287 @@
+"""
+A pool of warm sandboxed Python workers for safe_exec.
+
+Running code with codejail starts a new sandboxed Python for every execution,
+which then has to import numpy and the other modules capa problems use.  An
+:class:`ExecutorPool` keeps up to `size` worker processes running the loop in
+`pool_worker.py`, started with the same command and user as codejail.
+
+A worker only imports those modules.  It runs each execution in a child forked
+for it, which sets hard CPU, VMEM, FSIZE and NPROC limits before running the
+code and exits afterwards, so one execution can't affect the next.  The worker
+kills a child that runs longer than REALTIME, and a worker that doesn't answer
+in time is itself killed.
+
+Workers are replaced after `max_executions` executions, or as soon as one
+fails or times out.  Code that needs files in the sandbox (a python path or
+extra files) or network access through a proxy is still run with codejail.
+
+Pools are configured by `settings.CODE_JAIL['pool']`, with one pool per
+limit overrides context.
+"""
+
+
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+# Read the worker's source now, so it can be passed to the sandbox Python.
+with open(os.path.join(os.path.dirname(__file__), 'pool_worker.py')) as f:
+    WORKER_SOURCE = f.read()
+
+# Seconds a new worker has to import its modules and report that it's ready.
+STARTUP_TIMEOUT = 30
+
+# Seconds a worker has past the REALTIME limit to report that it killed an
+# execution.
+REALTIME_GRACE = 5
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+class _Worker(object):
+    """
+    A running worker process.
+    """
+    def __init__(self, cmdline, warm_imports):
+        self.executions = 0
+        self.tmpdir = tempfile.mkdtemp(prefix='codejail-pool-')
+        os.chmod(self.tmpdir, 0o755)
+        self.process = subprocess.Popen(
+            cmdline + ['-c', WORKER_SOURCE] + list(warm_imports),
+            cwd=self.tmpdir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buffer = b''
+        if not self._read_response(STARTUP_TIMEOUT).get('ready'):
+            self.close()
+            raise SafeExecException("Couldn't start a sandbox worker")
+
+    def execute(self, code, safe_globals, limits):
+        """
+        Execute `code` with the json-safe `safe_globals` and the codejail
+        `limits`, and return the worker's response.
+        """
+        nonce = uuid.uuid4().hex
+        realtime = limits.get('REALTIME')
+        request = {
+            'nonce': nonce,
+            'code': code,
+            'globals': safe_globals,
+            'limits': {name: limits.get(name) for name in ('CPU', 'VMEM', 'FSIZE', 'NPROC')},
+            'realtime': realtime,
+        }
+        self.executions += 1
+        try:
+            self.process.stdin.write(json.dumps(request).encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(exc))
+        response = self._read_response(realtime + REALTIME_GRACE if realtime else None)
+        if response.get('nonce') != nonce:
+            raise SafeExecException("Couldn't execute jailed code: unexpected response from sandbox worker")
+        return response
+
+    def close(self):
+        """
+        Stop the worker and remove its working directory.
+        """
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdin.close()
+        self.process.stdout.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _read_response(self, timeout):
+        """
+        Read a line of JSON from the worker, waiting at most `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        stdout = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.monotonic() if deadline else None
+            if remaining is not None and remaining <= 0:
+                raise SafeExecException("Couldn't execute jailed code: timed out")
+            readable, _, _ = select.select([stdout], [], [], remaining)
+            if readable:
+                data = os.read(stdout, 65536)
+                if not data:
+                    raise SafeExecException(
+                        "Couldn't execute jailed code: sandbox worker exited with status {}".format(
+                            self.process.wait()
+                        )
+                    )
+                self._buffer += data
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(line.decode('utf-8'))
+
+
+class ExecutorPool(object):
+    """
+    A pool of at most `size` workers, each started with `cmdline` and used
+    for at most `max_executions` executions.
+
+    `limits` are the codejail limits, and `warm_imports` the modules each
+    worker imports when it starts.
+    """
+    def __init__(self, cmdline, size, max_executions, limits, warm_imports):
+        self.cmdline = cmdline
+        self.size = size
+        self.max_executions = max_executions
+        self.limits = limits
+        self.warm_imports = warm_imports
+        self._idle = []
+        self._workers = 0
+        self._condition = threading.Condition()
+        self._stats = {
+            'executions': 0,
+            'workers_started': 0,
+            'workers_stopped': 0,
+            'queue_wait_seconds': 0.0,
+            'max_queue_wait_seconds': 0.0,
+            'execution_seconds': 0.0,
+        }
+
+    def safe_exec(
+        self, code, globals_dict, python_path=None, extra_files=None, limit_overrides_context=None, slug=None,
+    ):  # pylint: disable=unused-argument
+        """
+        Execute `code` in a worker, with the same interface and results as
+        `codejail.safe_exec.safe_exec`.
+        """
+        assert not python_path and not extra_files, "Code needing files in the sandbox can't be pooled"
+        start = time.monotonic()
+        worker = self._acquire()
+        queue_wait = time.monotonic() - start
+
+        start = time.monotonic()
+        try:
+            response = worker.execute(code, json_safe(globals_dict), self.limits)
+        except Exception:
+            log.warning("Sandbox worker failed while executing %s", slug)
+            self._release(worker, discard=True)
+            raise
+        execution_seconds = time.monotonic() - start
+        self._release(worker)
+
+        with self._condition:
+            self._stats['executions'] += 1
+            self._stats['queue_wait_seconds'] += queue_wait
+            self._stats['max_queue_wait_seconds'] = max(self._stats['max_queue_wait_seconds'], queue_wait)
+            self._stats['execution_seconds'] += execution_seconds
+
+        if 'emsg' in response:
+            raise SafeExecException(response['emsg'])
+        globals_dict.update(response['globals'])
+
+    def stats(self):
+        """
+        Return a dict of counters and timings for this pool.
+        """
+        with self._condition:
+            stats = dict(self._stats, size=self.size, workers=self._workers, idle_workers=len(self._idle))
+        executions = stats['executions']
+        stats['mean_queue_wait_seconds'] = stats['queue_wait_seconds'] / executions if executions else 0.0
+        stats['mean_execution_seconds'] = stats['execution_seconds'] / executions if executions else 0.0
+        return stats
+
+    def close(self):
+        """
+        Stop all idle workers.  New workers are started when needed.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._workers -= len(idle)
+            self._stats['workers_stopped'] += len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def _acquire(self):
+        """
+        Return an idle worker, starting one if the pool isn't full, or waiting
+        for one to be released otherwise.
+        """
+        with self._condition:
+            while not self._idle and self._workers >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._workers += 1
+            self._stats['workers_started'] += 1
+
+        try:
+            return _Worker(self.cmdline, self.warm_imports)
+        except Exception:
+            with self._condition:
+                self._workers -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker, discard=False):
+        """
+        Return `worker` to the pool, or stop it if it has been used too many
+        times or must be discarded.
+        """
+        discard = discard or worker.executions >= self.max_executions
+        with self._condition:
+            if discard:
+                self._workers -= 1
+                self._stats['workers_stopped'] += 1
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+        if discard:
+            worker.close()
+
+
+def get_executor_pool(limit_overrides_context, warm_imports):
+    """
+    Return the pool for `limit_overrides_context`, or None if code run in
+    this context shouldn't be pooled.
+    """
+    config = (getattr(settings, 'CODE_JAIL', None) or {}).get('pool') or {}
+    size = config.get('size_overrides', {}).get(limit_overrides_context, config.get('size', 0))
+    if not size or not jail_code.is_configured('python'):
+        return None
+    limits = jail_code.get_effective_limits(limit_overrides_context)
+    if limits.get('PROXY'):
+        return None
+
+    with _POOLS_LOCK:
+        pool = _POOLS.get(limit_overrides_context)
+        if pool is None:
+            command = jail_code.COMMANDS['python']
+            cmdline = list(command['cmdline_start'])
+            if command.get('user'):
+                cmdline = ['sudo', '-u', command['user']] + cmdline
+            pool = _POOLS[limit_overrides_context] = ExecutorPool(
+                cmdline, size, config.get('max_executions', 100), limits, warm_imports,
+            )
+    return pool
+
+
+def pool_stats():
+    """
+    Return the stats of each pool, by limit overrides context.
+    """
+    with _POOLS_LOCK:
+        pools = dict(_POOLS)
+    return {context: pool.stats() for context, pool in pools.items()}
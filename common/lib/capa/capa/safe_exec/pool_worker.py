@@ -0,0 +1,179 @@
+"""
+The fork server run by each worker of the safe_exec executor pool, in the sandbox.
+
+This file is not imported: its source is passed to the sandbox Python with
+`-c`, followed by the names of the modules to import before the worker reports
+that it is ready.  Requests and responses are lines of JSON, read from stdin
+and written to a copy of the original stdout.
+
+The worker itself never runs requested code.  For each request it forks a
+child, which sets its resource limits, runs the code and writes its results
+to a pipe before exiting, so nothing the code does outlives the request.  The
+child's own input and output are /dev/null.
+"""
+
+
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+# Must be set before numpy is imported, see TNL-6456.
+os.environ["OPENBLAS_NUM_THREADS"] = "1"
+
+OK_TYPES = (type(None), int, float, str, list, tuple, dict)
+
+# The codejail limits set on each child, and whether a limit of 0 is applied
+# rather than meaning no limit.
+RLIMITS = (
+    ("CPU", resource.RLIMIT_CPU, False),
+    ("VMEM", resource.RLIMIT_AS, False),
+    ("FSIZE", resource.RLIMIT_FSIZE, True),
+    ("NPROC", resource.RLIMIT_NPROC, False),
+)
+
+
+def json_safe(globals_dict):
+    """
+    Return the JSON-serializable part of `globals_dict`.
+    """
+    safe = {}
+    for name, value in globals_dict.items():
+        if name == "__builtins__" or not isinstance(value, OK_TYPES):
+            continue
+        try:
+            safe[name] = json.loads(json.dumps(value))
+        except Exception:  # pylint: disable=broad-except
+            continue
+    return safe
+
+
+def set_limits(limits):
+    """
+    Set both the soft and hard resource `limits` of this process, so the code
+    can't raise them again.
+    """
+    for name, rlimit, zero_applies in RLIMITS:
+        value = limits.get(name)
+        if value or (zero_applies and value is not None):
+            resource.setrlimit(rlimit, (value, value))
+
+
+def run_child(request, result_fd):
+    """
+    Run the code of `request` in this forked child, write its results to
+    `result_fd`, and exit.
+    """
+    response = {}
+    try:
+        os.setpgid(0, 0)
+        set_limits(request["limits"])
+        globals_dict = request["globals"]
+        exec(compile(request["code"], "jailed_code", "exec"), globals_dict)  # pylint: disable=exec-used
+    except BaseException:  # pylint: disable=broad-except
+        response["emsg"] = "Couldn't execute jailed code: {}".format(traceback.format_exc())
+    else:
+        response["globals"] = json_safe(globals_dict)
+
+    try:
+        data = json.dumps(response).encode("utf-8")
+        while data:
+            data = data[os.write(result_fd, data):]
+    finally:
+        os._exit(0)  # pylint: disable=protected-access
+
+
+def wait_for_child(pid, result_fd, realtime):
+    """
+    Return the response of the child `pid` read from `result_fd`, killing the
+    child if it takes more than `realtime` seconds.
+    """
+    deadline = time.monotonic() + realtime if realtime else None
+    chunks = []
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic() if deadline else None
+        if remaining is not None and remaining <= 0:
+            timed_out = True
+            break
+        readable, _, _ = select.select([result_fd], [], [], remaining)
+        if readable:
+            data = os.read(result_fd, 65536)
+            if not data:
+                break
+            chunks.append(data)
+
+    # Kill anything the code left running, then collect the child.
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    _, status = os.waitpid(pid, 0)
+
+    if timed_out:
+        return {"emsg": "Couldn't execute jailed code: timed out"}
+    try:
+        child_response = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError:
+        if os.WIFSIGNALED(status):
+            reason = "killed by signal {}".format(os.WTERMSIG(status))
+        else:
+            reason = "exited with status {}".format(os.WEXITSTATUS(status))
+        return {"emsg": "Couldn't execute jailed code: {}".format(reason)}
+    if "emsg" in child_response:
+        return {"emsg": str(child_response["emsg"])}
+    return {"globals": child_response.get("globals", {})}
+
+
+def main(warm_imports):
+    """
+    Import `warm_imports`, then run each request in a new child until stdin
+    is closed.
+    """
+    protocol = os.fdopen(os.dup(1), "w")
+    requests = os.fdopen(os.dup(0), "r")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    for modname in warm_imports:
+        try:
+            __import__(modname)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    protocol.write(json.dumps({"ready": True}) + "\n")
+    protocol.flush()
+
+    for line in requests:
+        request = json.loads(line)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # The child can't reach the worker's protocol.
+            os.close(read_fd)
+            os.close(protocol.fileno())
+            os.close(requests.fileno())
+            run_child(request, write_fd)
+        try:
+            os.setpgid(pid, pid)
+        except OSError:
+            pass
+        os.close(write_fd)
+        try:
+            response = wait_for_child(pid, read_fd, request.get("realtime"))
+        finally:
+            os.close(read_fd)
+
+        response["nonce"] = request["nonce"]
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
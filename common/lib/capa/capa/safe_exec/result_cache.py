@@ -0,0 +1,249 @@
+"""
+A bounded cache for the results of safe_exec.
+
+Executing problem code in the sandbox is expensive, so its results are
+cached.  :class:`SafeExecResultCache` sits in front of a shared cache backend
+(typically the django cache) and adds:
+
+* an in-process LRU tier, bounded by number of entries and total size,
+* an optional TTL on both tiers,
+* hit/miss counters per problem slug, and
+* eviction of all results for a context (a course id).
+
+Cache keys are content-addressed: they are computed from the code, the seed,
+the Python path, the contents of the extra files, and all of the globals, so
+the same problem code with the same seed and globals shares a result.
+
+Evicting a context changes its generation, which is part of the keys of its
+results.  Each process remembers the generations it has read for
+`GENERATION_TTL` seconds, so lookups don't go to the backend for them, and
+results evicted by another process can be served locally for that long.
+"""
+
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import six
+
+
+def _hash_text(hasher, text):
+    """
+    Update `hasher` with `text`, which may be text or bytes.
+    """
+    if isinstance(text, six.text_type):
+        text = text.encode('utf-8')
+    hasher.update(six.b(str(len(text))))
+    hasher.update(text)
+
+
+class SafeExecResultCache(object):
+    """
+    A cache of safe_exec results, in front of an optional shared `backend`.
+
+    `backend` is an object with .get(key) and .set(key, value[, timeout])
+    methods, like a django cache.  The timeout is only passed when `ttl` is
+    set.
+
+    `max_entries` and `max_bytes` bound the in-process tier, which is least
+    recently used first.  A `max_entries` of 0 disables the in-process tier,
+    so the cache only adds keying and statistics to the backend.
+
+    `ttl` is the number of seconds a result is kept, or None to use the
+    backend's default and keep local results until they are evicted.
+    """
+    KEY_PREFIX = 'safe_exec.v2'
+    GENERATION_KEY_PREFIX = 'safe_exec.generation'
+    # Seconds a generation read from the backend is used before reading it again.
+    GENERATION_TTL = 10
+    # Maximum number of contexts whose generation is remembered, and of slugs
+    # with statistics.  The least recently used are dropped first.
+    MAX_CONTEXTS = 1000
+    MAX_SLUGS = 10000
+
+    def __init__(self, backend=None, max_entries=1000, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (value, size, context, expires_at)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._evictions = 0
+        # context -> (generation, expires_at)
+        self._generations = OrderedDict()
+        # slug -> {'hits': int, 'misses': int}
+        self._slug_stats = OrderedDict()
+
+    def make_key(self, code, safe_globals, random_seed, python_path=None, extra_files=None, context=None):
+        """
+        Return the cache key for running `code` with the json-safe globals
+        `safe_globals`.
+        """
+        hasher = hashlib.sha256()
+        _hash_text(hasher, code)
+        hasher.update(six.b(repr(random_seed)))
+        _hash_text(hasher, json.dumps(list(python_path or [])))
+        for filename, contents in extra_files or []:
+            _hash_text(hasher, filename)
+            _hash_text(hasher, contents)
+        _hash_text(hasher, json.dumps(safe_globals, sort_keys=True))
+        _hash_text(hasher, self._generation(context))
+        return '{}.{}'.format(self.KEY_PREFIX, hasher.hexdigest())
+
+    def get(self, key, slug=None, context=None):
+        """
+        Return the cached result for `key`, or None.  The lookup is counted
+        against `slug`.
+        """
+        value = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[3] is not None and entry[3] <= time.time():
+                    self._remove(key)
+                else:
+                    self._entries.move_to_end(key)
+                    value = entry[0]
+
+        if value is None and self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._store_local(key, value, context)
+
+        with self._lock:
+            stats = self._slug_stats.get(slug)
+            if stats is None:
+                stats = self._slug_stats[slug] = {'hits': 0, 'misses': 0}
+                if len(self._slug_stats) > self.MAX_SLUGS:
+                    self._slug_stats.popitem(last=False)
+            else:
+                self._slug_stats.move_to_end(slug)
+            stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, key, value, context=None):
+        """
+        Cache `value`, a json-safe (emsg, results) pair, under `key`.
+        """
+        self._store_local(key, value, context)
+        if self.backend is not None:
+            if self.ttl is None:
+                self.backend.set(key, value)
+            else:
+                self.backend.set(key, value, self.ttl)
+
+    def evict_context(self, context):
+        """
+        Evict all results computed for `context`.
+
+        Local results are dropped, and results in the backend become
+        unreachable because the context's generation is part of their keys.
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] == context]:
+                self._remove(key)
+        if self.backend is not None and context is not None:
+            generation = uuid.uuid4().hex
+            self.backend.set(self._generation_key(context), generation, None)
+            self._remember_generation(context, generation)
+
+    def clear(self):
+        """
+        Drop all local results and statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._evictions = 0
+            self._generations.clear()
+            self._slug_stats.clear()
+
+    def hit_rate(self, slug):
+        """
+        Return the fraction of lookups for `slug` that were hits, or None if
+        there were none.
+        """
+        with self._lock:
+            stats = self._slug_stats.get(slug)
+            if not stats:
+                return None
+            lookups = stats['hits'] + stats['misses']
+            return stats['hits'] / lookups if lookups else None
+
+    def stats(self):
+        """
+        Return a dict describing the size and hit rates of the cache.
+        """
+        with self._lock:
+            slugs = {slug: dict(stats) for slug, stats in self._slug_stats.items()}
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self._evictions,
+                'hits': sum(stats['hits'] for stats in slugs.values()),
+                'misses': sum(stats['misses'] for stats in slugs.values()),
+                'slugs': slugs,
+            }
+
+    def _store_local(self, key, value, context):
+        """
+        Store `value` in the in-process tier, evicting the least recently used
+        results to stay within bounds.
+        """
+        if not self.max_entries:
+            return
+        size = len(json.dumps(value))
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, context, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, key):
+        """
+        Remove `key` from the in-process tier.  The lock must be held.
+        """
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+    def _generation_key(self, context):
+        return '{}.{}'.format(self.GENERATION_KEY_PREFIX, hashlib.sha256(six.b(str(context))).hexdigest())
+
+    def _generation(self, context):
+        """
+        Return the current generation of `context`'s results, as last read
+        from the backend within `GENERATION_TTL` seconds.
+        """
+        if self.backend is None or context is None:
+            return ''
+        with self._lock:
+            entry = self._generations.get(context)
+            if entry is not None and entry[1] > time.time():
+                self._generations.move_to_end(context)
+                return entry[0]
+        generation = self.backend.get(self._generation_key(context)) or ''
+        self._remember_generation(context, generation)
+        return generation
+
+    def _remember_generation(self, context, generation):
+        """
+        Remember `generation` as the current generation of `context` for
+        `GENERATION_TTL` seconds.
+        """
+        with self._lock:
+            self._generations[context] = (generation, time.time() + self.GENERATION_TTL)
+            self._generations.move_to_end(context)
+            if len(self._generations) > self.MAX_CONTEXTS:
+                self._generations.popitem(last=False)
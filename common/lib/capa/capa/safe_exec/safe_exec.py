@@ -1,8 +1,6 @@
 """Capa's specialized use of codejail.safe_exec."""
 
 
-import hashlib
-
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
@@ -10,6 +8,8 @@ import six
 from six import text_type
 
 from . import lazymod
+from .pool import get_executor_pool
+from .result_cache import SafeExecResultCache
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -55,6 +55,9 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# Modules imported by pooled sandbox workers before they run any code.
+WARM_IMPORTS = ["random2", "six"] + [modname for _, modname in ASSUMED_IMPORTS]
+
 
 def update_hash(hasher, obj):
     """
@@ -106,9 +109,10 @@ def safe_exec(
     `extra_files` is a list of (filename, contents) pairs.  These files are
     created in the sandbox.
 
-    `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
-    to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    `cache` is a `SafeExecResultCache`, or an object with .get(key) and .set(key, value)
+    methods.  It will be used to cache the execution, taking into account the code, the
+    values of the globals, the random seed, and the python path and extra files.  A plain
+    cache is used through a `SafeExecResultCache` with no in-process tier.
 
     `limit_overrides_context` is an optional string to be used as a key on
     the `settings.CODE_JAIL['limit_overrides']` dictionary in order to apply
@@ -123,12 +127,11 @@ def safe_exec(
     """
     # Check the cache for a previous result.
     if cache:
+        if not isinstance(cache, SafeExecResultCache):
+            cache = SafeExecResultCache(backend=cache, max_entries=0)
         safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode('utf-8'))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        key = cache.make_key(code, safe_globals, random_seed, python_path, extra_files, limit_overrides_context)
+        cached = cache.get(key, slug=slug, context=limit_overrides_context)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
@@ -146,6 +149,11 @@ def safe_exec(
         exec_fn = codejail_not_safe_exec
     else:
         exec_fn = codejail_safe_exec
+        # Code that doesn't need files in the sandbox can run in a warm worker.
+        if not python_path and not extra_files:
+            pool = get_executor_pool(limit_overrides_context, WARM_IMPORTS)
+            if pool is not None:
+                exec_fn = pool.safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
     try:
@@ -168,7 +176,7 @@ def safe_exec(
     # the globals dict might not be entirely serializable.
     if cache:
         cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
+        cache.set(key, (emsg, cleaned_results), context=limit_overrides_context)
 
     # If an exception happened, raise it now.
     if emsg:
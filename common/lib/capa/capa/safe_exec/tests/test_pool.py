@@ -0,0 +1,126 @@
+"""Test pool.py"""
+
+
+import sys
+import unittest
+
+import pytest
+from codejail.safe_exec import SafeExecException
+from django.test import override_settings
+from mock import patch
+
+from capa.safe_exec import pool, safe_exec
+from capa.safe_exec.safe_exec import WARM_IMPORTS
+
+
+class TestExecutorPool(unittest.TestCase):
+    """
+    Test the pool's workers, run with this Python rather than in a sandbox.
+    """
+
+    def make_pool(self, size=1, max_executions=10, **limits):
+        """
+        Return a pool that is closed at the end of the test.
+        """
+        limits.setdefault('REALTIME', 3)
+        executor_pool = pool.ExecutorPool([sys.executable, '-E', '-B'], size, max_executions, limits, ['math'])
+        self.addCleanup(executor_pool.close)
+        return executor_pool
+
+    def test_execute(self):
+        executor_pool = self.make_pool()
+        g = {'b': 2}
+        executor_pool.safe_exec("import math\na = int(math.pi) + b\nprint('ignored')", g)
+        assert g == {'a': 5, 'b': 2}
+
+    def test_globals_not_shared_between_executions(self):
+        executor_pool = self.make_pool()
+        executor_pool.safe_exec("a = 1", {})
+        g = {}
+        executor_pool.safe_exec("b = 'a' in globals()", g)
+        assert g['b'] is False
+        assert executor_pool.stats()['workers_started'] == 1
+
+    def test_raising_exceptions(self):
+        executor_pool = self.make_pool()
+        with pytest.raises(SafeExecException) as cm:
+            executor_pool.safe_exec("1/0", {})
+        assert 'ZeroDivisionError' in str(cm.value)
+
+        # The worker is still usable.
+        g = {}
+        executor_pool.safe_exec("a = 1", g)
+        assert g['a'] == 1
+        assert executor_pool.stats()['workers_started'] == 1
+
+    def test_workers_recycled(self):
+        executor_pool = self.make_pool(max_executions=2)
+        for _ in range(5):
+            executor_pool.safe_exec("a = 1", {})
+        stats = executor_pool.stats()
+        assert stats['executions'] == 5
+        assert stats['workers_started'] == 3
+        assert stats['workers_stopped'] == 2
+
+    def test_realtime_limit(self):
+        executor_pool = self.make_pool(REALTIME=1)
+        with pytest.raises(SafeExecException) as cm:
+            executor_pool.safe_exec("while True: pass", {})
+        assert 'timed out' in str(cm.value)
+
+        g = {}
+        executor_pool.safe_exec("a = 1", g)
+        assert g['a'] == 1
+        assert executor_pool.stats()['workers_started'] == 1
+
+    def test_cpu_limit_cannot_be_raised(self):
+        executor_pool = self.make_pool(CPU=1)
+        g = {}
+        executor_pool.safe_exec("import resource\na = resource.getrlimit(resource.RLIMIT_CPU)", g)
+        assert g['a'] == [1, 1]
+        with pytest.raises(SafeExecException) as cm:
+            executor_pool.safe_exec("while True: pass", {})
+        assert 'killed by signal' in str(cm.value)
+
+    def test_worker_exits(self):
+        executor_pool = self.make_pool()
+        with pytest.raises(SafeExecException):
+            executor_pool.safe_exec("import os\nos._exit(3)", {})
+        g = {}
+        executor_pool.safe_exec("a = 1", g)
+        assert g['a'] == 1
+
+    def test_changes_not_kept_between_executions(self):
+        executor_pool = self.make_pool()
+        executor_pool.safe_exec("import builtins, math\nmath.pi = 3\nbuiltins.round = None", {})
+        g = {}
+        executor_pool.safe_exec("import math\na = round(math.pi, 2)", g)
+        assert g['a'] == 3.14
+        assert executor_pool.stats()['workers_started'] == 1
+
+
+class TestGetExecutorPool(unittest.TestCase):
+    """
+    Test which code is run by a pool.
+    """
+
+    @override_settings(CODE_JAIL={'pool': {'size': 0}})
+    def test_disabled(self):
+        assert pool.get_executor_pool('course-v1:edX+Pool+Test', WARM_IMPORTS) is None
+
+    @override_settings(CODE_JAIL={'pool': {'size': 0, 'size_overrides': {'course-v1:edX+Pool+Test': 2}}})
+    @patch.dict(pool._POOLS, clear=True)  # pylint: disable=protected-access
+    @patch.dict(pool.jail_code.COMMANDS, {'python': {'cmdline_start': [sys.executable, '-E', '-B'], 'user': None}})
+    def test_size_overrides(self):
+        with patch('capa.safe_exec.pool.jail_code.is_configured', return_value=True):
+            executor_pool = pool.get_executor_pool('course-v1:edX+Pool+Test', WARM_IMPORTS)
+            assert executor_pool.size == 2
+            assert pool.get_executor_pool('course-v1:edX+Pool+Test', WARM_IMPORTS) is executor_pool
+            assert pool.get_executor_pool('course-v1:edX+Other+Test', WARM_IMPORTS) is None
+
+    def test_files_not_pooled(self):
+        with patch('capa.safe_exec.safe_exec.get_executor_pool') as mock_get_pool:
+            with patch('capa.safe_exec.safe_exec.codejail_safe_exec') as mock_exec:
+                safe_exec("a = 1", {}, python_path=['lib.zip'], extra_files=[('lib.zip', b'')])
+        assert not mock_get_pool.called
+        assert mock_exec.called
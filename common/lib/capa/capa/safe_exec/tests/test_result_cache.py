@@ -0,0 +1,174 @@
+"""Test result_cache.py"""
+
+
+import unittest
+
+from mock import patch
+
+from capa.safe_exec import SafeExecResultCache, safe_exec
+
+
+class DictBackend(object):
+    """A django-like cache backend over a simple dict, for testing."""
+
+    def __init__(self):
+        self.cache = {}
+        self.timeouts = {}
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout=300):
+        self.cache[key] = value
+        self.timeouts[key] = timeout
+
+
+class TestSafeExecResultCache(unittest.TestCase):
+    """Test the bounded safe_exec result cache."""
+
+    def test_hits_and_misses_per_slug(self):
+        cache = SafeExecResultCache()
+        safe_exec("a = 17", {}, cache=cache, slug='problem_1')
+        g = {}
+        safe_exec("a = 17", g, cache=cache, slug='problem_1')
+        assert g['a'] == 17
+        safe_exec("b = 1", {}, cache=cache, slug='problem_2')
+
+        assert cache.hit_rate('problem_1') == 0.5
+        assert cache.hit_rate('problem_2') == 0
+        assert cache.hit_rate('problem_3') is None
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+        assert stats['slugs']['problem_1'] == {'hits': 1, 'misses': 1}
+
+    def test_lru_eviction_by_entries(self):
+        cache = SafeExecResultCache(max_entries=2)
+        cache.set('a', (None, {}))
+        cache.set('b', (None, {}))
+        assert cache.get('a') is not None
+        cache.set('c', (None, {}))
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats()['evictions'] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = SafeExecResultCache(max_bytes=100)
+        cache.set('small', (None, {'a': 1}))
+        cache.set('large', (None, {'a': 'x' * 100}))
+        assert cache.get('large') is None
+        cache.set('medium', (None, {'a': 'x' * 60}))
+        cache.set('medium_2', (None, {'a': 'y' * 60}))
+
+        assert cache.get('medium') is None
+        assert cache.get('medium_2') is not None
+        assert cache.stats()['bytes'] <= 100
+
+    def test_ttl(self):
+        backend = DictBackend()
+        cache = SafeExecResultCache(backend=backend, ttl=60)
+        with patch('capa.safe_exec.result_cache.time.time', return_value=1000):
+            cache.set('a', (None, {}))
+        assert backend.timeouts['a'] == 60
+
+        with patch('capa.safe_exec.result_cache.time.time', return_value=1059):
+            assert cache.get('a') is not None
+        del backend.cache['a']
+        with patch('capa.safe_exec.result_cache.time.time', return_value=1060):
+            assert cache.get('a') is None
+
+    def test_backend_fills_local_tier(self):
+        backend = DictBackend()
+        safe_exec("a = 17", {}, cache=SafeExecResultCache(backend=backend))
+
+        cache = SafeExecResultCache(backend=backend)
+        g = {}
+        safe_exec("a = 17", g, cache=cache)
+        assert g['a'] == 17
+        assert cache.stats()['entries'] == 1
+
+    def test_results_not_shared_between_learners(self):
+        cache = SafeExecResultCache()
+        code = "a = random.randint(0, 1000)"
+        safe_exec(code, {'anonymous_student_id': 'learner_1', 'seed': 5}, random_seed=5, cache=cache)
+        g = {'anonymous_student_id': 'learner_2', 'seed': 5}
+        safe_exec(code, g, random_seed=5, cache=cache)
+        assert g['anonymous_student_id'] == 'learner_2'
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['entries']) == (0, 2, 2)
+
+    def test_globals_read_indirectly(self):
+        cache = SafeExecResultCache()
+        for code in [
+            "a = (lambda: 0).__globals__['anonymous_student_id']",
+            "import sys\na = sys._getframe().f_globals['anonymous_student_id']",
+            "import operator\na = operator.itemgetter('anonymous' + '_student_id')((lambda: 0).__globals__)",
+        ]:
+            safe_exec(code, {'anonymous_student_id': 'learner_1'}, cache=cache)
+            g = {'anonymous_student_id': 'learner_2'}
+            safe_exec(code, g, cache=cache)
+            assert g['a'] == 'learner_2'
+
+    def test_extra_files_are_part_of_key(self):
+        cache = SafeExecResultCache()
+        key = cache.make_key("a = 1", {}, 1, ['lib.zip'], [('lib.zip', b'one')])
+        assert key != cache.make_key("a = 1", {}, 1, ['lib.zip'], [('lib.zip', b'two')])
+        assert key == cache.make_key("a = 1", {}, 1, ['lib.zip'], [('lib.zip', b'one')])
+
+    def test_evict_context(self):
+        backend = DictBackend()
+        cache = SafeExecResultCache(backend=backend)
+        safe_exec("a = 17", {}, cache=cache, limit_overrides_context='course_1')
+        safe_exec("a = 17", {}, cache=cache, limit_overrides_context='course_2')
+        assert cache.stats()['entries'] == 2
+
+        cache.evict_context('course_1')
+        assert cache.stats()['entries'] == 1
+        other_process_cache = SafeExecResultCache(backend=backend)
+        with patch('capa.safe_exec.safe_exec.codejail_safe_exec') as mock_exec:
+            safe_exec("a = 17", {}, cache=other_process_cache, limit_overrides_context='course_2')
+            assert not mock_exec.called
+            safe_exec("a = 17", {}, cache=other_process_cache, limit_overrides_context='course_1')
+            assert mock_exec.called
+
+    def test_generation_read_once_per_ttl(self):
+        backend = DictBackend()
+        cache = SafeExecResultCache(backend=backend)
+        with patch.object(backend, 'get', wraps=backend.get) as mock_get:
+            with patch('capa.safe_exec.result_cache.time.time', return_value=1000):
+                key = cache.make_key("a = 1", {}, 1, context='course_1')
+                assert cache.make_key("a = 1", {}, 1, context='course_1') == key
+                assert mock_get.call_count == 1
+
+                cache.evict_context('course_1')
+                evicted_key = cache.make_key("a = 1", {}, 1, context='course_1')
+                assert evicted_key != key
+                assert mock_get.call_count == 1
+
+            # Another process evicts the context.
+            backend.set(cache._generation_key('course_1'), 'other')  # pylint: disable=protected-access
+            with patch('capa.safe_exec.result_cache.time.time', return_value=1000 + cache.GENERATION_TTL - 1):
+                assert cache.make_key("a = 1", {}, 1, context='course_1') == evicted_key
+            with patch('capa.safe_exec.result_cache.time.time', return_value=1000 + cache.GENERATION_TTL):
+                assert cache.make_key("a = 1", {}, 1, context='course_1') not in (key, evicted_key)
+            assert mock_get.call_count == 2
+
+    def test_slug_stats_are_bounded(self):
+        cache = SafeExecResultCache()
+        with patch.object(SafeExecResultCache, 'MAX_SLUGS', 2):
+            cache.get('a', slug='problem_1')
+            cache.get('a', slug='problem_2')
+            cache.get('a', slug='problem_1')
+            cache.get('a', slug='problem_3')
+
+        assert set(cache.stats()['slugs']) == {'problem_1', 'problem_3'}
+        assert cache.hit_rate('problem_2') is None
+
+    def test_no_local_tier(self):
+        backend = DictBackend()
+        cache = SafeExecResultCache(backend=backend, max_entries=0)
+        safe_exec("a = 17", {}, cache=cache)
+        assert cache.stats()['entries'] == 0
+        assert len(backend.cache) == 1
+        assert list(backend.timeouts.values()) == [300]
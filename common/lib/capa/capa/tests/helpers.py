@@ -69,6 +69,7 @@ def test_capa_system(render_template=None):
         i18n=gettext.NullTranslations(),
         node_path=os.environ.get("NODE_PATH", "/usr/local/lib/node_modules"),
         render_template=render_template or tst_render_template,
+        safe_exec_cache=None,
         seed=0,
         STATIC_URL='/dummy-static/',
         STATUS_CLASS=Status,
@@ -12,8 +12,10 @@ from lxml import etree
 from markupsafe import Markup
 from mock import patch
 
+from capa.capa_problem import _parse_problem_text
 from capa.responsetypes import LoncapaProblemError
-from capa.tests.helpers import new_loncapa_problem
+from capa.safe_exec import SafeExecResultCache
+from capa.tests.helpers import new_loncapa_problem, test_capa_system
 from openedx.core.djangolib.markup import HTML
 
 
@@ -397,6 +399,64 @@ class CAPAProblemTest(unittest.TestCase):
         problem = new_loncapa_problem(xml.format(correctness=False))
         assert problem is not None
 
+    def test_parsed_problem_is_cached(self):
+        """
+        Verify that problems built from the same xml only parse it once, and
+        each get their own copy of the tree.
+        """
+        xml = """
+        <problem>
+            <startouttext/>Pick the number.<endouttext/>
+            <multiplechoiceresponse>
+                <choicegroup type="MultipleChoice" shuffle="true">
+                    <choice correct="false">One</choice>
+                    <choice correct="true">Two</choice>
+                    <choice correct="false">Three</choice>
+                </choicegroup>
+            </multiplechoiceresponse>
+        </problem>
+        """
+        _parse_problem_text.cache_clear()
+        with patch('capa.capa_problem.etree.XML', wraps=etree.XML) as mock_xml:
+            problem1 = new_loncapa_problem(xml, problem_id='cached', seed=1)
+            problem2 = new_loncapa_problem(xml, problem_id='cached', seed=2)
+        assert mock_xml.call_count == 1
+        assert problem1.tree is not problem2.tree
+        assert '<text>Pick the number.</text>' in problem1.problem_text
+        assert problem1.problem_text == problem2.problem_text
+        assert problem1.tree.xpath('//choicegroup/@id') == ['cached_2_1']
+        assert problem2.tree.xpath('//choicegroup/@id') == ['cached_2_1']
+
+        edited_problem = new_loncapa_problem(xml.replace('Pick', 'Choose'), problem_id='cached', seed=1)
+        assert '<text>Choose the number.</text>' in edited_problem.problem_text
+
+    @ddt.data(
+        ('true', None, 1),
+        ('false', 'learner_1', 2),
+    )
+    @ddt.unpack
+    def test_anonymous_scripts(self, anonymous_scripts, seen_id, num_entries):
+        """
+        Verify that the scripts of problems with anonymous_scripts="true" don't see
+        the learner's id, and share their cached results between learners.
+        """
+        xml = """
+        <problem anonymous_scripts="{}">
+            <script type="loncapa/python">seen_id = anonymous_student_id</script>
+        </problem>
+        """.format(anonymous_scripts)
+        cache = SafeExecResultCache()
+        problems = []
+        for anonymous_student_id in ('learner_1', 'learner_2'):
+            capa_system = test_capa_system()
+            capa_system.anonymous_student_id = anonymous_student_id
+            capa_system.safe_exec_cache = cache
+            problems.append(new_loncapa_problem(xml, capa_system=capa_system, seed=1))
+
+        assert problems[0].context['seen_id'] == seen_id
+        assert problems[1].context['anonymous_student_id'] == 'learner_2'
+        assert cache.stats()['entries'] == num_entries
+
 
 @ddt.ddt
 class CAPAMultiInputProblemTest(unittest.TestCase):
@@ -0,0 +1,99 @@
+"""
+Performance test for building, rendering and checking large multi-part capa problems.
+"""
+
+
+import unittest
+
+import ddt
+import pytest
+
+from capa.capa_problem import _parse_problem_text
+from capa.tests.helpers import new_loncapa_problem
+
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of parts of the problems, one response each.
+PARTS_PER_TEST = (10, 50, 200)
+
+# The xml of each kind of part, and the correct answer to it.
+PART_TEMPLATES = (
+    (
+        '<numericalresponse answer="{index}"><responseparam type="tolerance" default="1%"/>'
+        '<formulaequationinput/></numericalresponse>',
+        '{index}',
+    ),
+    (
+        '<stringresponse answer="part {index}" type="ci"><textline size="20"/></stringresponse>',
+        'Part {index}',
+    ),
+    (
+        '<optionresponse><optioninput options="(\'red\',\'green\',\'blue\')" correct="green"/></optionresponse>',
+        'green',
+    ),
+    (
+        '<multiplechoiceresponse><choicegroup type="MultipleChoice">'
+        '<choice correct="false">Part {index}</choice><choice correct="true">Not part {index}</choice>'
+        '</choicegroup></multiplechoiceresponse>',
+        'choice_1',
+    ),
+    (
+        '<formularesponse type="ci" samples="x,y@1,1:10,10#20" answer="{index}*x+y^2">'
+        '<responseparam type="tolerance" default="0.01"/><textline size="20"/></formularesponse>',
+        'y^2+{index}*x',
+    ),
+)
+
+
+def make_problem(num_parts):
+    """
+    Return the xml of a problem with num_parts parts, and its correct answers.
+    """
+    parts = []
+    answers = {}
+    for index in range(num_parts):
+        part_xml, answer = PART_TEMPLATES[index % len(PART_TEMPLATES)]
+        parts.append('<p>Part {index}</p>'.format(index=index) + part_xml.format(index=index))
+        answers['1_{}_1'.format(index + 2)] = answer.format(index=index)
+    return '<problem>{}</problem>'.format(''.join(parts)), answers
+
+
+@ddt.ddt
+class CapaProblemPerfTest(unittest.TestCase):
+    """
+    This class exists to compare the time taken to render and check large problems
+    when each learner's problem parses its xml, and when it copies a cached tree.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*PARTS_PER_TEST)
+    def test_render_and_check(self, num_parts):
+        """
+        Generate timings for rendering and checking a problem with num_parts parts.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        problem_xml, answers = make_problem(num_parts)
+
+        def render(seed):
+            return new_loncapa_problem(problem_xml, seed=seed, use_capa_render_template=True).get_html()
+
+        def check(seed):
+            return new_loncapa_problem(problem_xml, seed=seed).grade_answers(answers).get_dict()
+
+        correct_map = check(1)
+        assert all(correct_map[answer_id]['correctness'] == 'correct' for answer_id in answers)
+
+        with CodeBlockTimer("CapaProblem:{}".format(num_parts)):
+            for name, action in (('render', render), ('check', check)):
+                _parse_problem_text.cache_clear()
+                with CodeBlockTimer("{}_uncached".format(name)):
+                    action(1)
+                with CodeBlockTimer("{}_cached".format(name)):
+                    action(2)
@@ -0,0 +1,65 @@
+"""
+Tests for compiled formulas
+"""
+
+
+import unittest
+from cmath import isnan
+
+import ddt
+import random2 as random
+from calc import UndefinedVariable, UnmatchedParenthesis, evaluator
+
+from capa.formula import CompiledFormula, get_compiled_formula
+from capa.util import compare_with_tolerance
+
+
+@ddt.ddt
+class CompiledFormulaTest(unittest.TestCase):
+    """
+    Test that compiled formulas evaluate like calc.evaluator
+    """
+
+    def setUp(self):
+        super(CompiledFormulaTest, self).setUp()  # lint-amnesty, pylint: disable=super-with-arguments
+        self.var_dict_list = [
+            {'x': random.uniform(-10, 10), 'y': random.uniform(1, 10), 'R': random.uniform(1, 10)}
+            for _ in range(20)
+        ]
+
+    @ddt.data(
+        'x+2*y', 'x^2^0.5', 'x^0.5', 'sqrt(x)', 'sin(x)*cos(y)/tan(x)', 'arccot(x)', 'x||y', 'x||0', 'x*i^2',
+        '-x+5%', '3.2e-3*x', 'e^x - pi', 'x*1e999', '10*x + 0*1e999', '1/sin(x-x)', 'exp(1000*y)', 'R^(-x)', '2', '',
+    )
+    def test_evaluate(self, math_expr):
+        expected = [evaluator(var_dict, dict(), math_expr) for var_dict in self.var_dict_list]
+        values = CompiledFormula(math_expr, ('x', 'y', 'R')).evaluate(self.var_dict_list)
+        assert len(values) == len(expected)
+        for value, expected_value in zip(values, expected):
+            if isnan(expected_value):
+                assert isnan(value)
+            else:
+                assert compare_with_tolerance(value, expected_value)
+
+    @ddt.data(('r*x', False), ('R*x', True))
+    @ddt.unpack
+    def test_case_sensitive(self, math_expr, case_sensitive):
+        values = CompiledFormula(math_expr, ('x', 'y', 'R'), case_sensitive).evaluate(self.var_dict_list)
+        for value, var_dict in zip(values, self.var_dict_list):
+            assert compare_with_tolerance(value, var_dict['R'] * var_dict['x'])
+
+    def test_errors(self):
+        with self.assertRaisesRegex(UndefinedVariable, 'z not permitted in answer as a variable'):
+            CompiledFormula('x+z', ('x', 'y', 'R'))
+        with self.assertRaisesRegex(UndefinedVariable, r'did you mean R\?'):
+            CompiledFormula('r*x', ('x', 'y', 'R'), case_sensitive=True)
+        with self.assertRaises(UnmatchedParenthesis):
+            CompiledFormula('(x+y', ('x', 'y', 'R'))
+        with self.assertRaises(ZeroDivisionError):
+            CompiledFormula('x/(y-y)', ('x', 'y', 'R')).evaluate(self.var_dict_list)
+
+    def test_get_compiled_formula(self):
+        formula = get_compiled_formula('x+y', ('x', 'y'), False)
+        assert get_compiled_formula('x+y', ('x', 'y'), False) is formula
+        assert get_compiled_formula('x+y', ('x', 'y'), True) is not formula
+        assert get_compiled_formula('x+y', ('x', 'y', 'z'), False) is not formula
@@ -23,6 +23,7 @@ from pytz import UTC
 from six import text_type
 
 from capa.correctmap import CorrectMap
+from capa.formula import CompiledFormula, get_compiled_formula
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from capa.tests.helpers import load_fixture, new_loncapa_problem, test_capa_system
 from capa.tests.response_xml_factory import (
@@ -574,6 +575,25 @@ class FormulaResponseTest(ResponseTest):
         assert list(problem.responders.values())[0].validate_answer('14*x')
         assert not list(problem.responders.values())[0].validate_answer('3*y+2*x')
 
+    def test_instructor_answer_compiled_once(self):
+        """
+        Test that the instructor answer is compiled once for all the student
+        answers, and each student answer once for all the samples.
+        """
+        sample_dict = {'x': (1, 2), 'y': (1, 2)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance="1%",
+                                     answer="x*y+17")
+        get_compiled_formula.cache_clear()
+        with mock.patch('capa.formula.CompiledFormula', wraps=CompiledFormula) as mock_instructor_formula:
+            with mock.patch('capa.responsetypes.CompiledFormula', wraps=CompiledFormula) as mock_student_formula:
+                self.assert_grade(problem, 'y*x+17', 'correct')
+                self.assert_grade(problem, 'x*y+18', 'incorrect')
+                self.assert_grade(problem, 'x*(y+17)', 'incorrect')
+        assert mock_instructor_formula.call_count == 1
+        assert mock_student_formula.call_count == 3
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-class-docstring
     xml_factory_class = StringResponseXMLFactory
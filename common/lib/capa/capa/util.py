@@ -7,6 +7,7 @@ import logging
 import re
 from cmath import isinf, isnan
 from decimal import Decimal
+from functools import lru_cache
 
 import bleach
 import six
@@ -22,6 +23,14 @@ default_tolerance = '0.001%'
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _evaluate_tolerance(tolerance):
+    """
+    Return the value of the tolerance string, which is only parsed once.
+    """
+    return evaluator(dict(), dict(), tolerance)
+
+
 def compare_with_tolerance(student_complex, instructor_complex, tolerance=default_tolerance, relative_tolerance=False):
     """
     Compare student_complex to instructor_complex with maximum tolerance tolerance.
@@ -61,11 +70,11 @@ def compare_with_tolerance(student_complex, instructor_complex, tolerance=defaul
         if tolerance == default_tolerance:
             relative_tolerance = True
         if tolerance.endswith('%'):
-            tolerance = evaluator(dict(), dict(), tolerance[:-1]) * 0.01
+            tolerance = _evaluate_tolerance(tolerance[:-1]) * 0.01
             if not relative_tolerance:
                 tolerance = tolerance * abs(instructor_complex)
         else:
-            tolerance = evaluator(dict(), dict(), tolerance)
+            tolerance = _evaluate_tolerance(tolerance)
 
     if relative_tolerance:
         tolerance = tolerance * max(abs(student_complex), abs(instructor_complex))
@@ -345,7 +345,8 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
             seed=self.runtime.seed,      # Why do we do this if we have self.seed?
             STATIC_URL=self.runtime.STATIC_URL,
             xqueue=self.runtime.xqueue,
-            matlab_api_key=self.matlab_api_key
+            matlab_api_key=self.matlab_api_key,
+            safe_exec_cache=self.runtime.service(self, 'safe_exec_cache'),
         )
 
         return LoncapaProblem(
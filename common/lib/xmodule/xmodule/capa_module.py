@@ -38,6 +38,7 @@ log = logging.getLogger("edx.courseware")
 @XBlock.wants('user')
 @XBlock.needs('i18n')
 @XBlock.wants('call_to_action')
+@XBlock.wants('safe_exec_cache')
 class ProblemBlock(
         CapaMixin, RawMixin, XmlMixin, EditingMixin,
         XModuleDescriptorToXBlockMixin, XModuleToXBlockMixin, HTMLSnippet, ResourceTemplates, XModuleMixin):
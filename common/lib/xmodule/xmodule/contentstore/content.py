@@ -223,7 +223,7 @@ class StaticContent(object):  # lint-amnesty, pylint: disable=missing-class-docs
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
     @staticmethod
-    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
+    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True, asset_index=None):
         """
         Returns a fully-qualified path to a piece of static content.
 
@@ -233,6 +233,9 @@ class StaticContent(object):  # lint-amnesty, pylint: disable=missing-class-docs
         Args:
             course_key: key to the course which owns this asset
             path: the path to said content
+            asset_index: (optional) a dict from the name of each asset of the course to
+                its (locked, content_digest), used instead of looking the asset up in the
+                contentstore. The assets of the course missing from it are treated as not found.
 
         Returns:
             string: fully-qualified path to asset
@@ -247,13 +250,18 @@ class StaticContent(object):  # lint-amnesty, pylint: disable=missing-class-docs
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        if asset_index is not None and asset_key.course_key == course_key and asset_key.block_type == 'asset':
+            # If the asset isn't in the index, just treat it as if it's locked.
+            locked, content_digest = asset_index.get(asset_key.block_id, (True, None))
+            serve_from_cdn = not locked
+        else:
+            try:
+                content = AssetManager.find(asset_key, as_stream=True)
+                serve_from_cdn = not getattr(content, "locked", True)
+                content_digest = getattr(content, "content_digest", None)
+            except (ItemNotFoundError, NotFoundError):
+                # If we can't find the item, just treat it as if it's locked.
+                serve_from_cdn = False
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -269,7 +277,7 @@ class StaticContent(object):  # lint-amnesty, pylint: disable=missing-class-docs
         for query_name, query_val in query_params:
             if query_val.startswith("/static/"):
                 new_val = StaticContent.get_canonicalized_asset_path(
-                    course_key, query_val, base_url, excluded_exts, encode=False)
+                    course_key, query_val, base_url, excluded_exts, encode=False, asset_index=asset_index)
                 updated_query_params.append((query_name, new_val.encode('utf-8')))
             else:
                 # Make sure we're encoding Unicode strings down to their byte string
@@ -295,6 +303,12 @@ class StaticContent(object):  # lint-amnesty, pylint: disable=missing-class-docs
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
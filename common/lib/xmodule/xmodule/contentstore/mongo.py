@@ -3,8 +3,14 @@ MongoDB/GridFS-level code for the contentstore.
 """
 
 
+import calendar
+import io
 import json
 import os
+import posixpath
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import gridfs
 import pymongo
@@ -23,6 +29,13 @@ from xmodule.util.misc import escape_invalid_characters
 
 from .content import ContentStore, StaticContent, StaticContentStream
 
+# The asset attributes which aren't exported to the assets policy file.
+NON_POLICY_ASSET_ATTRS = frozenset(['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key'])
+
+# The assets larger than this are streamed from GridFS into a course archive
+# rather than read ahead.
+EXPORT_READ_AHEAD_MAX_LENGTH = 8 * 1024 * 1024
+
 
 class MongoContentStore(ContentStore):
     """
@@ -178,16 +191,12 @@ class MongoContentStore(ContentStore):
     def export(self, location, output_directory):  # lint-amnesty, pylint: disable=missing-function-docstring
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        export_dir, export_name = self._get_export_path(content)
+        output_directory = output_directory + '/' + export_dir
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
         disk_fs = OSFS(output_directory)
 
         with disk_fs.open(export_name, 'wb') as asset_file:
@@ -217,13 +226,74 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in six.iteritems(asset):
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+            _add_asset_to_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_all_for_course_to_tar(self, course_key, tar_file, output_directory, max_workers=4):
+        """
+        Add all of this course's assets to a tar archive, and return the assets'
+        attributes to put in the policy file.
+
+        The assets are read from GridFS by max_workers threads, which read at
+        most 2 * max_workers assets ahead of the one added to the archive. The
+        assets larger than EXPORT_READ_AHEAD_MAX_LENGTH are streamed into the
+        archive instead of being read ahead.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            tar_file (tarfile.TarFile): the archive, opened for writing
+            output_directory: the directory of the archive under which to put all the asset files
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for asset in assets:
+                as_stream = asset.get('length', 0) > EXPORT_READ_AHEAD_MAX_LENGTH
+                pending.append(executor.submit(self.find, asset['asset_key'], as_stream=as_stream))
+                _add_asset_to_policy(policy, asset)
+                if len(pending) >= 2 * max_workers:
+                    self._add_to_tar(pending.popleft().result(), tar_file, output_directory)
+            while pending:
+                self._add_to_tar(pending.popleft().result(), tar_file, output_directory)
+
+        return policy
+
+    def _add_to_tar(self, content, tar_file, output_directory):
+        """
+        Add an asset to a tar archive under output_directory.
+        """
+        export_dir, export_name = self._get_export_path(content)
+        tarinfo = tarfile.TarInfo(posixpath.normpath(posixpath.join(output_directory, export_dir, export_name)))
+        tarinfo.mode = 0o644
+        if content.last_modified_at is not None:
+            tarinfo.mtime = calendar.timegm(content.last_modified_at.utctimetuple())
+
+        if isinstance(content, StaticContentStream):
+            tarinfo.size = content.length
+            try:
+                tar_file.addfile(tarinfo, content._stream)  # lint-amnesty, pylint: disable=protected-access
+            finally:
+                content.close()
+        else:
+            tarinfo.size = len(content.data)
+            tar_file.addfile(tarinfo, io.BytesIO(content.data))
+
+    def _get_export_path(self, content):
+        """
+        Return the directory, relative to the static directory, and the name of an exported asset.
+        """
+        export_dir = ''
+        if content.import_path is not None:
+            export_dir = os.path.dirname(content.import_path)
+
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+        return export_dir, export_name
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -603,6 +673,15 @@ class MongoContentStore(ContentStore):
         )
 
 
+def _add_asset_to_policy(policy, asset):
+    """
+    Add the attributes of an asset to the assets policy.
+    """
+    for attr, value in six.iteritems(asset):
+        if attr not in NON_POLICY_ASSET_ATTRS:
+            policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
@@ -121,5 +121,65 @@
                 });
             });
         });
+
+        describe('Lazy units', function() {
+            var fetched = function(content) {
+                return $.Deferred().resolve({fragment: {content: content, resources: []}}).promise();
+            };
+
+            beforeEach(function() {
+                loadFixtures('sequence_lazy.html');
+                this.sequence = new Sequence($('.xblock-student_view-sequential'));
+            });
+
+            it('renders the units rendered with the sequence without fetching them', function() {
+                spyOn($, 'postWithPrefix');
+                expect(this.sequence.content_container).toContainText('Unit 101');
+                expect($.postWithPrefix).not.toHaveBeenCalled();
+            });
+
+            it('fetches a unit the first time it is shown', function() {
+                spyOn($, 'postWithPrefix').and.returnValue(fetched('<p>Unit 102</p>'));
+                this.sequence.render(2);
+                expect($.postWithPrefix).toHaveBeenCalledWith('/seq/render_unit/2');
+                expect(this.sequence.position).toBe(2);
+                expect(this.sequence.content_container).toContainText('Unit 102');
+                expect(this.sequence.contents.eq(1).data('fetched')).toBe(true);
+
+                this.sequence.render(1);
+                this.sequence.render(2);
+                expect($.postWithPrefix.calls.count()).toBe(1);
+                expect(this.sequence.content_container).toContainText('Unit 102');
+            });
+
+            it('shows an error notice if a unit cannot be fetched, and fetches it again', function() {
+                spyOn($, 'postWithPrefix').and.returnValue($.Deferred().reject().promise());
+                this.sequence.render(2);
+                expect(this.sequence.position).toBe(2);
+                expect(this.sequence.content_container.find('.outside-app')).toExist();
+                expect(this.sequence.contents.eq(1).data('fetched')).toBeFalsy();
+
+                $.postWithPrefix.and.returnValue(fetched('<p>Unit 102</p>'));
+                this.sequence.render(1);
+                this.sequence.render(2);
+                expect($.postWithPrefix.calls.count()).toBe(2);
+                expect(this.sequence.content_container).toContainText('Unit 102');
+                expect(this.sequence.content_container.find('.outside-app')).not.toExist();
+            });
+
+            it('stays on the unit the learner moved to when an earlier fetch finishes', function() {
+                var firstFetch = $.Deferred();
+                spyOn($, 'postWithPrefix').and.returnValues(firstFetch.promise(), fetched('<p>Unit 103</p>'));
+                this.sequence.render(2);
+                expect(this.sequence.position).toBe(1);
+                this.sequence.render(3);
+                expect(this.sequence.position).toBe(3);
+
+                firstFetch.resolve({fragment: {content: '<p>Unit 102</p>', resources: []}});
+                expect(this.sequence.position).toBe(3);
+                expect(this.sequence.content_container).toContainText('Unit 103');
+                expect(this.sequence.contents.eq(1).data('fetched')).toBe(true);
+            });
+        });
     });
 }).call(this);
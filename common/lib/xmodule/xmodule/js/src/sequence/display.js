@@ -1,5 +1,5 @@
 /* eslint-disable no-underscore-dangle */
-/* globals Logger, interpolate */
+/* globals Logger, interpolate, $script, edx */
 
 (function() {
     'use strict';
@@ -226,10 +226,24 @@
             this.updateButtonState(nextButtonClass, this.selectNext, isLastTab, this.nextUrl);
         };
 
-        Sequence.prototype.render = function(newPosition) {
+        Sequence.prototype.render = function(newPosition, skipFetch) {
             var bookmarked, currentTab, modxFullUrl, sequenceLinks,
                 self = this;
+            this.pendingPosition = newPosition;
             if (this.position !== newPosition) {
+                // Units that weren't rendered with the sequence are fetched before being shown, unless the
+                // learner has moved on to another unit in the meantime. A unit that couldn't be fetched is shown
+                // with an error notice, and fetched again the next time it is shown.
+                currentTab = this.contents.eq(newPosition - 1);
+                if (currentTab.data('fetch-url') && !currentTab.data('fetched') && !skipFetch) {
+                    this.fetchUnit(currentTab).always(function() {
+                        if (self.pendingPosition === newPosition) {
+                            self.render(newPosition, true);
+                        }
+                    });
+                    return;
+                }
+
                 if (this.position) {
                     this.mark_visited(this.position);
                     if (this.showCompletion) {
@@ -247,7 +261,6 @@
                 // Added for aborting video bufferization, see ../video/10_main.js
                 this.el.trigger('sequence:change');
                 this.mark_active(newPosition);
-                currentTab = this.contents.eq(newPosition - 1);
                 bookmarked = this.el.find('.active .bookmark-icon').hasClass('bookmarked');
 
                 // update the data-attributes with latest contents only for updated problems.
@@ -270,7 +283,12 @@
                             .data('attempts-used', latestResponse.attempts_used);
                     });
                 }
-                XBlock.initializeBlocks(this.content_container, this.requestToken);
+                // Fetched units are rendered with another request, so they have a different request token.
+                if (currentTab.data('fetch-url')) {
+                    XBlock.initializeBlocks(this.content_container);
+                } else {
+                    XBlock.initializeBlocks(this.content_container, this.requestToken);
+                }
 
                 // For embedded circuit simulator exercises in 6.002x
                 if (window.hasOwnProperty('update_schematics')) {
@@ -287,6 +305,95 @@
             }
         };
 
+        /**
+        * Fetches the unit of the given tab from the sequence, and loads the resources it depends on.
+        * The unit's html is then kept in the tab like the html of the units rendered with the sequence.
+        * If the unit can't be fetched, the tab gets an error notice instead, and isn't marked as fetched.
+        * @param tab The .seq_contents element of the unit, with the url to fetch it from
+        * @returns {Promise} A promise representing the fetching of the unit
+        */
+        Sequence.prototype.fetchUnit = function(tab) {
+            var self = this;
+            return $.postWithPrefix(tab.data('fetch-url')).then(function(response) {
+                var fragment = response.fragment;
+                return self.loadUnitResources(fragment.resources || []).then(function() {
+                    tab.text(fragment.content).data('fetched', true);
+                });
+            }).fail(function() {
+                tab.text(self.unitErrorHtml());
+            });
+        };
+
+        /**
+        * Returns the notice shown in place of a unit that couldn't be fetched, like the one of units that
+        * fail to render with the sequence.
+        * @returns {String} The html of the notice
+        */
+        Sequence.prototype.unitErrorHtml = function() {
+            return edx.HtmlUtils.interpolateHtml(
+                edx.HtmlUtils.HTML('<section class="outside-app"><h1>{title}</h1><p>{message}</p></section>'),
+                {
+                    title: gettext('There has been an error on the servers'),
+                    message: gettext("We're sorry, this module is temporarily unavailable. Our staff is working to fix it as soon as possible.")  // eslint-disable-line max-len
+                }
+            ).toString();
+        };
+
+        /**
+        * Loads the resources of a fetched unit that aren't loaded in the page yet, in order.
+        * @param resources The resources of the unit's fragment
+        * @returns {Promise} A promise representing the loading of the resources
+        */
+        Sequence.prototype.loadUnitResources = function(resources) {
+            var self = this;
+            window.loadedXBlockResources = window.loadedXBlockResources || [];
+            return _.reduce(resources, function(loaded, resource) {
+                return loaded.then(function() {
+                    if (_.findWhere(window.loadedXBlockResources, resource)) {
+                        return null;
+                    }
+                    window.loadedXBlockResources.push(resource);
+                    return self.loadResource(resource);
+                });
+            }, $.Deferred().resolve().promise());
+        };
+
+        /**
+        * Loads the given resource into the page.
+        * @param resource The resource to be loaded
+        * @returns {Promise} A promise representing the loading of the resource
+        */
+        Sequence.prototype.loadResource = function(resource) {
+            // We give XBlock fragments free-reign to add javascript and CSS to
+            // to the page, so XSS escaping doesn't matter much in this context
+            var $head = $('head'),
+                loaded;
+            if (resource.mimetype === 'text/css') {
+                if (resource.kind === 'text') {
+                    // xss-lint: disable=javascript-jquery-append,javascript-concat-html
+                    $head.append("<style type='text/css'>" + resource.data + '</style>');
+                } else if (resource.kind === 'url') {
+                    // xss-lint: disable=javascript-jquery-append,javascript-concat-html
+                    $head.append("<link rel='stylesheet' href='" + resource.data + "' type='text/css'>");
+                }
+            } else if (resource.mimetype === 'application/javascript') {
+                if (resource.kind === 'text') {
+                    // xss-lint: disable=javascript-jquery-append,javascript-concat-html
+                    $head.append('<script>' + resource.data + '</script>');
+                } else if (resource.kind === 'url') {
+                    loaded = $.Deferred();
+                    $script(resource.data, resource.data, function() {
+                        loaded.resolve();
+                    });
+                    return loaded.promise();
+                }
+            } else if (resource.mimetype === 'text/html' && resource.placement === 'head') {
+                // xss-lint: disable=javascript-jquery-append
+                $head.append(resource.data);
+            }
+            return $.Deferred().resolve().promise();
+        };
+
         Sequence.prototype.goto = function(event) {
             var alertTemplate, alertText, isBottomNav, newPosition, widgetPlacement;
             event.preventDefault();
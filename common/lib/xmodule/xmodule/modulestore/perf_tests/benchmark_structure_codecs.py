@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the size and speed of the codecs used by the CourseStructureCache
+on course structures exported from the split modulestore.
+
+Structures can be exported with mongoexport (one extended JSON document per
+line) or mongodump (a .bson file), e.g.:
+
+    mongoexport --db edxapp --collection modulestore.structures \\
+        --query '{"_id": {"$oid": "5e6f..."}}' --out structures.json
+"""
+
+
+import timeit
+
+import bson
+from bson import json_util
+
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURE_CODECS, structure_from_mongo
+
+try:
+    import click
+except ImportError:
+    click = None
+
+
+def load_structures(structures_file):
+    """
+    Yield the structures in `structures_file`, a mongodump .bson file or a
+    mongoexport file of extended JSON documents.
+    """
+    if structures_file.name.endswith('.bson'):
+        docs = bson.decode_file_iter(structures_file)
+    else:
+        docs = (json_util.loads(line) for line in structures_file if line.strip())
+    for doc in docs:
+        yield structure_from_mongo(doc)
+
+
+def benchmark_codec(codec, structure, repeat):
+    """
+    Return the compressed size, uncompressed size, and the best encode and
+    decode times in seconds of `codec` on `structure`, and whether the
+    structure survives the round trip.
+    """
+    data, uncompressed_size = codec.encode(structure)
+    encode_seconds = min(timeit.repeat(lambda: codec.encode(structure), number=1, repeat=repeat))
+    decode_seconds = min(timeit.repeat(lambda: codec.decode(data), number=1, repeat=repeat))
+    round_trip = codec.decode(data)[0] == structure
+    return len(data), uncompressed_size, encode_seconds, decode_seconds, round_trip
+
+
+if click is not None:
+    @click.command()
+    @click.argument('structures_file', type=click.File('rb'))
+    @click.option('--repeat', type=click.INT, default=10, help='Number of times each structure is encoded and decoded.')
+    def cli(structures_file, repeat):
+        """
+        Print the size and speed of each codec on each exported structure.
+        """
+        for structure in load_structures(structures_file):
+            click.echo(u'{}: {} blocks'.format(structure['_id'], len(structure['blocks'])))
+            for name, codec in sorted(STRUCTURE_CODECS.items()):
+                compressed_size, uncompressed_size, encode_seconds, decode_seconds, round_trip = benchmark_codec(
+                    codec, structure, repeat,
+                )
+                click.echo(
+                    u'  {:<10} compressed: {:>11,d} B  uncompressed: {:>11,d} B  '
+                    u'encode: {:>8.2f} ms  decode: {:>8.2f} ms  round trip: {}'.format(
+                        name,
+                        compressed_size,
+                        uncompressed_size,
+                        encode_seconds * 1000,
+                        decode_seconds * 1000,
+                        'ok' if round_trip else 'FAILED',
+                    )
+                )
+
+if __name__ == '__main__':
+    if click is not None:
+        cli()  # pylint: disable=no-value-for-parameter
+    else:
+        print("Aborted! Module 'click' is not installed.")
@@ -0,0 +1,71 @@
+"""
+Performance test for reading the structures of many courses from the split modulestore.
+"""
+
+
+import math
+import unittest
+
+import ddt
+import pytest
+
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.split_mongo.mongo_connection import STRUCTURES_CHUNK_SIZE
+from xmodule.modulestore.tests.factories import check_mongo_calls
+from xmodule.modulestore.tests.utils import VersioningModulestoreBuilder
+
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of courses whose structures are read per test run.
+COURSE_AMOUNT_PER_TEST = (1, 10, 50)
+
+
+@ddt.ddt
+class BulkStructureReads(unittest.TestCase):
+    """
+    This class exists to compare the time taken to read the structures of many courses
+    one course at a time, and with iter_course_structures.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*COURSE_AMOUNT_PER_TEST)
+    def test_bulk_structure_reads(self, num_courses):
+        """
+        Generate timings and query counts for reading the structures of num_courses courses.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        # The course_structure_cache is a dummy cache during testing, so every structure is read from mongo.
+        with VersioningModulestoreBuilder().build() as (__, store):
+            course_keys = [
+                store.create_course('perf', 'course', 'run{}'.format(index), ModuleStoreEnum.UserID.test).id
+                for index in range(num_courses)
+            ]
+            # Remove the version from the keys, so that their indexes are looked up.
+            course_keys = [course_key.replace(version_guid=None) for course_key in course_keys]
+
+            def serial_reads():
+                return [store._lookup_course(course_key) for course_key in course_keys]  # pylint: disable=protected-access
+
+            def bulk_reads():
+                return list(store.iter_course_structures(course_keys))
+
+            # One index and one structure query per course, or one index query for all of them
+            # and one structure query per chunk.
+            with check_mongo_calls(2 * num_courses):
+                serial_envelopes = serial_reads()
+            with check_mongo_calls(1 + math.ceil(num_courses / STRUCTURES_CHUNK_SIZE)):
+                bulk_envelopes = bulk_reads()
+            assert sorted(serial_envelopes, key=repr) == sorted(bulk_envelopes, key=repr)
+
+            with CodeBlockTimer("BulkStructureReads:{}".format(num_courses)):
+                with CodeBlockTimer("serial_reads"):
+                    serial_reads()
+                with CodeBlockTimer("bulk_reads"):
+                    bulk_reads()
@@ -3,17 +3,22 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 
 
+import copy
 import datetime
 import logging
 import math
 import re
+import threading
 import zlib
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
+import bson
 import pymongo
 import pytz
 import six
+from bson.codec_options import CodecOptions
 from six.moves import cPickle as pickle
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
@@ -25,11 +30,18 @@ from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
     DJANGO_AVAILABLE = False
 
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
@@ -140,6 +152,9 @@ class QueryTimer(object):
 
 TIMER = QueryTimer(__name__, 0.01)
 
+# Number of structures MongoConnection.get_structures reads in each query.
+STRUCTURES_CHUNK_SIZE = 20
+
 
 def structure_from_mongo(structure, course_context=None):
     """
@@ -203,67 +218,338 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def copy_structure(structure):
+    """
+    Return a copy of `structure` whose blocks, including their field values,
+    can be modified in place without affecting `structure`.
+
+    Loading a course's blocks merges their definitions' fields into their
+    `fields`, and computes values cached on their `edit_info`, and any reader
+    may modify a mutable field value such as `children`, so each user of a
+    structure shared between requests needs its own copy of all of those.
+    The values of `edit_info` are immutable, so it is copied shallowly.
+    """
+    structure = dict(structure)
+    blocks = {}
+    for block_key, block_data in six.iteritems(structure['blocks']):
+        block_data = copy.copy(block_data)
+        block_data.fields = copy.deepcopy(block_data.fields)
+        block_data.defaults = copy.deepcopy(block_data.defaults)
+        block_data.asides = copy.deepcopy(block_data.asides)
+        block_data.edit_info = copy.copy(block_data.edit_info)
+        blocks[block_key] = block_data
+    structure['blocks'] = blocks
+    return structure
+
+
+class ProcessStructureCache(object):
+    """
+    An in-process LRU cache of course structures, keyed by structure id and
+    bounded by the total serialized size of the structures it holds.
+
+    Structures are immutable by id, so entries never need to be invalidated.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (structure, size)
+        self._entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return a copy of the structure cached for `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy_structure(entry[0])
+
+    def set(self, key, structure, size, max_size):
+        """
+        Cache a copy of `structure`, whose serialized size is `size`, evicting
+        the least recently used structures to stay within `max_size`.
+        """
+        if size > max_size:
+            return
+        structure = copy_structure(structure)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (structure, size)
+            self.size += size
+            while self.size > max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all structures and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return a dict of the size and hit rate of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'structures': len(self._entries),
+                'size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
+
+
+PROCESS_STRUCTURE_CACHE = ProcessStructureCache()
+
+
+class StructureCodec(object):
+    """
+    Serializes course structures for the course_structure_cache.
+
+    Each codec caches structures under its own keys, so entries written with
+    different codecs can coexist while the codec in use is changed.
+    """
+    name = None
+
+    def cache_key(self, key):
+        """
+        Return the cache key of the structure with id `key`.
+        """
+        return u'{}.{}'.format(self.name, key)
+
+    def encode(self, structure, course_context=None):
+        """
+        Return the serialized `structure`, and its size before compression.
+        """
+        raise NotImplementedError
+
+    def decode(self, data, course_context=None):
+        """
+        Return the structure serialized in `data`, and its size before
+        compression.
+        """
+        raise NotImplementedError
+
+
+class ZpickleStructureCodec(StructureCodec):
+    """
+    Pickles structures and compresses them with zlib.
+    """
+    name = 'zpickle'
+
+    def cache_key(self, key):
+        # Structures were cached with this codec, under their ids, before
+        # codecs were introduced.
+        return key
+
+    def encode(self, structure, course_context=None):
+        pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
+        # 1 = Fastest (slightly larger results)
+        return zlib.compress(pickled_data, 1), len(pickled_data)
+
+    def decode(self, data, course_context=None):
+        pickled_data = zlib.decompress(data)
+        if six.PY2:
+            return pickle.loads(pickled_data), len(pickled_data)
+        else:
+            return pickle.loads(pickled_data, encoding='latin-1'), len(pickled_data)
+
+
+class BsonStructureCodec(StructureCodec):
+    """
+    Encodes structures as BSON, in the form they are stored in mongo, and
+    compresses them with zlib.
+    """
+    name = 'bson-zlib'
+    codec_options = CodecOptions(tz_aware=True)
+
+    def compress(self, data):
+        return zlib.compress(data, 1)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+    def encode(self, structure, course_context=None):
+        bson_data = bson.encode(structure_to_mongo(structure, course_context))
+        return self.compress(bson_data), len(bson_data)
+
+    def decode(self, data, course_context=None):
+        bson_data = self.decompress(data)
+        return (
+            structure_from_mongo(bson.decode(bson_data, codec_options=self.codec_options), course_context),
+            len(bson_data),
+        )
+
+
+class BsonLz4StructureCodec(BsonStructureCodec):
+    """
+    Encodes structures as BSON and compresses them with LZ4, which is faster
+    than zlib but compresses less.  Requires the lz4 package.
+    """
+    name = 'bson-lz4'
+
+    def compress(self, data):
+        return lz4.frame.compress(data)
+
+    def decompress(self, data):
+        return lz4.frame.decompress(data)
+
+
+STRUCTURE_CODECS = {
+    codec.name: codec
+    for codec in [ZpickleStructureCodec(), BsonStructureCodec()] + ([BsonLz4StructureCodec()] if LZ4_AVAILABLE else [])
+}
+DEFAULT_STRUCTURE_CODEC = 'zpickle'
+
+
+def get_structure_codec(name):
+    """
+    Return the codec called `name`, or the default codec if it isn't available.
+    """
+    codec = STRUCTURE_CODECS.get(name)
+    if codec is None:
+        log.warning("CourseStructureCache: Unknown or unavailable codec %s, using %s", name, DEFAULT_STRUCTURE_CODEC)
+        codec = STRUCTURE_CODECS[DEFAULT_STRUCTURE_CODEC]
+    return codec
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed when cached, by the
+    codec named by `settings.COURSE_STRUCTURE_CACHE_CODEC`.
+
+    Structures are also kept in `PROCESS_STRUCTURE_CACHE`, up to
+    `settings.COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES` bytes of serialized
+    structures.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.process_max_bytes = 0
+        codec_name = DEFAULT_STRUCTURE_CODEC
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+            self.process_max_bytes = getattr(settings, 'COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES', 0)
+            codec_name = getattr(settings, 'COURSE_STRUCTURE_CACHE_CODEC', DEFAULT_STRUCTURE_CODEC)
+        self.codec = get_structure_codec(codec_name)
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, serialized struct data from cache and deserialize."""
+        if self.process_max_bytes:
+            with TIMER.timer("CourseStructureCache.get_from_process", course_context) as tagger:
+                structure = PROCESS_STRUCTURE_CACHE.get(key)
+                tagger.tag(from_process_cache=str(structure is not None).lower())
+                tagger.measure('process_cache_size', PROCESS_STRUCTURE_CACHE.size)
+                if structure is not None:
+                    return structure
+
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            tagger.tag(codec=self.codec.name)
             try:
-                compressed_pickled_data = self.cache.get(key)
-                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+                compressed_data = self.cache.get(self.codec.cache_key(key))
+                tagger.tag(from_cache=str(compressed_data is not None).lower())
 
-                if compressed_pickled_data is None:
+                if compressed_data is None:
                     # Always log cache misses, because they are unexpected
                     tagger.sample_rate = 1
                     return None
 
-                tagger.measure('compressed_size', len(compressed_pickled_data))
-
-                pickled_data = zlib.decompress(compressed_pickled_data)
-                tagger.measure('uncompressed_size', len(pickled_data))
+                tagger.measure('compressed_size', len(compressed_data))
 
-                if six.PY2:
-                    return pickle.loads(pickled_data)
-                else:
-                    return pickle.loads(pickled_data, encoding='latin-1')
+                structure, uncompressed_size = self.codec.decode(compressed_data, course_context)
+                tagger.measure('uncompressed_size', uncompressed_size)
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
-                self.cache.delete(key)
+                self.cache.delete(self.codec.cache_key(key))
                 return None
 
-    def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        if self.process_max_bytes:
+            PROCESS_STRUCTURE_CACHE.set(key, structure, uncompressed_size, self.process_max_bytes)
+        return structure
+
+    def get_many(self, keys, course_context=None, fill_process_cache=True):
+        """
+        Return a dict of the structures cached for `keys`, pulling the ones
+        which aren't in the process cache from the cache in a single request.
+
+        Those are then kept in the process cache, unless `fill_process_cache`
+        is false.
+        """
+        structures = {}
+        if self.process_max_bytes:
+            for key in keys:
+                structure = PROCESS_STRUCTURE_CACHE.get(key)
+                if structure is not None:
+                    structures[key] = structure
+
         if self.cache is None:
+            return structures
+        cache_keys = {self.codec.cache_key(key): key for key in keys if key not in structures}
+        if not cache_keys:
+            return structures
+
+        with TIMER.timer("CourseStructureCache.get_many", course_context) as tagger:
+            tagger.tag(codec=self.codec.name)
+            tagger.measure('requested', len(cache_keys))
+            cached_data = self.cache.get_many(list(cache_keys))
+            tagger.measure('found', len(cached_data))
+
+            for cache_key, compressed_data in six.iteritems(cached_data):
+                key = cache_keys[cache_key]
+                try:
+                    structure, uncompressed_size = self.codec.decode(compressed_data, course_context)
+                except Exception:  # lint-amnesty, pylint: disable=broad-except
+                    # The cached data is corrupt in some way, get rid of it.
+                    log.warning("CourseStructureCache: Bad data in cache for %s", key)
+                    self.cache.delete(cache_key)
+                    continue
+                structures[key] = structure
+                if self.process_max_bytes and fill_process_cache:
+                    PROCESS_STRUCTURE_CACHE.set(key, structure, uncompressed_size, self.process_max_bytes)
+        return structures
+
+    def set(self, key, structure, course_context=None):
+        """Given a structure, will serialize, compress, and write to cache."""
+        if self.cache is None and not self.process_max_bytes:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
-            tagger.measure('uncompressed_size', len(pickled_data))
-
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            tagger.tag(codec=self.codec.name)
+            compressed_data, uncompressed_size = self.codec.encode(structure, course_context)
+            tagger.measure('uncompressed_size', uncompressed_size)
+            tagger.measure('compressed_size', len(compressed_data))
+
+            if self.process_max_bytes:
+                PROCESS_STRUCTURE_CACHE.set(key, structure, uncompressed_size, self.process_max_bytes)
+            if self.cache is None:
+                return None
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set(self.codec.cache_key(key), compressed_data, None)
 
 
 class MongoConnection(object):
@@ -333,6 +619,49 @@ class MongoConnection(object):
 
             return structure
 
+    def get_structures(self, keys, course_context=None, cache_results=True):
+        """
+        Yield the structures whose ids are in `keys`, in no particular order.
+
+        The structures are read `STRUCTURES_CHUNK_SIZE` at a time, so that only
+        one chunk of them is held at once.  The structures of a chunk which are
+        cached are pulled from the cache in a single request, the others are
+        read from the database with a single query.  Ids of missing structures
+        are ignored.
+
+        The structures read are cached, unless `cache_results` is false, so
+        that scans over many courses don't push the structures in use out of
+        the caches.
+        """
+        keys = list(set(keys))
+        for start in range(0, len(keys), STRUCTURES_CHUNK_SIZE):
+            chunk = keys[start:start + STRUCTURES_CHUNK_SIZE]
+            for structure in self._get_structures_chunk(chunk, course_context, cache_results):
+                yield structure
+
+    @autoretry_read()
+    def _get_structures_chunk(self, keys, course_context, cache_results):
+        """
+        Return the structures whose ids are in `keys`, for get_structures.
+        """
+        cache = CourseStructureCache()
+
+        cached_structures = cache.get_many(keys, course_context, fill_process_cache=cache_results)
+        structures = list(cached_structures.values())
+        missing_keys = [key for key in keys if key not in cached_structures]
+        if not missing_keys:
+            return structures
+        with TIMER.timer("get_structures", course_context) as tagger:
+            tagger.measure("requested_ids", len(missing_keys))
+            docs = list(self.structures.find({'_id': {'$in': missing_keys}}))
+            tagger.measure("structures", len(docs))
+        for doc in docs:
+            structure = structure_from_mongo(doc, course_context)
+            if cache_results:
+                cache.set(structure['_id'], structure, course_context)
+            structures.append(structure)
+        return structures
+
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
         """
@@ -605,6 +934,7 @@ class MongoConnection(object):
         If connections is True, then close the connection to the database as well.
         """
         connection = self.database.client
+        PROCESS_STRUCTURE_CACHE.clear()
 
         if database:
             connection.drop_database(self.database.name)
@@ -631,6 +631,69 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         structures.extend(self.db_connection.find_structures_by_id(list(ids)))
         return structures
 
+    def iter_structures_by_id(self, ids, cache_results=True):
+        """
+        Yield the structures specified in ``ids``, in no particular order.
+
+        Like find_structures_by_id, the structures of the active bulk operations
+        are preferred. The others are read in chunks by
+        MongoConnection.get_structures: from the structure cache in a single
+        request, then from the database in a single query.
+
+        Arguments:
+            ids (list): A list of structure ids
+            cache_results (bool): Whether to cache the structures read
+        """
+        structures = []
+        ids = set(ids)
+
+        for _, record in self._active_records:
+            for structure in record.structures.values():
+                structure_id = structure.get('_id') if structure is not None else None
+                if structure_id in ids:
+                    ids.remove(structure_id)
+                    structures.append(structure)
+
+        for structure in structures:
+            yield structure
+        if ids:
+            for structure in self.db_connection.get_structures(ids, cache_results=cache_results):
+                yield structure
+
+    def iter_course_structures(self, course_keys, cache_results=True):
+        """
+        Yield a CourseEnvelope of the structure of the branch of each of
+        course_keys, as _lookup_course would return, in no particular order.
+
+        The indexes of all the courses are read in a single query, then their
+        structures with iter_structures_by_id, rather than one course at a
+        time. The courses which don't exist, or don't have the branch, are
+        skipped.
+
+        :param course_keys: CourseLocators or LibraryLocators with a branch
+        :param cache_results: whether to cache the structures read, which jobs
+            scanning all courses should turn off
+        """
+        keys_by_course = defaultdict(list)
+        for course_key in course_keys:
+            if course_key.branch is None:
+                raise InsufficientSpecificationError(course_key)
+            keys_by_course[(course_key.org, course_key.course, course_key.run)].append(course_key)
+        if not keys_by_course:
+            return
+
+        keys_by_version = defaultdict(list)
+        indexes = self.find_matching_course_indexes(course_keys=[keys[0] for keys in keys_by_course.values()])
+        for index in indexes:
+            for course_key in keys_by_course.get((index['org'], index['course'], index['run']), []):
+                version_guid = index['versions'].get(course_key.branch)
+                if version_guid is not None:
+                    keys_by_version[version_guid].append(course_key)
+
+        for entry in self.iter_structures_by_id(list(keys_by_version), cache_results=cache_results):
+            for course_key in keys_by_version[entry['_id']]:
+                yield CourseEnvelope(course_key.replace(version_guid=entry['_id']), entry)
+
     def find_structures_derived_from(self, ids):
         """
         Return all structures that were immediately derived from a structure listed in ``ids``.
@@ -944,13 +1007,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
     def _get_structures_for_branch(self, branch, **kwargs):
         """
         Internal generator for fetching lists of courses, libraries, etc.
+
+        The structures read aren't cached, since listings read the structures
+        of every course.
         """
         version_guids, id_version_map = self.collect_ids_from_matching_indexes(branch, **kwargs)
 
         if not version_guids:
             return
 
-        for entry in self.find_structures_by_id(version_guids):
+        for entry in self.iter_structures_by_id(version_guids, cache_results=False):
             for course_index in id_version_map[entry['_id']]:
                 yield entry, course_index
 
@@ -3,9 +3,12 @@
 """
 
 
+import io
+import json
 import logging
 import mimetypes
 import shutil
+import tarfile
 import unittest
 from tempfile import mkdtemp
 from uuid import uuid4
@@ -147,6 +150,32 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(True, False)
+    def test_export_for_course_to_tar(self, deprecated):
+        """
+        Test export to a tar archive
+        """
+        self.set_up_assets(deprecated)
+        root_dir = path.Path(mkdtemp())
+        self.addCleanup(shutil.rmtree, root_dir)
+        self.contentstore.export_all_for_course(self.course1_key, root_dir, path.Path(root_dir / "policy.json"))
+        with open(root_dir / "policy.json") as policy_file:
+            expected_policy = json.load(policy_file)
+
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode='w') as tar_file:
+            policy = self.contentstore.export_all_for_course_to_tar(
+                self.course1_key, tar_file, 'course/static', max_workers=2
+            )
+        assert json.loads(json.dumps(policy)) == expected_policy
+
+        tar_buffer.seek(0)
+        with tarfile.open(fileobj=tar_buffer) as tar_file:
+            assert sorted(tar_file.getnames()) == sorted('course/static/' + name for name in self.course1_files)
+            for filename in self.course1_files:
+                with open(root_dir / filename, 'rb') as exported_file:
+                    assert tar_file.extractfile('course/static/' + filename).read() == exported_file.read()
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
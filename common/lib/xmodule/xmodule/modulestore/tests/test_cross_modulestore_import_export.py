@@ -15,6 +15,7 @@ and then for each combination of modulestores, performing the sequence:
 
 import itertools
 import os
+import tarfile
 from shutil import rmtree
 from tempfile import mkdtemp
 
@@ -31,7 +32,7 @@ from xmodule.modulestore.tests.utils import (
     MongoContentstoreBuilder,
     mock_tab_from_json
 )
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar, export_course_to_xml
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from xmodule.partitions.tests.test_partitions import PartitionTestCase
 from xmodule.tests import CourseComparisonTest
@@ -155,6 +156,64 @@ class CrossStoreXMLRoundtrip(CourseComparisonTest, PartitionTestCase):
                             dest_course_key,
                         )
 
+    @patch('xmodule.video_module.video_module.edxval_api', None)
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    @ddt.data(*COURSE_DATA_NAMES)
+    def test_round_trip_through_tar(self, course_data_name, _mock_tab_from_json):
+        with MongoContentstoreBuilder().build() as source_content:
+            with SPLIT_MODULESTORE_SETUP.build(contentstore=source_content) as source_store:
+                with MongoContentstoreBuilder().build() as dest_content:
+                    with SPLIT_MODULESTORE_SETUP.build(contentstore=dest_content) as dest_store:
+                        source_course_key = source_store.make_course_key('a', 'course', 'course')  # lint-amnesty, pylint: disable=no-member
+                        dest_course_key = dest_store.make_course_key('a', 'course', 'course')  # lint-amnesty, pylint: disable=no-member
+
+                        import_course_from_xml(
+                            source_store,
+                            'test_user',
+                            TEST_DATA_DIR,
+                            source_dirs=[course_data_name],
+                            static_content_store=source_content,
+                            target_id=source_course_key,
+                            raise_on_failure=True,
+                            create_if_not_present=True,
+                        )
+
+                        tar_path = os.path.join(self.export_dir, 'course.tar.gz')
+                        with tarfile.open(tar_path, 'w:gz') as tar_file:
+                            export_course_to_tar(
+                                source_store,
+                                source_content,
+                                source_course_key,
+                                tar_file,
+                                EXPORTED_COURSE_DIR_NAME,
+                            )
+                        with tarfile.open(tar_path) as tar_file:
+                            tar_file.extractall(self.export_dir)
+
+                        import_course_from_xml(
+                            dest_store,
+                            'test_user',
+                            self.export_dir,
+                            source_dirs=[EXPORTED_COURSE_DIR_NAME],
+                            static_content_store=dest_content,
+                            target_id=dest_course_key,
+                            raise_on_failure=True,
+                            create_if_not_present=True,
+                        )
+
+                        self.exclude_field(None, 'wiki_slug')
+                        self.exclude_field(None, 'xml_attributes')
+                        self.exclude_field(None, 'parent')
+                        self.exclude_field(None, 'discussion_id')
+                        self.ignore_asset_key('_id')
+                        self.ignore_asset_key('uploadDate')
+                        self.ignore_asset_key('content_son')
+                        self.ignore_asset_key('thumbnail_location')
+
+                        self.assertCoursesEqual(source_store, source_course_key, dest_store, dest_course_key)
+                        self.assertAssetsEqual(source_content, source_course_key, dest_content, dest_course_key)
+                        self.assertAssetsMetadataEqual(source_store, source_course_key, dest_store, dest_course_key)
+
     def test_split_course_export_import(self):
         # Construct the contentstore for storing the first import
         with MongoContentstoreBuilder().build() as source_content:
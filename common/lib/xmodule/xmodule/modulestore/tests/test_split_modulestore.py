@@ -16,6 +16,7 @@ import six
 from ccx_keys.locator import CCXBlockUsageLocator
 from contracts import contract
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from mock import patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId, VersionTree
 from path import Path as path
@@ -26,7 +27,7 @@ from openedx.core.lib import tempdir
 from openedx.core.lib.tests import attr
 from xmodule.course_module import CourseBlock
 from xmodule.fields import Date, Timedelta
-from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore import BlockData, ModuleStoreEnum
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import (
     DuplicateCourseError,
@@ -37,6 +38,12 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    PROCESS_STRUCTURE_CACHE,
+    STRUCTURE_CODECS,
+    CourseStructureCache,
+    ProcessStructureCache
+)
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -934,6 +941,7 @@ class SplitModuleCourseTests(SplitModuleTest):
         assert root_block_key.block_id == 'course'
 
 
+@ddt.ddt
 class TestCourseStructureCache(SplitModuleTest):
     """Tests for the CourseStructureCache"""
 
@@ -1007,6 +1015,110 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         assert cached_structure == not_cached_structure
 
+    @ddt.data(*sorted(STRUCTURE_CODECS))
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_cache_codecs(self, codec_name, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC=codec_name):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+        assert cached_structure == not_cached_structure
+
+        # Each codec has its own cache entries.
+        cache_key = STRUCTURE_CODECS[codec_name].cache_key(self.new_course.id.version_guid)
+        assert self.cache.get(cache_key) is not None
+        other_codec_name = 'bson-zlib' if codec_name == 'zpickle' else 'zpickle'
+        with override_settings(COURSE_STRUCTURE_CACHE_CODEC=other_codec_name):
+            with check_mongo_calls(1):
+                self._get_structure(self.new_course)
+
+    @override_settings(COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES=10 * 1024 * 1024)
+    def test_process_cache(self):
+        PROCESS_STRUCTURE_CACHE.clear()
+        self.addCleanup(PROCESS_STRUCTURE_CACHE.clear)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # The course_structure_cache is a dummy cache, but the structure is
+        # kept in memory.
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        assert cached_structure == not_cached_structure
+        assert PROCESS_STRUCTURE_CACHE.stats()['hits'] == 1
+
+        # Changes to the blocks of a cached structure aren't shared.
+        block_data = cached_structure['blocks'][cached_structure['root']]
+        block_data.fields['display_name'] = 'Changed'
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+        assert cached_structure['blocks'][cached_structure['root']].fields.get('display_name') != 'Changed'
+
+    @override_settings(COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES=1)
+    def test_process_cache_too_small(self):
+        PROCESS_STRUCTURE_CACHE.clear()
+        self.addCleanup(PROCESS_STRUCTURE_CACHE.clear)
+
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+        with check_mongo_calls(1):
+            self._get_structure(self.new_course)
+        assert PROCESS_STRUCTURE_CACHE.stats()['structures'] == 0
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_structures(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        other_course = modulestore().create_course(
+            'org', 'course', 'other_run', self.user, BRANCH_NAME_DRAFT,
+        )
+        structure_ids = [
+            course.location.as_object_id(course.location.version_guid) for course in (self.new_course, other_course)
+        ]
+
+        # The structures are read in a single query, and cached.
+        with check_mongo_calls(1):
+            not_cached_structures = list(modulestore().db_connection.get_structures(structure_ids))
+        with check_mongo_calls(0):
+            cached_structures = list(modulestore().db_connection.get_structures(structure_ids))
+        assert sorted(structure['_id'] for structure in cached_structures) == sorted(structure_ids)
+        six.assertCountEqual(self, cached_structures, not_cached_structures)
+
+        # Only the structures which aren't cached are read.
+        self.cache.delete(CourseStructureCache().codec.cache_key(structure_ids[0]))
+        with check_mongo_calls(1):
+            structures = list(modulestore().db_connection.get_structures(structure_ids))
+        six.assertCountEqual(self, structures, not_cached_structures)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.STRUCTURES_CHUNK_SIZE', 1)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_structures_in_chunks(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        other_course = modulestore().create_course(
+            'org', 'course', 'other_run', self.user, BRANCH_NAME_DRAFT,
+        )
+        structure_ids = [
+            course.location.as_object_id(course.location.version_guid) for course in (self.new_course, other_course)
+        ]
+        for structure_id in structure_ids:
+            self.cache.delete(CourseStructureCache().codec.cache_key(structure_id))
+
+        # Each chunk is read when the structures before it have been consumed.
+        structures = modulestore().db_connection.get_structures(structure_ids, cache_results=False)
+        with check_mongo_calls(1):
+            next(structures)
+        with check_mongo_calls(1):
+            next(structures)
+
+        # The structures weren't cached.
+        with check_mongo_calls(2):
+            structures = list(modulestore().db_connection.get_structures(structure_ids))
+        assert sorted(structure['_id'] for structure in structures) == sorted(structure_ids)
+        with check_mongo_calls(0):
+            list(modulestore().db_connection.get_structures(structure_ids))
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1016,6 +1128,58 @@ class TestCourseStructureCache(SplitModuleTest):
         )
 
 
+class TestProcessStructureCache(unittest.TestCase):
+    """Tests for the size-bounded ProcessStructureCache"""
+
+    def _structure(self, structure_id):
+        """
+        Returns a minimal structure with a single block.
+        """
+        root = BlockKey('course', 'course')
+        return {'_id': structure_id, 'root': root, 'blocks': {root: BlockData(fields={'a': 1}, edit_info={})}}
+
+    def test_lru_eviction(self):
+        cache = ProcessStructureCache()
+        cache.set('a', self._structure('a'), 40, 100)
+        cache.set('b', self._structure('b'), 40, 100)
+        assert cache.get('a')['_id'] == 'a'
+        cache.set('c', self._structure('c'), 40, 100)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats() == {
+            'structures': 2, 'size': 80, 'hits': 3, 'misses': 1, 'evictions': 1, 'hit_rate': 0.75,
+        }
+
+    def test_copies(self):
+        cache = ProcessStructureCache()
+        structure = self._structure('a')
+        cache.set('a', structure, 10, 100)
+        structure['blocks'][structure['root']].fields['a'] = 2
+
+        cached = cache.get('a')
+        assert cached['blocks'][cached['root']].fields == {'a': 1}
+        cached['blocks'][cached['root']].fields.update({'b': 2})
+        cached['blocks'][cached['root']].definition_loaded = True
+        cached = cache.get('a')
+        assert cached['blocks'][cached['root']].fields == {'a': 1}
+        assert not cached['blocks'][cached['root']].definition_loaded
+
+    def test_field_values_are_copied(self):
+        cache = ProcessStructureCache()
+        structure = self._structure('a')
+        child = BlockKey('chapter', 'chapter')
+        structure['blocks'][structure['root']].fields['children'] = [child]
+        cache.set('a', structure, 10, 100)
+        structure['blocks'][structure['root']].fields['children'].append(BlockKey('chapter', 'original'))
+
+        cached = cache.get('a')
+        cached['blocks'][cached['root']].fields['children'].append(BlockKey('chapter', 'other'))
+        cached = cache.get('a')
+        assert cached['blocks'][cached['root']].fields['children'] == [child]
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
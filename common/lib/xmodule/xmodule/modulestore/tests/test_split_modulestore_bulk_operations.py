@@ -9,11 +9,14 @@ import unittest
 
 import six
 import ddt
+import pytest
 from bson.objectid import ObjectId
 from mock import MagicMock, Mock, call
 from opaque_keys.edx.locator import CourseLocator
 from six.moves import range
 
+from xmodule.modulestore.exceptions import InsufficientSpecificationError
+from xmodule.modulestore.split_mongo import CourseEnvelope
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
 from xmodule.modulestore.split_mongo.split import SplitBulkWriteMixin
 
@@ -437,6 +440,64 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
             else:
                 assert db_structure(_id) not in results
 
+    @ddt.data(
+        ([], [], []),
+        ([1, 2, 3], [1, 2], [1, 2]),
+        ([1, 2, 3], [1], [1, 2]),
+        ([1, 2, 3], [], [1, 2]),
+    )
+    @ddt.unpack
+    def test_iter_structures_by_id(self, search_ids, active_ids, db_ids):
+        db_structure = lambda _id: {'db': 'structure', '_id': _id}
+        active_structure = lambda _id: {'active': 'structure', '_id': _id}
+
+        for n, _id in enumerate(active_ids):
+            course_key = CourseLocator('org', 'course', 'run{}'.format(n))
+            self.bulk._begin_bulk_operation(course_key)
+            self.bulk.update_structure(course_key, active_structure(_id))
+
+        self.conn.get_structures.side_effect = lambda ids, cache_results: iter(
+            [db_structure(_id) for _id in db_ids if _id in ids]
+        )
+        results = list(self.bulk.iter_structures_by_id(search_ids))
+        if set(search_ids) - set(active_ids):
+            self.conn.get_structures.assert_called_once_with(set(search_ids) - set(active_ids), cache_results=True)
+        else:
+            assert not self.conn.get_structures.called
+        six.assertCountEqual(self, results, [
+            active_structure(_id) if _id in active_ids else db_structure(_id)
+            for _id in search_ids if _id in active_ids or _id in db_ids
+        ])
+
+    def test_iter_course_structures(self):
+        structure_a = {'_id': ObjectId()}
+        structure_b = {'_id': ObjectId()}
+        course_key_c = CourseLocator('org', 'course', 'run-c', branch='test')
+        course_key_a_other_branch = self.course_key.for_branch('other')
+        self.conn.find_matching_course_indexes.return_value = [
+            {'org': 'org', 'course': 'course', 'run': 'run-a', 'versions': {'test': structure_a['_id']}},
+            {'org': 'org', 'course': 'course', 'run': 'run-b', 'versions': {'test': structure_b['_id']}},
+        ]
+        self.conn.get_structures.return_value = iter([structure_a, structure_b])
+
+        envelopes = list(self.bulk.iter_course_structures(
+            [self.course_key, self.course_key_b, course_key_c, course_key_a_other_branch]
+        ))
+        six.assertCountEqual(self, envelopes, [
+            CourseEnvelope(self.course_key.replace(version_guid=structure_a['_id']), structure_a),
+            CourseEnvelope(self.course_key_b.replace(version_guid=structure_b['_id']), structure_b),
+        ])
+        self.assertConnCalls(
+            call.find_matching_course_indexes(
+                None, None, None, course_keys=[self.course_key, self.course_key_b, course_key_c],
+            ),
+            call.get_structures({structure_a['_id'], structure_b['_id']}, cache_results=True),
+        )
+
+    def test_iter_course_structures_without_branch(self):
+        with pytest.raises(InsufficientSpecificationError):
+            list(self.bulk.iter_course_structures([self.course_key.for_branch(None)]))
+
     @ddt.data(
         ([], [], []),
         ([1, 2, 3], [1, 2], [1, 2]),
@@ -3,9 +3,11 @@ Tests for XML importer.
 """
 
 
+import hashlib
 import importlib
 import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 import pytest
 import mock
@@ -335,6 +337,7 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
     def setUp(self):  # lint-amnesty, pylint: disable=super-method-not-called
         self.course_data_path = path('/path')
         self.mocked_content_store = mock.Mock()
+        self.mocked_content_store.get_all_content_for_course.return_value = ([], 0)
         self.static_content_importer = StaticContentImporter(
             static_content_store=self.mocked_content_store,
             course_data_path=self.course_data_path,
@@ -365,6 +368,28 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
                 'static/inner/file1.txt', base_dir=expected_base_dir
             )
 
+    def test_import_static_content_directory_with_executor(self):
+        mocked_os_walk_yield = [
+            ('static', None, ['file{}.txt'.format(index) for index in range(20)] + ['.DS_Store']),
+        ]
+        progress_callback = mock.Mock()
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=mocked_os_walk_yield
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file',
+            side_effect=lambda file_path, base_dir: (file_path, file_path.upper()),
+        ) as patched_import_static_file, ThreadPoolExecutor(max_workers=4) as executor:
+            remap_dict = self.static_content_importer.import_static_content_directory(
+                'static', executor=executor, progress_callback=progress_callback,
+            )
+
+        assert patched_import_static_file.call_count == 20
+        assert remap_dict == {
+            'static/file{}.txt'.format(index): 'STATIC/FILE{}.TXT'.format(index) for index in range(20)
+        }
+        assert progress_callback.call_args_list == [mock.call(index, 20) for index in range(1, 21)]
+
     def test_import_static_file(self):
         base_dir = path('/path/to/dir')
         full_file_path = os.path.join(base_dir, 'static/some_file.txt')
@@ -376,3 +401,57 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
             )
             mock_file.assert_called_with(full_file_path, 'rb')
             self.mocked_content_store.generate_thumbnail.assert_called_once()
+
+    def _set_existing_asset(self, **attrs):
+        """
+        Add an asset for static/some_file.txt to the mocked content store.
+        """
+        asset_key = self.static_content_importer.target_id.make_asset_key('asset', 'static_some_file.txt')
+        asset = {
+            'asset_key': asset_key,
+            'displayname': 'some_file.txt',
+            'contentType': 'text/plain',
+            'import_path': 'static/some_file.txt',
+            'locked': False,
+        }
+        asset.update(attrs)
+        self.mocked_content_store.get_all_content_for_course.return_value = ([asset], 1)
+        return asset_key
+
+    def test_import_unchanged_static_file(self):
+        base_dir = path('/path/to/dir')
+        full_file_path = os.path.join(base_dir, 'static/some_file.txt')
+        asset_key = self._set_existing_asset(md5=hashlib.md5(b"data").hexdigest(), locked=True)
+        with mock.patch(OPEN_BUILTIN, mock.mock_open(read_data=b"data")):
+            result = self.static_content_importer.import_static_file(
+                full_file_path=full_file_path,
+                base_dir=base_dir
+            )
+            result_again = self.static_content_importer.import_static_file(
+                full_file_path=full_file_path,
+                base_dir=base_dir
+            )
+
+        assert result == result_again == ('static/some_file.txt', asset_key)
+        self.mocked_content_store.get_all_content_for_course.assert_called_once()
+        self.mocked_content_store.generate_thumbnail.assert_not_called()
+        self.mocked_content_store.save.assert_not_called()
+        self.mocked_content_store.set_attrs.assert_called_with(asset_key, {'locked': False})
+        assert self.static_content_importer.skipped_files == 2
+        assert self.static_content_importer.skipped_bytes == 8
+
+    def test_import_changed_static_file(self):
+        base_dir = path('/path/to/dir')
+        full_file_path = os.path.join(base_dir, 'static/some_file.txt')
+        self._set_existing_asset(md5=hashlib.md5(b"old data").hexdigest())
+        self.mocked_content_store.generate_thumbnail.return_value = (None, None)
+        with mock.patch(OPEN_BUILTIN, mock.mock_open(read_data=b"data")):
+            self.static_content_importer.import_static_file(
+                full_file_path=full_file_path,
+                base_dir=base_dir
+            )
+
+        self.mocked_content_store.generate_thumbnail.assert_called_once()
+        self.mocked_content_store.save.assert_called_once()
+        assert self.mocked_content_store.save.call_args[0][0].data == b"data"
+        assert self.static_content_importer.skipped_files == 0
@@ -4,12 +4,13 @@ Methods for exporting course data to XML
 
 
 import logging
-import os
+import tarfile
 from abc import abstractmethod
 from json import dumps
 
 import lxml.etree
 import six
+from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 from six import text_type
@@ -107,21 +108,26 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, tar_file=None):
         """
-        Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
+        Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`,
+        or to `tar_file`.
 
         `modulestore`: A `ModuleStore` object that is the source of the modules to export
         `contentstore`: A `ContentStore` object that is the source of the content to export, can be None
         `courselike_key`: The Locator of the Descriptor to export
-        `root_dir`: The directory to write the exported xml to
-        `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `root_dir`: The directory to write the exported xml to, None if `tar_file` is given
+        `target_dir`: The name of the directory inside `root_dir` or `tar_file` to write the content to
+        `tar_file`: A `tarfile.TarFile` opened for writing to add the exported xml and content to. The
+            assets are streamed from the contentstore into it, and the xml is kept in memory until it's
+            added after them, so that nothing is written to disk but the archive.
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = text_type(target_dir)
+        self.tar_file = tar_file
 
     @abstractmethod
     def get_key(self):
@@ -157,7 +163,12 @@ class ExportManager(object):
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
+            if self.tar_file is not None:
+                fsm = MemoryFS()
+                root_courselike_dir = None
+            else:
+                fsm = OSFS(self.root_dir)
+                root_courselike_dir = self.root_dir + '/' + self.target_dir
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -175,12 +186,33 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
             self.post_process(root, export_fs)
 
+            if self.tar_file is not None:
+                _add_fs_to_tar(fsm, self.tar_file)
+                fsm.close()
+
+    def export_static_assets(self, export_fs, root_courselike_dir):
+        """
+        Export the assets of the contentstore to the static directory, and their attributes to
+        the assets policy file.
+        """
+        if self.tar_file is not None:
+            policy = self.contentstore.export_all_for_course_to_tar(
+                self.courselike_key, self.tar_file, self.target_dir + '/static',
+            )
+            with export_fs.open(u'policies/assets.json', 'wb') as assets_policy:
+                assets_policy.write(dumps(policy, sort_keys=True, indent=4).encode('utf-8'))
+        else:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                root_courselike_dir + '/static/',
+                root_courselike_dir + '/policies/assets.json',
+            )
+
 
 class CourseExportManager(ExportManager):
     """
@@ -205,26 +237,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedir(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -239,10 +265,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open(u'course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makedirs(u'static/images', recreate=True)
+                    with output_dir.open(u'course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -319,11 +343,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -352,6 +372,38 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tar(modulestore, contentstore, course_key, tar_file, course_dir):
+    """
+    Thin wrapper for the Course Export Manager exporting to a tar archive. See ExportManager for details.
+    """
+    CourseExportManager(modulestore, contentstore, course_key, None, course_dir, tar_file=tar_file).export()
+
+
+def export_library_to_tar(modulestore, contentstore, library_key, tar_file, library_dir):
+    """
+    Thin wrapper for the Library Export Manager exporting to a tar archive. See ExportManager for details.
+    """
+    LibraryExportManager(modulestore, contentstore, library_key, None, library_dir, tar_file=tar_file).export()
+
+
+def _add_fs_to_tar(export_fs, tar_file):
+    """
+    Add the directories and files of export_fs to a tar archive.
+    """
+    for file_path, info in export_fs.walk.info(namespaces=['details']):
+        tarinfo = tarfile.TarInfo(file_path.lstrip('/'))
+        tarinfo.mtime = info.modified.timestamp()
+        if info.is_dir:
+            tarinfo.type = tarfile.DIRTYPE
+            tarinfo.mode = 0o755
+            tar_file.addfile(tarinfo)
+        else:
+            tarinfo.size = info.size
+            tarinfo.mode = 0o644
+            with export_fs.openbin(file_path) as exported_file:
+                tar_file.addfile(tarinfo, exported_file)
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
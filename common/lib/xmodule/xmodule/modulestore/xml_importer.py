@@ -25,10 +25,13 @@ Modulestore virtual   |          XML physical (draft, published)
 import json
 import io
 import logging
+import hashlib
 import mimetypes
 import os
 import re
+import threading
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 import six
 import xblock
@@ -84,6 +87,19 @@ class LocationMixin(XBlockMixin):
         )
 
 
+def _get_file_digest(file_path, chunk_size=1024 * 1024):
+    """
+    Return the md5 hex digest of a file, as computed by GridFS, and its length, reading it in chunks.
+    """
+    md5 = hashlib.md5()
+    length = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+            length += len(chunk)
+    return md5.hexdigest(), length
+
+
 class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
     def __init__(self, static_content_store, course_data_path, target_id):
         self.static_content_store = static_content_store
@@ -101,10 +117,26 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         mimetypes.add_type('application/octet-stream', '.srt')
         self.mimetypes_list = list(mimetypes.types_map.values())
 
-    def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):  # lint-amnesty, pylint: disable=missing-function-docstring
+        # The assets already in the contentstore, by block id, fetched with the first imported file.
+        self._existing_assets = None
+        self._lock = threading.Lock()
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+    def import_static_content_directory(
+            self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False, executor=None, progress_callback=None,
+    ):
+        """
+        Import the files of the content_subdir directory of the course.
+
+        The files are imported by the workers of executor if it's given, and
+        progress_callback is called with the number of files imported so far
+        and the number of files to import after each of them.
+        """
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -115,30 +147,39 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            """
+            Import a single static file.
+            """
+            if verbose:
+                log.debug('importing static content %s...', file_path)
+            return self.import_static_file(file_path, base_dir=static_dir)
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+        if executor is not None:
+            imported_files_attrs = executor.map(import_file, file_paths)
+        else:
+            imported_files_attrs = map(import_file, file_paths)
+
+        for num_imported, imported_file_attrs in enumerate(imported_files_attrs, 1):
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+            if progress_callback is not None:
+                progress_callback(num_imported, len(file_paths))
 
         return remap_dict
 
-    def import_static_file(self, full_file_path, base_dir):  # lint-amnesty, pylint: disable=missing-function-docstring
+    def import_static_file(self, full_file_path, base_dir):
+        """
+        Save a static file to the contentstore, and return its path in the course and its asset key.
+
+        If an asset with the same content is already in the contentstore, it isn't saved again and its
+        thumbnail isn't generated again: only its attributes from the policy file are updated.
+        """
         filename = os.path.basename(full_file_path)
-        try:
-            with open(full_file_path, 'rb') as f:
-                data = f.read()
-        except IOError:
-            # OS X "companion files". See
-            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-            if filename.startswith('._'):
-                return None
-            # Not a 'hidden file', then re-raise exception
-            raise
 
         # strip away leading path from the name
         file_subpath = full_file_path.replace(base_dir, '')
@@ -159,6 +200,33 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         # Check extracted contentType in list of all valid mimetypes
         if not mime_type or mime_type not in self.mimetypes_list:
             mime_type = mimetypes.guess_type(filename)[0]  # Assign guessed mimetype
+
+        existing_asset = self._get_existing_asset(asset_key)
+        try:
+            if existing_asset is not None and existing_asset.get('md5') is not None:
+                content_digest, length = _get_file_digest(full_file_path)
+                if content_digest == existing_asset['md5']:
+                    self._update_existing_asset(existing_asset, asset_key, {
+                        'displayname': displayname,
+                        'contentType': mime_type,
+                        'import_path': file_subpath,
+                        'locked': locked,
+                    })
+                    with self._lock:
+                        self.skipped_files += 1
+                        self.skipped_bytes += length
+                    return file_subpath, asset_key
+
+            with open(full_file_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            # OS X "companion files". See
+            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+            if filename.startswith('._'):
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
         content = StaticContent(
             asset_key, displayname, mime_type, data,
             import_path=file_subpath, locked=locked
@@ -180,6 +248,29 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
 
         return file_subpath, asset_key
 
+    def _get_existing_asset(self, asset_key):
+        """
+        Return the attributes of the asset with asset_key already in the contentstore, or None.
+        """
+        with self._lock:
+            if self._existing_assets is None:
+                assets, __ = self.static_content_store.get_all_content_for_course(self.target_id)
+                self._existing_assets = {asset['asset_key'].block_id: asset for asset in assets}
+        return self._existing_assets.get(asset_key.block_id)
+
+    def _update_existing_asset(self, existing_asset, asset_key, attrs):
+        """
+        Set the attributes of an asset already in the contentstore which are different from attrs.
+        """
+        changed_attrs = {attr: value for attr, value in attrs.items() if existing_asset.get(attr) != value}
+        if changed_attrs:
+            try:
+                self.static_content_store.set_attrs(asset_key, changed_attrs)
+            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+                msg = "Error importing {0}, error={1}".format(attrs['import_path'], err)
+                log.exception(msg)
+                set_custom_attribute('course_import_failure', "Static Content Save Failure: {}".format(msg))
+
 
 class ImportManager(object):
     """
@@ -222,6 +313,13 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_import_workers: The number of threads importing the static files. If more than one, the
+            static files are imported while the blocks are imported.
+
+        progress_callback: (optional) a function called with a stage, 'static' or 'blocks', the number of
+            static files or blocks imported so far and the number to import, after each of them. It may be
+            called from another thread.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -235,6 +333,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_import_workers=1, progress_callback=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -250,6 +349,8 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_import_workers = static_import_workers
+        self.progress_callback = progress_callback
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -270,9 +371,10 @@ class ImportManager(object):
         if self.target_id:
             assert len(self.xml_module_store.modules) == 1
 
-    def import_static(self, data_path, dest_id):
+    def import_static(self, data_path, dest_id, executor=None):
         """
-        Import all static items into the content store.
+        Import all static items into the content store, with the workers of
+        executor if it's given.
         """
         if self.static_content_store is None:
             log.warning("Static content store is None. Skipping static content import...")
@@ -288,7 +390,8 @@ class ImportManager(object):
                 log.debug("Importing static content and python library")
             # first pass to find everything in the static content directory
             static_content_importer.import_static_content_directory(
-                content_subdir=self.static_content_subdir, verbose=self.verbose
+                content_subdir=self.static_content_subdir, verbose=self.verbose, executor=executor,
+                progress_callback=self._report_progress('static'),
             )
         elif self.do_import_python_lib and self.python_lib_filename:
             if self.verbose:
@@ -317,7 +420,13 @@ class ImportManager(object):
             if self.verbose:
                 log.debug("Importing %s directory", simport)
             static_content_importer.import_static_content_directory(
-                content_subdir=simport, verbose=self.verbose
+                content_subdir=simport, verbose=self.verbose, executor=executor,
+            )
+
+        if static_content_importer.skipped_files:
+            log.info(
+                'Skipped saving %d unchanged static files (%d bytes) of %s',
+                static_content_importer.skipped_files, static_content_importer.skipped_bytes, dest_id,
             )
 
     def import_asset_metadata(self, data_dir, course_id):
@@ -445,6 +554,8 @@ class ImportManager(object):
         """
         all_locs = set(self.xml_module_store.modules[courselike_key].keys())
         all_locs.remove(source_courselike.location)
+        report_progress = self._report_progress('blocks')
+        num_blocks = len(all_locs)
 
         def depth_first(subtree):
             """
@@ -474,12 +585,15 @@ class ImportManager(object):
                     except Exception:
                         log.error('failed to import module location %s', child.location)
                         raise
+                    if report_progress is not None:
+                        report_progress(num_blocks - len(all_locs), num_blocks)
 
                     depth_first(child)
 
         depth_first(source_courselike)
 
-        for leftover in all_locs:
+        num_imported = num_blocks - len(all_locs)
+        for num_leftovers, leftover in enumerate(all_locs, 1):
             if self.verbose:
                 log.debug('importing module location %s', leftover)
 
@@ -498,6 +612,19 @@ class ImportManager(object):
                 log.error(msg)
                 set_custom_attribute('course_import_failure', "Module Load failure: {}".format(msg))
                 raise
+            if report_progress is not None:
+                report_progress(num_imported + num_leftovers, num_blocks)
+
+    def _report_progress(self, stage):
+        """
+        Return a function reporting the progress of the given stage to progress_callback, or None.
+        """
+        if self.progress_callback is None:
+            return None
+
+        def report_progress(num_imported, total):
+            self.progress_callback(stage, num_imported, total)
+        return report_progress
 
     def run_imports(self):
         """
@@ -515,14 +642,25 @@ class ImportManager(object):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                if self.static_import_workers > 1:
+                    # Import all static pieces with a pool of workers, while the blocks are imported.
+                    with ThreadPoolExecutor(max_workers=1) as static_import_executor:
+                        with ThreadPoolExecutor(max_workers=self.static_import_workers) as executor:
+                            static_import = static_import_executor.submit(
+                                self.import_static, data_path, dest_id, executor
+                            )
+                            self.import_asset_metadata(data_path, dest_id)
+                            self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                            static_import.result()
+                else:
+                    # Import all static pieces.
+                    self.import_static(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
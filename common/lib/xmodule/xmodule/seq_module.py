@@ -59,6 +59,9 @@ class_priority = ['video', 'problem']
 #  `django.utils.translation.ugettext_noop` because Django cannot be imported in this file
 _ = lambda text: text
 
+# Dispatch of the ajax handler rendering a single unit of the sequence, followed by the unit's usage key.
+RENDER_UNIT_DISPATCH = 'render_unit'
+
 TIMED_EXAM_GATING_WAFFLE_FLAG = LegacyWaffleFlag(
     waffle_namespace="xmodule",
     flag_name=u'rev_1377_rollout',
@@ -312,6 +315,9 @@ class SequenceBlock(
 
     def handle_ajax(self, dispatch, data, view=STUDENT_VIEW):  # TODO: bounds checking  # lint-amnesty, pylint: disable=arguments-differ
         ''' get = request.POST instance '''
+        if dispatch and dispatch.startswith(RENDER_UNIT_DISPATCH + '/'):
+            return self._render_unit(dispatch[len(RENDER_UNIT_DISPATCH) + 1:], view)
+
         if dispatch == 'goto_position':
             # set position to default value if either 'position' argument not
             # found in request or it is a non-positive integer
@@ -355,6 +361,41 @@ class SequenceBlock(
             return json.dumps(meta)
         raise NotFoundError('Unexpected dispatch type')
 
+    def _render_unit(self, usage_id, view):
+        """
+        Returns the rendered unit with the given usage id, and the resources it
+        depends on, for the units which aren't rendered with the sequence in
+        lazy mode.
+        """
+        if self.descendants_are_gated() or self._hidden_content_student_view({}):
+            raise NotFoundError('Units of this sequence are not available')
+
+        item = next(
+            (item for item in self.get_display_items() if text_type(item.scope_ids.usage_id) == usage_id),
+            None
+        )
+        if item is None:
+            raise NotFoundError('Unexpected unit {}'.format(usage_id))
+
+        try:
+            bookmarks_service = self.runtime.service(self, 'bookmarks')
+        except NoSuchServiceError:
+            bookmarks_service = None
+        user = self.runtime.service(self, 'user').get_current_user()
+        # Units are fetched without the context the sequence was rendered with, so whether the
+        # user is authenticated is taken from the user service.
+        is_user_authenticated = self.is_user_authenticated({
+            'user_authenticated': user.opt_attrs.get('edx-platform.is_authenticated', True),
+        })
+        show_bookmark_button = bool(is_user_authenticated and bookmarks_service)
+        context = {
+            'username': user.opt_attrs.get('edx-platform.username'),
+            'show_bookmark_button': show_bookmark_button,
+            'bookmarked': show_bookmark_button and bookmarks_service.is_bookmarked(usage_key=item.scope_ids.usage_id),
+            'format': getattr(self, 'format', ''),
+        }
+        return json.dumps({'fragment': item.render(view, context).to_dict()})
+
     @classmethod
     def verify_current_content_visibility(cls, date, hide_after_date):
         """
@@ -695,12 +736,16 @@ class SequenceBlock(
         the given display_items.
         """
         render_items = not context.get('exclude_units', False)
+        # In lazy mode, only the active unit is rendered, and the sequence fetches the
+        # other units when the learner navigates to them.
+        lazy_units = render_items and view == STUDENT_VIEW and context.get('lazy_units', False)
         is_user_authenticated = self.is_user_authenticated(context)
         completion_service = self.runtime.service(self, 'completion')
         try:
             bookmarks_service = self.runtime.service(self, 'bookmarks')
         except NoSuchServiceError:
             bookmarks_service = None
+        content_type_gating_service = self.runtime.service(self, 'content_type_gating')
         user = self.runtime.service(self, 'user').get_current_user()
         context['username'] = user.opt_attrs.get(
             'edx-platform.username')
@@ -708,8 +753,15 @@ class SequenceBlock(
             self.get_parent().display_name_with_default,
             self.display_name_with_default
         ]
+        if lazy_units:
+            bookmarked_usage_ids, vertical_completions, content_type_gated_items = self._look_up_items_in_batch(
+                display_items,
+                bookmarks_service if is_user_authenticated else None,
+                completion_service if is_user_authenticated else None,
+                content_type_gating_service,
+            )
         contents = []
-        for item in display_items:
+        for index, item in enumerate(display_items):
             # NOTE (CCB): This seems like a hack, but I don't see a better method of determining the type/category.
             item_type = item.get_icon_class()
             usage_id = item.scope_ids.usage_id
@@ -719,22 +771,27 @@ class SequenceBlock(
 
             if is_user_authenticated and bookmarks_service:
                 show_bookmark_button = True
-                is_bookmarked = bookmarks_service.is_bookmarked(usage_key=usage_id)
+                if lazy_units:
+                    is_bookmarked = text_type(usage_id) in bookmarked_usage_ids
+                else:
+                    is_bookmarked = bookmarks_service.is_bookmarked(usage_key=usage_id)
 
             context['show_bookmark_button'] = show_bookmark_button
             context['bookmarked'] = is_bookmarked
             context['format'] = getattr(self, 'format', '')
 
-            if render_items:
+            render_item = render_items and (not lazy_units or index == self.position - 1)
+            if render_item:
                 rendered_item = item.render(view, context)
                 fragment.add_fragment_resources(rendered_item)
                 content = rendered_item.content
             else:
                 content = ''
 
-            content_type_gating_service = self.runtime.service(self, 'content_type_gating')
             contains_content_type_gated_content = False
-            if content_type_gating_service:
+            if lazy_units:
+                contains_content_type_gated_content = content_type_gated_items[index] is not None
+            elif content_type_gating_service:
                 contains_content_type_gated_content = content_type_gating_service.check_children_for_content_type_gating_paywall(  # pylint:disable=line-too-long
                     item, self.course_id
                 ) is not None
@@ -752,14 +809,69 @@ class SequenceBlock(
                 # The item url format can be defined in the template context like so:
                 # context['item_url'] = '/my/item/path/{usage_key}/whatever'
                 iteminfo['href'] = context.get('item_url', '').format(usage_key=usage_id)
+            elif not render_item:
+                iteminfo['fetch_url'] = '{}/{}/{}'.format(self.ajax_url, RENDER_UNIT_DISPATCH, usage_id)
             if is_user_authenticated:
                 if item.location.block_type == 'vertical' and completion_service:
-                    iteminfo['complete'] = completion_service.vertical_is_complete(item)
+                    if lazy_units:
+                        iteminfo['complete'] = vertical_completions[usage_id]
+                    else:
+                        iteminfo['complete'] = completion_service.vertical_is_complete(item)
 
             contents.append(iteminfo)
 
         return contents
 
+    def _look_up_items_in_batch(self, display_items, bookmarks_service, completion_service,
+                                content_type_gating_service):
+        """
+        Returns the usage ids of the bookmarked display_items, a dict of whether
+        each of the vertical display_items is complete, and the content type
+        gating paywall (if any) of each of the display_items, looking each of
+        them up for all the display_items at once rather than item by item.
+        """
+        bookmarked_usage_ids = set()
+        if bookmarks_service:
+            bookmarked_usage_ids = {
+                bookmark['usage_id'] for bookmark in bookmarks_service.bookmarks(course_key=self.course_id)
+            }
+
+        vertical_completions = {}
+        if completion_service:
+            vertical_completions = self._get_vertical_completions(completion_service, display_items)
+
+        content_type_gated_items = [None] * len(display_items)
+        if content_type_gating_service:
+            content_type_gated_items = content_type_gating_service.check_items_for_content_type_gating_paywall(
+                display_items, self.course_id
+            )
+
+        return bookmarked_usage_ids, vertical_completions, content_type_gated_items
+
+    def _get_vertical_completions(self, completion_service, display_items):
+        """
+        Returns a dict of whether each of the vertical display_items is complete, as
+        given by completion_service.vertical_is_complete, getting the completions
+        of all of their completable children at once.
+        """
+        verticals = [item for item in display_items if item.location.block_type == 'vertical']
+        if not completion_service.completion_tracking_enabled():
+            return {vertical.scope_ids.usage_id: None for vertical in verticals}
+
+        completable_children = {
+            vertical.scope_ids.usage_id: [
+                child.scope_ids.usage_id for child in completion_service.get_completable_children(vertical)
+            ]
+            for vertical in verticals
+        }
+        completions = completion_service.get_completions(
+            [child for children in completable_children.values() for child in children]
+        )
+        return {
+            usage_id: all(completions[child] >= 1.0 for child in children)
+            for usage_id, children in completable_children.items()
+        }
+
     def _locations_in_subtree(self, node):
         """
         The usage keys for all descendants of an XBlock/XModule as a flat list.
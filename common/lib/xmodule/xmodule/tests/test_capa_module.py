@@ -3213,3 +3213,9 @@ class ProblemBlockReportGenerationTest(unittest.TestCase):
         iterator = iter([self._user_state(suffix='_dynamath')])
         report_data = list(descriptor.generate_report_data(iterator))
         assert 0 == len(report_data)
+
+    def test_generate_report_data_malformed_xml(self):
+        descriptor = self._get_descriptor()
+        descriptor.data = '<problem><p>Unclosed</problem>'
+        with pytest.raises(etree.XMLSyntaxError):
+            list(descriptor.generate_report_data(self._mock_user_state_generator()))
@@ -19,6 +19,7 @@ from web_fragments.fragment import Fragment
 
 from edx_toggles.toggles.testutils import override_waffle_flag
 from openedx.features.content_type_gating.models import ContentTypeGatingConfig
+from xmodule.exceptions import NotFoundError
 from xmodule.seq_module import TIMED_EXAM_GATING_WAFFLE_FLAG, SequenceBlock
 from xmodule.tests import get_test_system
 from xmodule.tests.helpers import StubUserService
@@ -433,6 +434,97 @@ class SequenceBlockTestCase(XModuleXmlImportTest):
         metadata = json.loads(self.sequence_5_1.handle_ajax('metadata', {}))
         assert metadata['items'][0]['contains_content_type_gated_content'] is True
 
+    def test_render_student_view_lazy_units(self):
+        """
+        In lazy mode, only the active unit is rendered, the other units have a url
+        to fetch them from, and the bookmarks, completion and content type gating
+        of all the units are each looked up at once.
+        """
+        children = self.sequence_3_1.get_children()
+        bookmarks_service = Mock(bookmarks=Mock(return_value=[{'usage_id': six.text_type(children[1].location)}]))
+        completion_service = Mock(
+            completion_tracking_enabled=Mock(return_value=True),
+            get_completable_children=Mock(side_effect=lambda vertical: [vertical]),
+            get_completions=Mock(return_value={
+                children[0].location: 1.0,
+                children[1].location: 0.5,
+                children[2].location: 0.0,
+            }),
+        )
+        content_type_gating_service = Mock(
+            check_items_for_content_type_gating_paywall=Mock(return_value=[None, None, 'i_am_gated']),
+        )
+        self.sequence_3_1.xmodule_runtime._services.update({  # pylint: disable=protected-access
+            'bookmarks': Mock(return_value=bookmarks_service),
+            'completion': Mock(return_value=completion_service),
+            'content_type_gating': Mock(return_value=content_type_gating_service),
+        })
+
+        html = self._get_rendered_view(self.sequence_3_1, extra_context={'lazy_units': True, 'position': 2})
+        items = self.get_context_dict_from_string(html)['items']
+
+        assert [bool(item['content']) for item in items] == [False, True, False]
+        assert 'fetch_url' not in items[1]
+        for item in (items[0], items[2]):
+            assert item['fetch_url'] == '{}/render_unit/{}'.format(self.sequence_3_1.ajax_url, item['id'])
+        assert [item['bookmarked'] for item in items] == [False, True, False]
+        assert [item['complete'] for item in items] == [True, False, False]
+        assert [item['contains_content_type_gated_content'] for item in items] == [False, False, True]
+
+        bookmarks_service.bookmarks.assert_called_once_with(course_key=self.sequence_3_1.course_id)
+        bookmarks_service.is_bookmarked.assert_not_called()
+        completion_service.get_completions.assert_called_once()
+        completion_service.vertical_is_complete.assert_not_called()
+        content_type_gating_service.check_items_for_content_type_gating_paywall.assert_called_once()
+        content_type_gating_service.check_children_for_content_type_gating_paywall.assert_not_called()
+
+    def test_handle_ajax_render_unit(self):
+        """
+        Test that the units of the sequence are rendered by the render_unit
+        ajax handler, and that units of other sequences are not.
+        """
+        with patch.object(SequenceBlock, '_get_course', return_value=self.course):
+            for child in self.sequence_3_1.get_children():
+                fragment = json.loads(
+                    self.sequence_3_1.handle_ajax('render_unit/{}'.format(child.location), {})
+                )['fragment']
+                assert six.text_type(child.location) in fragment['content']
+
+            with self.assertRaises(NotFoundError):
+                self.sequence_3_1.handle_ajax(
+                    'render_unit/{}'.format(self.sequence_5_1.get_children()[0].location), {}
+                )
+
+    def test_handle_ajax_render_unit_of_gated_sequence(self):
+        """
+        Test that the render_unit ajax handler doesn't render the units of a
+        timed sequence the learner can't see yet.
+        """
+        with patch.object(SequenceBlock, '_get_course', return_value=self.course):
+            with patch.object(SequenceBlock, '_time_limited_student_view', return_value='i_am_timed'):
+                with self.assertRaises(NotFoundError):
+                    self.sequence_5_1.handle_ajax(
+                        'render_unit/{}'.format(self.sequence_5_1.get_children()[0].location), {}
+                    )
+
+    @ddt.data(True, False)
+    def test_handle_ajax_render_unit_bookmark_button(self, is_anonymous):
+        """
+        Test that the units rendered by the render_unit ajax handler only have
+        a bookmark button for authenticated users.
+        """
+        services = self.sequence_3_1.xmodule_runtime._services  # pylint: disable=protected-access
+        services['user'] = StubUserService(is_anonymous=is_anonymous)
+        bookmarks_service = services['bookmarks'].return_value
+        bookmarks_service.is_bookmarked.return_value = False
+        unit = self.sequence_3_1.get_children()[0]
+        with patch.object(SequenceBlock, '_get_course', return_value=self.course):
+            fragment = json.loads(
+                self.sequence_3_1.handle_ajax('render_unit/{}'.format(unit.location), {})
+            )['fragment']
+        assert "'show_bookmark_button': {}".format(not is_anonymous) in fragment['content']
+        assert bookmarks_service.is_bookmarked.called is not is_anonymous
+
     def get_context_dict_from_string(self, data):
         """
         Retrieve dictionary from string.
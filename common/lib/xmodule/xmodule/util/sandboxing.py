@@ -3,10 +3,14 @@
 import re
 
 import six
+from capa.safe_exec import SafeExecResultCache
 from django.conf import settings
+from django.core.cache import cache
 
 DEFAULT_PYTHON_LIB_FILENAME = 'python_lib.zip'
 
+_SAFE_EXEC_RESULT_CACHE = None
+
 
 def can_execute_unsafe_code(course_id):
     """
@@ -42,3 +46,20 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+def get_safe_exec_result_cache():
+    """
+    Return the process-wide cache of sandboxed code results, in front of the
+    default django cache and bounded by `settings.SAFE_EXEC_RESULT_CACHE`.
+    """
+    global _SAFE_EXEC_RESULT_CACHE  # pylint: disable=global-statement
+    if _SAFE_EXEC_RESULT_CACHE is None:
+        config = getattr(settings, 'SAFE_EXEC_RESULT_CACHE', {})
+        _SAFE_EXEC_RESULT_CACHE = SafeExecResultCache(
+            backend=cache,
+            max_entries=config.get('MAX_ENTRIES', 1000),
+            max_bytes=config.get('MAX_BYTES', 64 * 1024 * 1024),
+            ttl=config.get('TTL'),
+        )
+    return _SAFE_EXEC_RESULT_CACHE
@@ -34,6 +34,7 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    COLLECTS_SUBTREE_LOCAL_DATA = True
     MERGED_START_DATE = 'merged_start_date'
 
     @classmethod
@@ -19,6 +19,9 @@ UserStateSummaryCache: A cache for Scope.user_state_summary
 PreferencesCache: A cache for Scope.preferences
 UserInfoCache: A cache for Scope.user_info
 DjangoOrmFieldCache: A base-class for single-row-per-field caches.
+
+:class:`FieldDataPrefetchPlan`: The blocks and fields, by scope, that a
+    :class:`~FieldDataCache` loads in a single prefetch.
 """
 
 
@@ -26,10 +29,12 @@ import json
 import logging
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from contextlib import ExitStack
 
 import six
 from contracts import contract, new_contract
-from django.db import DatabaseError, IntegrityError, transaction
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from edx_django_utils import monitoring as monitoring_utils
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
@@ -678,6 +683,94 @@ class UserInfoCache(DjangoOrmFieldCache):
         return key.field_name
 
 
+class FieldDataPrefetchPlan(object):
+    """
+    The descriptors whose field data a :class:`~FieldDataCache` loads in a
+    single prefetch, and the fields of those descriptors in each scope.
+
+    Each descriptor is included once, however often it is reached, and
+    descriptors whose usage ids are in ``prefetched_usage_keys`` are left out,
+    so that the blocks of a render tree are loaded at most once however many
+    times it is prefetched.
+    """
+    def __init__(self, descriptors, prefetched_usage_keys=frozenset()):
+        """
+        Arguments:
+            descriptors: A list of XModuleDescriptors.
+            prefetched_usage_keys: The usage ids of the descriptors already loaded.
+        """
+        self.descriptors = []
+        self.usage_keys = set()
+        for descriptor in descriptors:
+            usage_key = descriptor.scope_ids.usage_id
+            if usage_key in self.usage_keys or usage_key in prefetched_usage_keys:
+                continue
+            self.usage_keys.add(usage_key)
+            self.descriptors.append(descriptor)
+
+        self.fields = defaultdict(set)
+        for descriptor in self.descriptors:
+            for field in descriptor.fields.values():
+                self.fields[field.scope].add(field)
+
+    @classmethod
+    def for_descendents(cls, descriptor, depth=None, descriptor_filter=lambda descriptor: True,
+                        prefetched_usage_keys=frozenset()):
+        """
+        Return the plan for `descriptor` and its descendants, found in a single
+        pass over the tree.
+
+        Arguments:
+            descriptor: The root of the tree
+            depth: The number of levels of descendants to include, or None for all of them
+            descriptor_filter(descriptor): A function that returns True
+                if descriptor should be included in the plan
+            prefetched_usage_keys: The usage ids of the descriptors already loaded.
+        """
+        descriptors = []
+        visited = set()
+        stack = [(descriptor, depth)]
+        while stack:
+            descriptor, depth = stack.pop()
+            if descriptor.location in visited:
+                continue
+            visited.add(descriptor.location)
+
+            if descriptor_filter(descriptor):
+                descriptors.append(descriptor)
+
+            if depth is None or depth > 0:
+                new_depth = depth - 1 if depth is not None else depth
+                children = descriptor.get_children() + descriptor.get_required_module_descriptors()
+                stack.extend((child, new_depth) for child in reversed(children))
+
+        return cls(descriptors, prefetched_usage_keys)
+
+    def __len__(self):
+        return len(self.descriptors)
+
+
+class _QueryCounter(object):
+    """
+    Counts the queries run on all databases while it's active.
+    """
+    def __init__(self):
+        self.count = 0
+        self._stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+
 class FieldDataCache(object):
     """
     A cache of django model objects needed to supply the data
@@ -723,19 +816,15 @@ class FieldDataCache(object):
             ),
         }
         self.scorable_locations = set()
+        self.prefetched_usage_keys = set()
+        self.prefetch_stats = {'prefetches': 0, 'blocks': 0, 'queries': 0}
         self.add_descriptors_to_cache(descriptors)
 
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
         """
-        if self.user.is_authenticated:
-            self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
-            for scope, fields in self._fields_to_cache(descriptors).items():
-                if scope not in self.cache:
-                    continue
-
-                self.cache[scope].cache_fields(fields, descriptors, self.asides)
+        self.prefetch(FieldDataPrefetchPlan(descriptors, self.prefetched_usage_keys))
 
     def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
         """
@@ -748,34 +837,38 @@ class FieldDataCache(object):
             descriptor_filter is a function that accepts a descriptor and return whether the field data
                 should be cached
         """
+        with modulestore().bulk_operations(descriptor.location.course_key):
+            plan = FieldDataPrefetchPlan.for_descendents(
+                descriptor, depth, descriptor_filter, self.prefetched_usage_keys,
+            )
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
+        self.prefetch(plan)
 
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
+    def prefetch(self, plan):
+        """
+        Load the field data of all the descriptors in the :class:`~FieldDataPrefetchPlan`
+        `plan`, with at most one chunked query per scope.
 
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
+        The number of queries run is added to `prefetch_stats`, and reported
+        as the `field_data_cache.prefetch.queries` custom attribute.
+        """
+        if not self.user.is_authenticated or not plan:
+            return
 
-            return descriptors
+        self.scorable_locations.update(desc.location for desc in plan.descriptors if desc.has_score)
+        with _QueryCounter() as query_counter:
+            for scope, fields in plan.fields.items():
+                if scope not in self.cache:
+                    continue
 
-        with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+                self.cache[scope].cache_fields(fields, plan.descriptors, self.asides)
+        self.prefetched_usage_keys.update(plan.usage_keys)
 
-        self.add_descriptors_to_cache(descriptors)
+        self.prefetch_stats['prefetches'] += 1
+        self.prefetch_stats['blocks'] += len(plan)
+        self.prefetch_stats['queries'] += query_counter.count
+        monitoring_utils.accumulate('field_data_cache.prefetch.blocks', len(plan))
+        monitoring_utils.accumulate('field_data_cache.prefetch.queries', query_counter.count)
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
@@ -794,16 +887,6 @@ class FieldDataCache(object):
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
-    def _fields_to_cache(self, descriptors):
-        """
-        Returns a map of scopes to fields in that scope that should be cached
-        """
-        scope_map = defaultdict(set)
-        for descriptor in descriptors:
-            for field in descriptor.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
-
     @contract(key=DjangoKeyValueStore.Key)
     def get(self, key):
         """
@@ -989,6 +1072,30 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def bulk_create_for_locations(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given locations, for
+        each of the given users, using a single query.
+
+        Returns a dict mapping each user id to its ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+            'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            # See fetch_scores for why the course key info is added back in.
+            locations_to_scores = clients[user_id]._locations_to_scores  # pylint: disable=protected-access
+            locations_to_scores[location.map_into_course(course_id)] = cls.Score(correct, total, created)
+        for client in clients.values():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
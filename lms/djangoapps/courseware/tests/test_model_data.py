@@ -428,3 +428,64 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class TestFieldDataPrefetch(TestCase):
+    """
+    Tests for prefetching the field data of many descriptors.
+    """
+    def setUp(self):
+        super(TestFieldDataPrefetch, self).setUp()  # lint-amnesty, pylint: disable=super-with-arguments
+        self.user = UserFactory.create(username='user')
+        self.fields = [
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.user_state_summary, 'b_field'),
+            mock_field(Scope.preferences, 'c_field'),
+            mock_field(Scope.user_info, 'd_field'),
+        ]
+
+    def make_descriptor(self, name, children=()):
+        """
+        Return a mock descriptor named `name`, with `children`.
+        """
+        descriptor = mock_descriptor(self.fields)
+        descriptor.scope_ids = ScopeIds('user1', 'mock_problem', location('def_id'), location(name))
+        descriptor.location = location(name)
+        descriptor.get_children.return_value = list(children)
+        descriptor.get_required_module_descriptors.return_value = []
+        return descriptor
+
+    def test_queries_are_chunked_per_scope(self):
+        descriptors = [self.make_descriptor('problem_{}'.format(index)) for index in range(1200)]
+        # 3 chunks of StudentModules and of XModuleUserStateSummaryFields,
+        # 1 query each for XModuleStudentPrefsFields and XModuleStudentInfoFields.
+        with self.assertNumQueries(8):
+            field_data_cache = FieldDataCache(descriptors, course_id, self.user)
+        assert field_data_cache.prefetch_stats == {'prefetches': 1, 'blocks': 1200, 'queries': 8}
+
+    def test_descriptors_prefetched_once(self):
+        descriptor = self.make_descriptor('problem')
+        field_data_cache = FieldDataCache([descriptor, descriptor], course_id, self.user)
+        with self.assertNumQueries(0):
+            field_data_cache.add_descriptors_to_cache([descriptor])
+        assert field_data_cache.prefetch_stats == {'prefetches': 1, 'blocks': 1, 'queries': 4}
+
+    def test_prefetch_descendents(self):
+        shared = self.make_descriptor('shared')
+        vertical_1 = self.make_descriptor('vertical_1', [shared, self.make_descriptor('problem_1')])
+        vertical_2 = self.make_descriptor('vertical_2', [shared])
+        sequence = self.make_descriptor('sequence', [vertical_1, vertical_2])
+        chapter = self.make_descriptor('chapter', [sequence])
+
+        with patch('lms.djangoapps.courseware.model_data.modulestore'):
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+                course_id, self.user, chapter, depth=1,
+            )
+            assert field_data_cache.prefetched_usage_keys == {chapter.location, sequence.location}
+
+            with self.assertNumQueries(4):
+                field_data_cache.add_descriptor_descendents(sequence)
+        assert field_data_cache.prefetched_usage_keys == {
+            location(name) for name in ('chapter', 'sequence', 'vertical_1', 'vertical_2', 'shared', 'problem_1')
+        }
+        assert field_data_cache.prefetch_stats['blocks'] == 6
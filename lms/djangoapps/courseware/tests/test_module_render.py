@@ -18,6 +18,7 @@ from completion.waffle import ENABLE_COMPLETION_TRACKING_SWITCH  # lint-amnesty,
 from completion.models import BlockCompletion  # lint-amnesty, pylint: disable=wrong-import-order
 from django.conf import settings  # lint-amnesty, pylint: disable=wrong-import-order
 from django.contrib.auth.models import AnonymousUser  # lint-amnesty, pylint: disable=wrong-import-order
+from django.core.cache import cache  # lint-amnesty, pylint: disable=wrong-import-order
 from django.http import Http404, HttpResponse  # lint-amnesty, pylint: disable=wrong-import-order
 from django.middleware.csrf import get_token  # lint-amnesty, pylint: disable=wrong-import-order
 from django.test.client import RequestFactory  # lint-amnesty, pylint: disable=wrong-import-order
@@ -44,6 +45,7 @@ from xblock.fields import ScopeIds  # lint-amnesty, pylint: disable=wrong-import
 from xblock.runtime import DictKeyValueStore, KvsFieldData, Runtime  # lint-amnesty, pylint: disable=wrong-import-order
 from xblock.test.tools import TestRuntime  # lint-amnesty, pylint: disable=wrong-import-order
 
+from capa.safe_exec import SafeExecResultCache
 from capa.tests.response_xml_factory import OptionResponseXMLFactory  # lint-amnesty, pylint: disable=reimported
 from common.djangoapps.course_modes.models import CourseMode  # lint-amnesty, pylint: disable=reimported
 from lms.djangoapps.courseware import module_render as render
@@ -2309,6 +2311,25 @@ class LMSXBlockServiceBindingTest(SharedModuleStoreTestCase):
         assert not runtime.user_is_beta_tester
         assert runtime.days_early_for_beta == 5
 
+    def test_safe_exec_cache(self):
+        """
+        Tests that problems get the shared cache of sandboxed code results as a
+        service, while the runtime cache stays the django cache.
+        """
+        descriptor = ItemFactory(category="problem", parent=self.course)
+        runtime, _ = render.get_module_system_for_user(
+            self.user,
+            self.student_data,
+            descriptor,
+            self.course.id,
+            self.track_function,
+            self.xqueue_callback_url_prefix,
+            self.request_token,
+            course=self.course
+        )
+        assert runtime.cache is cache
+        assert isinstance(runtime.service(descriptor, 'safe_exec_cache'), SafeExecResultCache)
+
 
 class PureXBlockWithChildren(PureXBlock):
     """
@@ -128,6 +128,21 @@ COURSEWARE_OPTIMIZED_RENDER_XBLOCK = CourseWaffleFlag(
     WAFFLE_FLAG_NAMESPACE, 'optimized_render_xblock', __name__
 )
 
+# .. toggle_name: courseware.lazy_sequence_units
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: Waffle flag that makes the courseware page render only the active unit of a sequence, and
+#   fetch each of the other units from the sequence when the learner navigates to it. The bookmarks, completion and
+#   content type gating of all the units are then looked up at once rather than unit by unit. This speeds up the
+#   courseware page for sequences with many or large units.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: None
+# .. toggle_warnings: None
+COURSEWARE_LAZY_SEQUENCE_UNITS = CourseWaffleFlag(
+    WAFFLE_FLAG_NAMESPACE, 'lazy_sequence_units', __name__
+)
+
 
 def course_exit_page_is_active(course_key):
     return (
@@ -65,7 +65,11 @@ from ..masquerade import check_content_start_date_for_masquerade_user, setup_mas
 from ..model_data import FieldDataCache
 from ..module_render import get_module_for_descriptor, toc_for_course
 from ..permissions import MASQUERADE_AS_STUDENT
-from ..toggles import COURSEWARE_MICROFRONTEND_COURSE_TEAM_PREVIEW, REDIRECT_TO_COURSEWARE_MICROFRONTEND
+from ..toggles import (
+    COURSEWARE_LAZY_SEQUENCE_UNITS,
+    COURSEWARE_MICROFRONTEND_COURSE_TEAM_PREVIEW,
+    REDIRECT_TO_COURSEWARE_MICROFRONTEND
+)
 from .views import CourseTabView
 
 log = logging.getLogger("edx.courseware.views.index")
@@ -551,6 +555,7 @@ class CoursewareIndex(View):
             'progress_url': reverse('progress', kwargs={'course_id': six.text_type(self.course_key)}),
             'user_authenticated': self.request.user.is_authenticated,
             'position': position,
+            'lazy_units': COURSEWARE_LAZY_SEQUENCE_UNITS.is_enabled(self.course_key),
         }
         if previous_of_active_section:
             section_context['prev_url'] = _compute_section_url(previous_of_active_section, 'last')
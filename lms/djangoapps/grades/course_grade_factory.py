@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from openedx.core.djangoapps.signals.signals import (
@@ -14,7 +15,15 @@ from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
-from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .models_api import (
+    bulk_prefetch_grade_overrides_and_visible_blocks,
+    clear_prefetched_course_and_subsection_grades,
+    clear_prefetched_course_grades,
+    clear_prefetched_grade_overrides_and_visible_blocks,
+    prefetch_course_and_subsection_grades,
+    prefetch_grade_overrides_and_visible_blocks
+)
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -63,6 +72,7 @@ class CourseGradeFactory:
             course_structure=None,
             course_key=None,
             force_update_subsections=False,
+            overrides_and_visible_blocks_prefetched=False,
     ):
         """
         Computes, updates, and returns the CourseGrade for the given
@@ -70,12 +80,17 @@ class CourseGradeFactory:
 
         At least one of course, collected_block_structure, course_structure,
         or course_key should be provided.
+
+        If overrides_and_visible_blocks_prefetched is True, the user's grade
+        overrides and visible blocks are already in the request cache, and
+        aren't prefetched again when force updating subsections.
         """
         course_data = CourseData(user, course, collected_block_structure, course_structure, course_key)
         return self._update(
             user,
             course_data,
-            force_update_subsections=force_update_subsections
+            force_update_subsections=force_update_subsections,
+            overrides_and_visible_blocks_prefetched=overrides_and_visible_blocks_prefetched,
         )
 
     def iter(
@@ -85,6 +100,7 @@ class CourseGradeFactory:
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            batch_size=None,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -94,6 +110,11 @@ class CourseGradeFactory:
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        If batch_size is given, students are graded in batches of that size.
+        For each batch, the course grades, subsection grades, visible blocks,
+        overrides and scores of all its students are prefetched in a constant
+        number of queries, rather than queried separately for each student.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -104,10 +125,45 @@ class CourseGradeFactory:
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [f'action:{course_data.course_key}']  # lint-amnesty, pylint: disable=unused-variable
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if not batch_size:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+            return
+
+        users = iter(users)
+        while True:
+            users_batch = list(islice(users, batch_size))
+            if not users_batch:
+                break
+            self._prefetch_batch(users_batch, course_data)
+            try:
+                for user in users_batch:
+                    yield self._iter_grade_result(user, course_data, force_update, batch_prefetched=True)
+            finally:
+                self._clear_prefetched_batch(users_batch, course_data)
+
+    @staticmethod
+    def _prefetch_batch(users, course_data):
+        """
+        Prefetches all persisted grade data and scores needed to compute
+        the grades of the given users in the course.
+        """
+        prefetch_course_and_subsection_grades(course_data.course_key, users)
+        if should_persist_grades(course_data.course_key):
+            bulk_prefetch_grade_overrides_and_visible_blocks(course_data.course_key, users)
+        SubsectionGradeFactory.prefetch_scores(course_data, users)
+
+    @staticmethod
+    def _clear_prefetched_batch(users, course_data):
+        """
+        Clears the data prefetched by _prefetch_batch for the given users in the course.
+        """
+        clear_prefetched_course_grades(course_data.course_key)
+        clear_prefetched_course_and_subsection_grades(course_data.course_key)
+        clear_prefetched_grade_overrides_and_visible_blocks(course_data.course_key, users)
+        SubsectionGradeFactory.clear_prefetched_scores(course_data.course_key)
 
-    def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
+    def _iter_grade_result(self, user, course_data, force_update, batch_prefetched=False):  # lint-amnesty, pylint: disable=missing-function-docstring
         try:
             kwargs = {
                 'user': user,
@@ -117,6 +173,7 @@ class CourseGradeFactory:
             }
             if force_update:
                 kwargs['force_update_subsections'] = True
+                kwargs['overrides_and_visible_blocks_prefetched'] = batch_prefetched
 
             method = CourseGradeFactory().update if force_update else CourseGradeFactory().read
             course_grade = method(**kwargs)
@@ -161,7 +218,7 @@ class CourseGradeFactory:
         )
 
     @staticmethod
-    def _update(user, course_data, force_update_subsections=False):
+    def _update(user, course_data, force_update_subsections=False, overrides_and_visible_blocks_prefetched=False):
         """
         Computes, saves, and returns a CourseGrade object for the
         given user and course.
@@ -170,7 +227,7 @@ class CourseGradeFactory:
         COURSE_GRADE_NOW_FAILED if learner is now failing course
         """
         should_persist = should_persist_grades(course_data.course_key)
-        if should_persist and force_update_subsections:
+        if should_persist and force_update_subsections and not overrides_and_visible_blocks_prefetched:
             prefetch_grade_overrides_and_visible_blocks(user, course_data.course_key)
 
         course_grade = CourseGrade(
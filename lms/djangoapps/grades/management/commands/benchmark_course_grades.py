@@ -0,0 +1,87 @@
+"""
+Command to compare the number of queries and the time taken to compute
+course grades one learner at a time and in batches.
+"""
+
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_course_grades 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    args = '<course_id course_id ...>'
+    help = 'Compares queries per learner and wall time of unbatched and batched course grade computation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help='Courses whose learners\' grades are to be computed.',
+        )
+        parser.add_argument(
+            '--max_users',
+            help='Maximum number of enrolled learners to compute grades for, per course.',
+            default=500,
+            type=int,
+        )
+        parser.add_argument(
+            '--batch_size',
+            help='Number of learners whose data is prefetched together in batched mode.',
+            default=100,
+            type=int,
+        )
+        parser.add_argument(
+            '--force_update',
+            help='Recompute grades rather than reading persisted grades.',
+            action='store_true',
+            default=False,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            users = list(
+                get_user_model().objects.filter(
+                    courseenrollment__course_id=course_key,
+                    courseenrollment__is_active=True,
+                ).order_by('id')[:options['max_users']]
+            )
+            self.stdout.write(f'{course_key}: {len(users)} learners')
+            if not users:
+                continue
+
+            # Load the collected block structure before measuring.
+            list(CourseGradeFactory().iter(users[:1], course_key=course_key))
+
+            for mode, batch_size in (('unbatched', None), ('batched', options['batch_size'])):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.monotonic()
+                    for _ in CourseGradeFactory().iter(
+                        users,
+                        course_key=course_key,
+                        force_update=options['force_update'],
+                        batch_size=batch_size,
+                    ):
+                        pass
+                    seconds = time.monotonic() - start
+
+                self.stdout.write(
+                    '  {:<10} queries: {:>7,d}  queries/learner: {:>7.2f}  '
+                    'time: {:>8.2f} s  ms/learner: {:>7.2f}'.format(
+                        mode,
+                        len(queries),
+                        len(queries) / len(users),
+                        seconds,
+                        seconds * 1000 / len(users),
+                    )
+                )
@@ -247,6 +247,33 @@ class VisibleBlocks(models.Model):
         get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(user_id, course_key)] = prefetched
         return prefetched
 
+    @classmethod
+    def bulk_prefetch(cls, course_key, users):
+        """
+        Prefetches visible blocks for each of the given users in the given
+        course, using a single query, and stores them in the cache.
+        """
+        prefetched = {user.id: {} for user in users}
+        grades_with_blocks = PersistentSubsectionGrade.objects.select_related('visible_blocks').filter(
+            user_id__in=list(prefetched),
+            course_id=course_key,
+        )
+        for grade in grades_with_blocks:
+            prefetched[grade.user_id][grade.visible_blocks.hashed] = grade.visible_blocks
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, visible_blocks in prefetched.items():
+            cache[cls._cache_key(user_id, course_key)] = visible_blocks
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key, users):
+        """
+        Clears the prefetched visible blocks of the given users in the given
+        course from the RequestCache.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user in users:
+            cache.pop(cls._cache_key(user.id, course_key), None)
+
     @classmethod
     def _update_cache(cls, user_id, course_key, visible_blocks):
         """
@@ -698,6 +725,33 @@ class PersistentSubsectionGradeOverride(models.Model):
             cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
         }
 
+    @classmethod
+    def bulk_prefetch(cls, course_key, users):
+        """
+        Prefetches overrides for each of the given users in the given
+        course, using a single query.
+        """
+        prefetched = {user.id: {} for user in users}
+        overrides = cls.objects.select_related('grade').filter(
+            grade__user_id__in=list(prefetched),
+            grade__course_id=course_key,
+        )
+        for override in overrides:
+            prefetched[override.grade.user_id][override.grade.usage_key] = override
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user_id, user_overrides in prefetched.items():
+            cache[(user_id, str(course_key))] = user_overrides
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key, users):
+        """
+        Clears the prefetched overrides of the given users in the given course
+        from the RequestCache.
+        """
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        for user in users:
+            cache.pop((user.id, str(course_key)), None)
+
     @classmethod
     def get_override(cls, user_id, usage_key):  # lint-amnesty, pylint: disable=missing-function-docstring
         prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
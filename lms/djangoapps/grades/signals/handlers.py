@@ -5,6 +5,7 @@ Grades related signals.
 
 from contextlib import contextmanager
 from logging import getLogger
+from threading import local
 
 from django.dispatch import receiver
 from opaque_keys.edx.keys import LearningContextKey
@@ -13,7 +14,12 @@ from xblock.scorable import ScorableXBlockMixin, Score
 
 from common.djangoapps.student.models import user_by_anonymous_id
 from common.djangoapps.student.signals import ENROLLMENT_TRACK_UPDATED
-from common.djangoapps.track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
+from common.djangoapps.track.event_transaction_utils import (
+    get_event_transaction_id,
+    get_event_transaction_type,
+    set_event_transaction_id,
+    set_event_transaction_type
+)
 from common.djangoapps.util.date_utils import to_timestamp
 from lms.djangoapps.courseware.model_data import get_score, set_score
 from lms.djangoapps.grades.tasks import (
@@ -38,6 +44,9 @@ from .signals import (
 
 log = getLogger(__name__)
 
+# The subsection updates collected by defer_subsection_updates in each thread.
+_deferred_subsection_updates = local()
+
 
 @receiver(score_set, dispatch_uid='submissions_score_set_handler')
 def submissions_score_set_handler(sender, **kwargs):  # pylint: disable=unused-argument
@@ -212,6 +221,34 @@ def problem_raw_score_changed_handler(sender, **kwargs):  # pylint: disable=unus
     )
 
 
+@contextmanager
+def defer_subsection_updates():
+    """
+    Context manager collecting the subsection updates enqueued by
+    enqueue_subsection_update while it is active, and enqueueing them
+    all once it exits, unless it exits with an exception.
+
+    Used when the scores of many learners are changed in a single
+    transaction, which must be committed before the updates run.
+    """
+    if getattr(_deferred_subsection_updates, 'updates', None) is not None:
+        raise ValueError("Subsection updates are already being deferred.")
+
+    updates = []
+    _deferred_subsection_updates.updates = updates
+    try:
+        yield
+    finally:
+        _deferred_subsection_updates.updates = None
+
+    for kwargs, event_transaction_id, event_transaction_type in updates:
+        if event_transaction_id is not None:
+            set_event_transaction_id(str(event_transaction_id))
+        if event_transaction_type is not None:
+            set_event_transaction_type(event_transaction_type)
+        _enqueue_subsection_update(**kwargs)
+
+
 @receiver(PROBLEM_WEIGHTED_SCORE_CHANGED)
 @receiver(SUBSECTION_OVERRIDE_CHANGED)
 def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argument
@@ -219,6 +256,17 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     Handles the PROBLEM_WEIGHTED_SCORE_CHANGED or SUBSECTION_OVERRIDE_CHANGED signals by
     enqueueing a subsection update operation to occur asynchronously.
     """
+    updates = getattr(_deferred_subsection_updates, 'updates', None)
+    if updates is not None:
+        updates.append((kwargs, get_event_transaction_id(), get_event_transaction_type()))
+        return
+    _enqueue_subsection_update(**kwargs)
+
+
+def _enqueue_subsection_update(**kwargs):
+    """
+    Enqueues a subsection update operation for the given score change.
+    """
     events.grade_updated(**kwargs)
     context_key = LearningContextKey.from_string(kwargs['course_id'])
     if not context_key.is_course:
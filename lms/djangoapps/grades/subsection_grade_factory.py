@@ -3,19 +3,22 @@ SubsectionGrade Factory Class
 """
 
 
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict, namedtuple
 from logging import getLogger
 
 from django.conf import settings
 from lazy import lazy
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
-from common.djangoapps.student.models import anonymous_id_for_user
+from common.djangoapps.student.models import anonymous_id_for_user, prefetch_anonymous_ids_for_users
 from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_grades
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.djangoapps.signals.signals import COURSE_ASSESSMENT_GRADE_CHANGED
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 
 from .course_data import CourseData
@@ -23,11 +26,15 @@ from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSu
 
 log = getLogger(__name__)
 
+PrefetchedScores = namedtuple('PrefetchedScores', ['csm_scores', 'submissions_scores'])
+
 
 class SubsectionGradeFactory:
     """
     Factory for Subsection Grades.
     """
+    _SCORES_CACHE_NAMESPACE = 'grades.subsection_grade_factory.SubsectionGradeFactory.scores'
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -117,12 +124,53 @@ class SubsectionGradeFactory:
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_scores(cls, course_data, users):
+        """
+        Prefetches the scores stored in the user state (in CSM) and by the
+        Submissions API for all the given users in the given course, using
+        a constant number of queries, and stores them in the request cache
+        for use by SubsectionGradeFactory instances of these users.
+        """
+        course_key = course_data.course_key
+        scorable_locations = [block_key for block_key in course_data.structure if possibly_scored(block_key)]
+        csm_scores = ScoresClient.bulk_create_for_locations(
+            course_key, [user.id for user in users], scorable_locations,
+        )
+
+        prefetch_anonymous_ids_for_users(users, course_key)
+        anonymous_user_ids = {user.id: anonymous_id_for_user(user, course_key) for user in users}
+        submissions_scores = _bulk_get_submissions_scores(str(course_key), list(anonymous_user_ids.values()))
+
+        get_cache(cls._SCORES_CACHE_NAMESPACE)[str(course_key)] = {
+            user.id: PrefetchedScores(csm_scores[user.id], submissions_scores[anonymous_user_ids[user.id]])
+            for user in users
+        }
+
+    @classmethod
+    def clear_prefetched_scores(cls, course_key):
+        """
+        Clears prefetched scores for this course from the request cache.
+        """
+        get_cache(cls._SCORES_CACHE_NAMESPACE).pop(str(course_key), None)
+
+    @lazy
+    def _prefetched_scores(self):
+        """
+        Returns this student's PrefetchedScores for the course, or None
+        if they were not prefetched.
+        """
+        prefetched_scores = get_cache(self._SCORES_CACHE_NAMESPACE).get(str(self.course_data.course_key), {})
+        return prefetched_scores.get(self.student.id)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores.csm_scores
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -132,6 +180,8 @@ class SubsectionGradeFactory:
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._prefetched_scores is not None:
+            return self._prefetched_scores.submissions_scores
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -180,3 +230,21 @@ class SubsectionGradeFactory:
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+def _bulk_get_submissions_scores(course_id, anonymous_user_ids):
+    """
+    Returns a dict mapping each of the given anonymous user ids to their
+    scores in the given course, in the same format as
+    submissions_api.get_scores, using a single query.
+    """
+    scores = defaultdict(dict)
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=course_id,
+        student_item__student_id__in=anonymous_user_ids,
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            student_item = summary.student_item
+            scores[student_item.student_id][student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
@@ -6,19 +6,24 @@ from unittest.mock import patch
 
 import ddt
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.courseware.access import has_access
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle_switch
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentSubsectionGradeOverride, VisibleBlocks
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
+from ..subsection_grade_factory import SubsectionGradeFactory
 from .base import GradeTestBase
 from .utils import mock_get_score
 
@@ -188,6 +193,48 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         assert mock_update.called == force_update
 
+    @ddt.data(True, False)
+    def test_iter_batched(self, force_update):
+        users = [self.request.user] + [UserFactory() for _ in range(4)]
+        with mock_get_score(1, 2):
+            expected_grades = {
+                user.id: course_grade.percent
+                for user, course_grade, _ in CourseGradeFactory().iter(users, self.course, force_update=force_update)
+            }
+            batched_grades = {
+                user.id: course_grade.percent
+                for user, course_grade, _ in CourseGradeFactory().iter(
+                    users, self.course, force_update=force_update, batch_size=2,
+                )
+            }
+        assert batched_grades == expected_grades
+        subsection_grade_factory = SubsectionGradeFactory(self.request.user, course_data=self.course_data)
+        assert subsection_grade_factory._prefetched_scores is None  # pylint: disable=protected-access
+
+    def test_iter_batched_force_update(self):
+        users = [self.request.user] + [UserFactory() for _ in range(4)]
+        prefetch_path = 'lms.djangoapps.grades.course_grade_factory.prefetch_grade_overrides_and_visible_blocks'
+        with patch(prefetch_path) as mock_prefetch:
+            list(CourseGradeFactory().iter(users, self.course, force_update=True, batch_size=2))
+        mock_prefetch.assert_not_called()
+
+        # pylint: disable=protected-access
+        visible_blocks_cache = get_cache(VisibleBlocks._CACHE_NAMESPACE)
+        overrides_cache = get_cache(PersistentSubsectionGradeOverride._CACHE_NAMESPACE)
+        for user in users:
+            assert VisibleBlocks._cache_key(user.id, self.course.id) not in visible_blocks_cache
+            assert (user.id, str(self.course.id)) not in overrides_cache
+
+    def test_iter_batched_queries(self):
+        users = [self.request.user] + [UserFactory() for _ in range(4)]
+        CourseGradeFactory().read(self.request.user, self.course)
+
+        with CaptureQueriesContext(connection) as unbatched_queries:
+            list(CourseGradeFactory().iter(users, self.course))
+        with CaptureQueriesContext(connection) as batched_queries:
+            list(CourseGradeFactory().iter(users, self.course, batch_size=len(users)))
+        assert len(batched_queries) < len(unbatched_queries)
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -17,7 +17,9 @@ from common.djangoapps.util.date_utils import to_timestamp
 
 from ..constants import ScoreDatabaseTableEnum
 from ..signals.handlers import (
+    defer_subsection_updates,
     disconnect_submissions_signal_receiver,
+    enqueue_subsection_update,
     problem_raw_score_changed_handler,
     submissions_score_reset_handler,
     submissions_score_set_handler
@@ -259,3 +261,40 @@ class ScoreChangedSignalRelayTest(TestCase):
         with pytest.raises(ValueError):
             with disconnect_submissions_signal_receiver(PROBLEM_RAW_SCORE_CHANGED):
                 pass
+
+
+class DeferSubsectionUpdatesTest(TestCase):
+    """
+    Tests that defer_subsection_updates enqueues the subsection updates
+    collected while it is active once it exits.
+    """
+
+    def setUp(self):
+        super().setUp()
+        enqueue_patch = patch('lms.djangoapps.grades.signals.handlers._enqueue_subsection_update')
+        self.enqueue_mock = enqueue_patch.start()
+        self.addCleanup(enqueue_patch.stop)
+
+    def test_updates_enqueued_on_exit(self):
+        with defer_subsection_updates():
+            enqueue_subsection_update(None, **PROBLEM_WEIGHTED_SCORE_CHANGED_KWARGS)
+            enqueue_subsection_update(None, **PROBLEM_WEIGHTED_SCORE_CHANGED_KWARGS)
+            self.enqueue_mock.assert_not_called()
+        assert self.enqueue_mock.call_count == 2
+
+        # Updates aren't deferred anymore
+        enqueue_subsection_update(None, **PROBLEM_WEIGHTED_SCORE_CHANGED_KWARGS)
+        assert self.enqueue_mock.call_count == 3
+
+    def test_updates_dropped_on_error(self):
+        with pytest.raises(ValueError):
+            with defer_subsection_updates():
+                enqueue_subsection_update(None, **PROBLEM_WEIGHTED_SCORE_CHANGED_KWARGS)
+                raise ValueError()
+        self.enqueue_mock.assert_not_called()
+
+    def test_nested(self):
+        with defer_subsection_updates():
+            with pytest.raises(ValueError):
+                with defer_subsection_updates():
+                    pass
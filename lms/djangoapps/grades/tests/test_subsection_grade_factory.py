@@ -14,9 +14,9 @@ from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_f
 
 from ..constants import GradeOverrideFeatureEnum
 from ..models import PersistentSubsectionGrade, PersistentSubsectionGradeOverride
-from ..subsection_grade_factory import ZeroSubsectionGrade
+from ..subsection_grade_factory import SubsectionGradeFactory, ZeroSubsectionGrade
 from .base import GradeTestBase
-from .utils import mock_get_score
+from .utils import answer_problem, mock_get_score
 
 
 @ddt.ddt
@@ -172,3 +172,31 @@ class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
             if possible_graded_override is None:
                 expected_possible = persistent_grade.possible_graded
             self.assert_grade(grade, expected_earned, expected_possible)
+
+    def _get_scores(self, users):
+        """
+        Returns the CSM score of the problem and the Submissions API scores
+        for each of the given users.
+        """
+        scores = []
+        for user in users:
+            factory = SubsectionGradeFactory(user, course_data=self.course_data)
+            scores.append((
+                factory._csm_scores.get(self.problem.location),  # pylint: disable=protected-access
+                factory._submissions_scores,  # pylint: disable=protected-access
+            ))
+        return scores
+
+    def test_prefetch_scores(self):
+        answer_problem(self.course, self.request, self.problem, score=1, max_value=2)
+        other_user = UserFactory()
+        users = [self.request.user, other_user]
+        expected_scores = self._get_scores(users)
+
+        SubsectionGradeFactory.prefetch_scores(self.course_data, users)
+        with self.assertNumQueries(0):
+            assert self._get_scores(users) == expected_scores
+
+        SubsectionGradeFactory.clear_prefetched_scores(self.course.id)
+        factory = SubsectionGradeFactory(other_user, course_data=self.course_data)
+        assert factory._prefetched_scores is None  # pylint: disable=protected-access
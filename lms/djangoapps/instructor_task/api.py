@@ -25,6 +25,12 @@ from lms.djangoapps.instructor_task.api_helper import (
     submit_task
 )
 from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    retry_failed_grade_report_shards as _retry_failed_grade_report_shards
+)
+from lms.djangoapps.instructor_task.tasks_helper.module_state import (
+    requeue_module_state_update_chunks as _requeue_module_state_update_chunks
+)
 from lms.djangoapps.instructor_task.tasks import (
     calculate_grades_csv,
     calculate_may_enroll_csv,
@@ -368,6 +374,33 @@ def submit_problem_grade_report(request, course_key):
     return submit_task(request, task_type, task_class, course_key, task_input, task_key)
 
 
+def retry_failed_grade_report_shards(instructor_task_id, include_unfinished=False):
+    """
+    Requeues the failed shards of a course or problem grade report generated
+    in shards (see the instructor_task.generate_grade_reports_sharded flag),
+    leaving the shards that succeeded as they are.  If include_unfinished is
+    True, shards that have not finished, for example because their worker was
+    restarted, are requeued as well.
+
+    Returns the number of requeued shards.
+    """
+    return _retry_failed_grade_report_shards(instructor_task_id, include_unfinished=include_unfinished)
+
+
+def resume_module_state_update_chunks(instructor_task_id, include_failed=True):
+    """
+    Requeues the unfinished chunks of a rescoring, score override or
+    attempts reset task performed in chunks (see the
+    instructor_task.update_module_state_in_chunks flag), for example after
+    their worker was restarted.  Each chunk resumes after its last
+    checkpoint.  If include_failed is True, the failed chunks are requeued
+    as well.
+
+    Returns the number of requeued chunks.
+    """
+    return _requeue_module_state_update_chunks(instructor_task_id, include_failed=include_failed)
+
+
 def submit_calculate_students_features_csv(request, course_key, features):
     """
     Submits a task to generate a CSV containing student profile info.
@@ -17,6 +17,35 @@ OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
 # Course override flags
 GENERATE_PROBLEM_GRADE_REPORT_VERIFIED_ONLY = 'generate_problem_grade_report_verified_only'
 GENERATE_COURSE_GRADE_REPORT_VERIFIED_ONLY = 'generate_course_grade_report_verified_only'
+# .. toggle_name: instructor_task.generate_grade_reports_sharded
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled for a course, course and problem grade reports are generated by
+#   subtasks that each compute the rows of a range of learners (see GRADE_REPORT_USERS_PER_SHARD) and
+#   write them to a partial CSV, which are merged into the final report once all of them have succeeded.
+#   Failed subtasks can be retried individually with api.retry_failed_grade_report_shards.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+GENERATE_GRADE_REPORTS_SHARDED = 'generate_grade_reports_sharded'
+# .. toggle_name: instructor_task.rescore_in_batches
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled for a course, rescoring tasks load the course once, and rescore
+#   learners' problems in chunks (see RESCORE_STUDENT_MODULES_PER_BATCH), each in a single transaction
+#   after which the subsection grade updates of the whole chunk are enqueued.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+RESCORE_IN_BATCHES = 'rescore_in_batches'
+# .. toggle_name: instructor_task.update_module_state_in_chunks
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled for a course, rescoring, score override and attempts reset tasks
+#   split the learners' problem states into ranges of ids (see MODULE_STATE_UPDATE_STUDENT_MODULES_PER_CHUNK),
+#   each updated by a subtask that checkpoints its progress to the InstructorTask. Unfinished or failed
+#   chunks can be resumed from their last checkpoint with api.resume_module_state_update_chunks.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+UPDATE_MODULE_STATE_IN_CHUNKS = 'update_module_state_in_chunks'
 
 
 def waffle_flags():
@@ -34,6 +63,21 @@ def waffle_flags():
             flag_name=GENERATE_COURSE_GRADE_REPORT_VERIFIED_ONLY,
             module_name=__name__,
         ),
+        GENERATE_GRADE_REPORTS_SHARDED: CourseWaffleFlag(
+            waffle_namespace=INSTRUCTOR_TASK_WAFFLE_FLAG_NAMESPACE,
+            flag_name=GENERATE_GRADE_REPORTS_SHARDED,
+            module_name=__name__,
+        ),
+        RESCORE_IN_BATCHES: CourseWaffleFlag(
+            waffle_namespace=INSTRUCTOR_TASK_WAFFLE_FLAG_NAMESPACE,
+            flag_name=RESCORE_IN_BATCHES,
+            module_name=__name__,
+        ),
+        UPDATE_MODULE_STATE_IN_CHUNKS: CourseWaffleFlag(
+            waffle_namespace=INSTRUCTOR_TASK_WAFFLE_FLAG_NAMESPACE,
+            flag_name=UPDATE_MODULE_STATE_IN_CHUNKS,
+            module_name=__name__,
+        ),
     }
 
 
@@ -60,3 +104,28 @@ def course_grade_report_verified_only(course_id):
     False otherwise.
     """
     return waffle_flags()[GENERATE_COURSE_GRADE_REPORT_VERIFIED_ONLY].is_enabled(course_id)
+
+
+def grade_reports_sharded(course_id):
+    """
+    Returns True if course and problem grade reports should be
+    generated by parallel subtasks in the given course, False otherwise.
+    """
+    return waffle_flags()[GENERATE_GRADE_REPORTS_SHARDED].is_enabled(course_id)
+
+
+def rescore_in_batches(course_id):
+    """
+    Returns True if rescoring tasks should rescore learners' problems
+    in batches in the given course, False otherwise.
+    """
+    return waffle_flags()[RESCORE_IN_BATCHES].is_enabled(course_id)
+
+
+def module_state_updates_in_chunks(course_id):
+    """
+    Returns True if rescoring, score override and attempts reset tasks
+    should update learners' problem states in chunks performed by
+    subtasks in the given course, False otherwise.
+    """
+    return waffle_flags()[UPDATE_MODULE_STATE_IN_CHUNKS].is_enabled(course_id)
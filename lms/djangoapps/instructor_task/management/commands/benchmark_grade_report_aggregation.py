@@ -0,0 +1,137 @@
+"""
+Command to benchmark the aggregation of course grade report grade columns
+on a synthetic course.
+"""
+
+
+import random
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport
+from xmodule.graders import AssignmentFormatGrader
+
+
+class _SyntheticCourseGrade:
+    """
+    Stand-in for a CourseGrade, with only the attributes used to compute
+    the grade columns of the course grade report.
+    """
+    def __init__(self, subsection_grades):
+        self._subsection_grades = subsection_grades
+        self.attempted = True
+        self.percent = 0.0
+
+    def subsection_grade(self, subsection_key):
+        return self._subsection_grades[subsection_key]
+
+
+def _per_user_grades(course_grade, context):
+    """
+    Returns the grade columns for a single user, computed one subsection
+    and one user at a time.
+    """
+    grade_results = [course_grade.percent]
+    for assignment_info in context.graded_assignments.values():
+        breakdown = []
+        for subsection_location in assignment_info['subsection_headers']:
+            subsection_grade = course_grade.subsection_grade(subsection_location)
+            if subsection_grade.attempted_graded or subsection_grade.override:
+                grade_results.append(subsection_grade.percent_graded)
+            else:
+                grade_results.append('Not Attempted')
+            breakdown.append({'percent': subsection_grade.percent_graded})
+        if assignment_info['separate_subsection_avg_headers'] and assignment_info['grader']:
+            grade_results.append(assignment_info['grader'].total_with_drops(breakdown)[0])
+    return grade_results
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_grade_report_aggregation --users 50000 --subsections 200 --settings=devstack
+    """
+    help = 'Compares per-user and vectorized aggregation of course grade report grade columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            help='Number of synthetic learners.',
+            default=50000,
+            type=int,
+        )
+        parser.add_argument(
+            '--subsections',
+            help='Number of synthetic graded subsections, split evenly between the assignment types.',
+            default=200,
+            type=int,
+        )
+        parser.add_argument(
+            '--assignment_types',
+            help='Number of synthetic assignment types.',
+            default=4,
+            type=int,
+        )
+        parser.add_argument(
+            '--batch_size',
+            help='Number of learners whose grade columns are aggregated together.',
+            default=100,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        course_key = CourseLocator('edX', 'Benchmark', 'Synthetic')
+        subsections_per_type = max(options['subsections'] // options['assignment_types'], 1)
+        graded_assignments = OrderedDict()
+        subsection_keys = []
+        for type_index in range(options['assignment_types']):
+            assignment_type = f'Type {type_index}'
+            headers = OrderedDict()
+            for subsection_index in range(subsections_per_type):
+                subsection_key = BlockUsageLocator(course_key, 'sequential', f'{type_index}_{subsection_index}')
+                headers[subsection_key] = f'{assignment_type} {subsection_index + 1}'
+                subsection_keys.append(subsection_key)
+            graded_assignments[assignment_type] = {
+                'subsection_headers': headers,
+                'average_header': f'{assignment_type} (Avg)',
+                'separate_subsection_avg_headers': subsections_per_type > 1,
+                'grader': AssignmentFormatGrader(assignment_type, subsections_per_type, type_index),
+            }
+        context = SimpleNamespace(graded_assignments=graded_assignments)
+
+        random.seed(0)
+        course_grades = []
+        for _ in range(options['users']):
+            subsection_grades = {}
+            for subsection_key in subsection_keys:
+                attempted = random.random() < 0.8
+                subsection_grades[subsection_key] = SimpleNamespace(
+                    percent_graded=round(random.random(), 2) if attempted else 0.0,
+                    attempted_graded=attempted,
+                    override=None,
+                )
+            course_grades.append(_SyntheticCourseGrade(subsection_grades))
+        self.stdout.write(f'{len(course_grades)} learners x {len(subsection_keys)} subsections')
+
+        start = time.monotonic()
+        expected_rows = [_per_user_grades(course_grade, context) for course_grade in course_grades]
+        per_user_seconds = time.monotonic() - start
+
+        report = CourseGradeReport()
+        batch_size = options['batch_size']
+        start = time.monotonic()
+        rows = []
+        for batch_start in range(0, len(course_grades), batch_size):
+            rows.extend(report._users_grades(  # pylint: disable=protected-access
+                course_grades[batch_start:batch_start + batch_size], context,
+            ))
+        vectorized_seconds = time.monotonic() - start
+
+        identical = [list(map(str, row)) for row in rows] == [list(map(str, row)) for row in expected_rows]
+        self.stdout.write(f'  per-user:   {per_user_seconds:>8.2f} s')
+        self.stdout.write(f'  vectorized: {vectorized_seconds:>8.2f} s')
+        self.stdout.write(f'  identical rows: {identical}')
@@ -32,7 +32,12 @@ from lms.djangoapps.bulk_email.tasks import perform_delegate_email_batches
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import upload_may_enroll_csv, upload_students_csv
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses,
+    run_grade_report_shard
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -46,7 +51,9 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     override_score_module_state,
     perform_module_state_update,
     rescore_problem_module_state,
-    reset_attempts_module_state
+    rescore_problem_module_state_in_course,
+    reset_attempts_module_state,
+    run_module_state_update_chunk
 )
 from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
 
@@ -76,8 +83,16 @@ def rescore_problem(entry_id, xmodule_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
-
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    batch_update_fcn = partial(rescore_problem_module_state_in_course, xmodule_instance_args)
+
+    visit_fcn = partial(
+        perform_module_state_update,
+        update_fcn,
+        None,
+        batch_update_fcn=batch_update_fcn,
+        chunk_update_type='rescore',
+        xmodule_instance_args=xmodule_instance_args,
+    )
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -91,7 +106,13 @@ def override_problem_score(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('overridden')
     update_fcn = partial(override_score_module_state, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(
+        perform_module_state_update,
+        update_fcn,
+        None,
+        chunk_update_type='override_score',
+        xmodule_instance_args=xmodule_instance_args,
+    )
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -114,10 +135,31 @@ def reset_problem_attempts(entry_id, xmodule_instance_args):
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('reset')
     update_fcn = partial(reset_attempts_module_state, xmodule_instance_args)
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(
+        perform_module_state_update,
+        update_fcn,
+        None,
+        chunk_update_type='reset_attempts',
+        xmodule_instance_args=xmodule_instance_args,
+    )
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def update_module_state_chunk(entry_id, update_type, chunk, subtask_status_dict, xmodule_instance_args):
+    """
+    Rescore, override the score of, or reset the attempts of the learners'
+    problem states in a range of ids, for a task performed in chunks.  The
+    progress of the chunk is checkpointed, so that it can be resumed if it
+    doesn't finish.
+
+    Unlike the main task, this doesn't use BaseInstructorTask, since the
+    status of the main task is updated from the statuses of its chunks.
+    """
+    return run_module_state_update_chunk(entry_id, update_type, chunk, subtask_status_dict, xmodule_instance_args)
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def delete_problem_state(entry_id, xmodule_instance_args):
@@ -214,6 +256,21 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@shared_task
+@set_code_owner_attribute
+def generate_grade_report_shard(entry_id, report_type, shard, subtask_status_dict, xmodule_instance_args):
+    """
+    Generate the rows of the learners in a range of user ids, for a course
+    or problem grade report generated in shards, and upload them as partial
+    CSVs.  Once all the shards of the report have succeeded, the partial
+    CSVs are merged into the final report.
+
+    Unlike the main report task, this doesn't use BaseInstructorTask, since
+    the status of the report is updated from the statuses of its shards.
+    """
+    return run_grade_report_shard(entry_id, report_type, shard, subtask_status_dict, xmodule_instance_args)
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
@@ -2,15 +2,20 @@
 Functionality for generating grade reports.
 """
 
+import json
 import logging
 import re
 from collections import OrderedDict, defaultdict
 from datetime import datetime
-from itertools import chain
+from itertools import chain, islice
 from time import time
+from uuid import uuid4
 
+import numpy
+from celery.states import FAILURE, READY_STATES, SUCCESS
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from lazy import lazy
 from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
@@ -19,20 +24,30 @@ from six.moves import zip_longest
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.roles import BulkRoleCache
+from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.courseware.courses import get_course_by_id
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from lms.djangoapps.grades.api import CourseGradeFactory
 from lms.djangoapps.grades.api import context as grades_context
-from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
 from lms.djangoapps.instructor_analytics.basic import list_problem_responses
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
     course_grade_report_verified_only,
+    grade_reports_sharded,
     optimize_get_learners_switch_enabled,
     problem_grade_report_verified_only
 )
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SUBTASK_LOCK_EXPIRE,
+    SubtaskStatus,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    update_subtask_status
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -44,7 +59,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import merge_partial_csvs_in_report_store, upload_csv_to_report_store, upload_partial_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -68,6 +83,39 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _assignment_averages(grader, subsection_percents, attempted):
+    """
+    Returns a list of the assignment averages, as computed by the given
+    grader's total_with_drops, for each row of the given users x subsections
+    matrix of percents. The average of users who have not attempted the
+    course is 0.0.
+
+    The lowest percents are dropped and the remaining ones are summed
+    in subsection order, so that the averages are exactly equal to those
+    computed by total_with_drops.
+    """
+    num_users, num_subsections = subsection_percents.shape
+    drop_count = getattr(grader, 'drop_count', None)
+    if drop_count is None or num_subsections <= drop_count:
+        return [
+            grader.total_with_drops([{'percent': percent} for percent in user_percents])[0]
+            if user_attempted else 0.0
+            for user_percents, user_attempted in zip(subsection_percents.tolist(), attempted)
+        ]
+
+    kept = numpy.ones((num_users, num_subsections), dtype=bool)
+    if drop_count > 0:
+        # total_with_drops drops the last drop_count subsections
+        # of a stable sort by descending percent.
+        descending_order = numpy.argsort(-subsection_percents, axis=1, kind='stable')
+        numpy.put_along_axis(kept, descending_order[:, num_subsections - drop_count:], False, axis=1)
+
+    # Unlike sum, cumsum adds in order, as total_with_drops does.
+    totals = numpy.cumsum(numpy.where(kept, subsection_percents, 0.0), axis=1)[:, -1]
+    averages = totals / (num_subsections - drop_count)
+    return numpy.where(attempted, averages, 0.0).tolist()
+
+
 class GradeReportBase:
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
@@ -216,10 +264,13 @@ class _CourseGradeReportContext:
             course_id=course_id,
             task_input=_task_input,
         )
+        self.xmodule_instance_args = _xmodule_instance_args
+        self.entry_id = _entry_id
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
         self.report_for_verified_only = course_grade_report_verified_only(self.course_id)
+        self.file_name = 'grade_report'
 
     @lazy
     def course(self):
@@ -306,6 +357,7 @@ class _ProblemGradeReportContext:
             course_id=course_id,
             task_input=_task_input,
         )
+        self.xmodule_instance_args = _xmodule_instance_args
         self.task_id = task_id
         self.entry_id = _entry_id
         self.task_input = _task_input
@@ -393,14 +445,138 @@ class _CourseGradeBulkContext:  # lint-amnesty, pylint: disable=missing-class-do
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        prefetch_course_and_subsection_grades(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
-class CourseGradeReport:
+class _ShardedGradeReportMixin:
+    """
+    Mixin for grade reports that can be generated by parallel subtasks
+    ("shards"), each of which computes the rows of the learners within
+    a range of user ids and uploads them as partial CSVs.  Once all the
+    shards have succeeded, the last one merges the partial CSVs, in order,
+    into the final reports.  Failed shards can be retried individually
+    with retry_failed_grade_report_shards.
+
+    Classes using this mixin define REPORT_TYPE, CONTEXT_CLASS,
+    _success_headers, _error_headers and _rows_for_users.
+    """
+    REPORT_TYPE = None
+    CONTEXT_CLASS = None
+
+    # Batch size for chunking the list of enrollees in a shard.
+    USER_BATCH_SIZE = 100
+
+    @staticmethod
+    def _enrolled_users(context):
+        """
+        Returns a queryset of the learners to include in the report.
+        """
+        filter_kwargs = {
+            'courseenrollment__course_id': context.course_id,
+        }
+        if context.report_for_verified_only:
+            filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+        return get_user_model().objects.filter(**filter_kwargs)
+
+    def _shards(self, context):
+        """
+        Returns a list of shards, each a dict with the index of the shard
+        and the range of user ids of its learners, and the total number of
+        learners.
+        """
+        shards = []
+        num_users = 0
+        user_ids = self._enrolled_users(context).values_list('id', flat=True).order_by('id')
+        for num_users, user_id in enumerate(user_ids.iterator(), start=1):
+            if (num_users - 1) % settings.GRADE_REPORT_USERS_PER_SHARD == 0:
+                shards.append({'index': len(shards), 'min_user_id': user_id, 'max_user_id': user_id})
+            else:
+                shards[-1]['max_user_id'] = user_id
+        return shards, num_users
+
+    def _queue_shards(self, context):
+        """
+        Queues the subtasks generating the shards of this report, and
+        returns the task progress as stored in the InstructorTask, or None
+        if there are no learners to generate the report for.
+        """
+        shards, num_users = self._shards(context)
+        if not shards:
+            return None
+
+        subtask_ids = [str(uuid4()) for _ in shards]
+        with outer_atomic():
+            entry = InstructorTask.objects.get(pk=context.entry_id)
+            progress = initialize_subtask_info(entry, context.action_name, num_users, subtask_ids)
+            subtask_dict = json.loads(entry.subtasks)
+            subtask_dict['report_type'] = self.REPORT_TYPE
+            subtask_dict['xmodule_instance_args'] = context.xmodule_instance_args
+            subtask_dict['shards'] = dict(zip(subtask_ids, shards))
+            entry.subtasks = json.dumps(subtask_dict)
+            entry.save_now()
+
+        TASK_LOG.info(
+            '%s, Task type: %s, Queueing %s shards for %s learners',
+            context.task_info_string, context.action_name, len(shards), num_users,
+        )
+        for subtask_id, shard in zip(subtask_ids, shards):
+            _queue_grade_report_shard(
+                context.entry_id, self.REPORT_TYPE, shard, SubtaskStatus.create(subtask_id),
+                context.xmodule_instance_args,
+            )
+        return progress
+
+    def _generate_shard(self, context, shard):
+        """
+        Computes the rows of the learners of the given shard and uploads
+        them as partial CSVs.  Returns the number of learners who were
+        graded successfully and the number who could not be graded.
+        """
+        users = self._enrolled_users(context).filter(
+            id__gte=shard['min_user_id'],
+            id__lte=shard['max_user_id'],
+        ).select_related('profile').order_by('id').iterator()
+
+        success_rows, error_rows = [], []
+        for users_batch in iter(lambda: list(islice(users, self.USER_BATCH_SIZE)), []):
+            batch_success_rows, batch_error_rows = self._rows_for_users(context, users_batch)
+            success_rows.extend(batch_success_rows)
+            error_rows.extend(batch_error_rows)
+            # Clear the CourseEnrollment caches after each batch of users has been processed
+            get_cache('get_enrollment').clear()
+            get_cache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+
+        upload_partial_csv_to_report_store(
+            success_rows, context.file_name, context.course_id, context.entry_id, shard['index'],
+        )
+        if error_rows:
+            upload_partial_csv_to_report_store(
+                error_rows, context.file_name + '_err', context.course_id, context.entry_id, shard['index'],
+            )
+        return len(success_rows), len(error_rows)
+
+    def _merge_shards(self, context, num_shards):
+        """
+        Merges the partial CSVs uploaded by the shards of this report into
+        the final reports.
+        """
+        date = datetime.now(UTC)
+        merge_partial_csvs_in_report_store(
+            self._success_headers(context), context.file_name, context.course_id, context.entry_id, num_shards, date,
+        )
+        merge_partial_csvs_in_report_store(
+            self._error_headers(), context.file_name + '_err', context.course_id, context.entry_id, num_shards, date,
+            skip_if_empty=True,
+        )
+
+
+class CourseGradeReport(_ShardedGradeReportMixin):
     """
     Class to encapsulate functionality related to generating Grade Reports.
     """
+    REPORT_TYPE = 'grade_report'
+    CONTEXT_CLASS = _CourseGradeReportContext
+
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
@@ -417,6 +593,11 @@ class CourseGradeReport:
         """
         Internal method for generating a grade report for the given context.
         """
+        if grade_reports_sharded(context.course_id):
+            progress = self._queue_shards(context)
+            if progress is not None:
+                return progress
+
         context.update_status('Starting grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
@@ -481,10 +662,10 @@ class CourseGradeReport:
         Creates and uploads a CSV for the given headers and rows.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store([success_headers] + success_rows, context.file_name, context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+            upload_csv_to_report_store(error_rows, context.file_name + '_err', context.course_id, date)
 
     def _grades_header(self, context):
         """
@@ -564,54 +745,39 @@ class CourseGradeReport:
         task_log_message = f'{context.task_info_string}, Task type: {context.action_name}'
         return get_enrolled_learners_for_course(course_id=course_id, verified_only=context.report_for_verified_only)
 
-    def _user_grades(self, course_grade, context):
-        """
-        Returns a list of grade results for the given course_grade corresponding
-        to the headers for this report.
-        """
-        grade_results = []
-        for _, assignment_info in context.graded_assignments.items():
-            subsection_grades, subsection_grades_results = self._user_subsection_grades(
-                course_grade,
-                assignment_info['subsection_headers'],
-            )
-            grade_results.extend(subsection_grades_results)
-
-            assignment_average = self._user_assignment_average(course_grade, subsection_grades, assignment_info)
-            if assignment_average is not None:
-                grade_results.append([assignment_average])
+    def _users_grades(self, course_grades, context):
+        """
+        Returns a list of grade results for each of the given course_grades,
+        corresponding to the headers for this report.
+
+        The percents of all the users' subsection grades of an assignment type
+        are gathered into a users x subsections matrix, from which the
+        assignment averages of all the users are computed at once.
+        """
+        users_grade_results = [[course_grade.percent] for course_grade in course_grades]
+        if not course_grades:
+            return users_grade_results
+
+        attempted = numpy.array([course_grade.attempted for course_grade in course_grades], dtype=bool)
+        for assignment_info in context.graded_assignments.values():
+            subsection_headers = assignment_info['subsection_headers']
+            subsection_percents = numpy.empty((len(course_grades), len(subsection_headers)))
+            for user_index, (course_grade, grade_results) in enumerate(zip(course_grades, users_grade_results)):
+                for subsection_index, subsection_location in enumerate(subsection_headers):
+                    subsection_grade = course_grade.subsection_grade(subsection_location)
+                    percent_graded = subsection_grade.percent_graded
+                    subsection_percents[user_index, subsection_index] = percent_graded
+                    if subsection_grade.attempted_graded or subsection_grade.override:
+                        grade_results.append(percent_graded)
+                    else:
+                        grade_results.append('Not Attempted')
 
-        return [course_grade.percent] + _flatten(grade_results)
+            if assignment_info['separate_subsection_avg_headers'] and assignment_info['grader']:
+                assignment_averages = _assignment_averages(assignment_info['grader'], subsection_percents, attempted)
+                for grade_results, assignment_average in zip(users_grade_results, assignment_averages):
+                    grade_results.append(assignment_average)
 
-    def _user_subsection_grades(self, course_grade, subsection_headers):
-        """
-        Returns a list of grade results for the given course_grade corresponding
-        to the headers for this report.
-        """
-        subsection_grades = []
-        grade_results = []
-        for subsection_location in subsection_headers:
-            subsection_grade = course_grade.subsection_grade(subsection_location)
-            if subsection_grade.attempted_graded or subsection_grade.override:
-                grade_result = subsection_grade.percent_graded
-            else:
-                grade_result = 'Not Attempted'
-            grade_results.append([grade_result])
-            subsection_grades.append(subsection_grade)
-        return subsection_grades, grade_results
-
-    def _user_assignment_average(self, course_grade, subsection_grades, assignment_info):  # lint-amnesty, pylint: disable=missing-function-docstring
-        if assignment_info['separate_subsection_avg_headers']:
-            if assignment_info['grader']:
-                if course_grade.attempted:
-                    subsection_breakdown = [
-                        {'percent': subsection_grade.percent_graded}
-                        for subsection_grade in subsection_grades
-                    ]
-                    assignment_average, _ = assignment_info['grader'].total_with_drops(subsection_breakdown)
-                else:
-                    assignment_average = 0.0
-                return assignment_average
+        return users_grade_results
 
     def _user_cohort_group_names(self, user, context):
         """
@@ -678,34 +844,43 @@ class CourseGradeReport:
         with modulestore().bulk_operations(context.course_id):
             bulk_context = _CourseGradeBulkContext(context, users)
 
-            success_rows, error_rows = [], []
+            graded_users, course_grades, error_rows = [], [], []
             for user, course_grade, error in CourseGradeFactory().iter(
                 users,
                 course=context.course,
                 collected_block_structure=context.course_structure,
                 course_key=context.course_id,
+                batch_size=len(users),
             ):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
                     error_rows.append([user.id, user.username, str(error)])
                 else:
-                    success_rows.append(
-                        [user.id, user.email, user.username] +
-                        self._user_grades(course_grade, context) +
-                        self._user_cohort_group_names(user, context) +
-                        self._user_experiment_group_names(user, context) +
-                        self._user_team_names(user, bulk_context.teams) +
-                        self._user_verification_mode(user, context, bulk_context.enrollments) +
-                        self._user_certificate_info(user, context, course_grade, bulk_context.certs) +
-                        [_user_enrollment_status(user, context.course_id)]
-                    )
+                    graded_users.append(user)
+                    course_grades.append(course_grade)
+
+            success_rows = [
+                [user.id, user.email, user.username] +
+                user_grades +
+                self._user_cohort_group_names(user, context) +
+                self._user_experiment_group_names(user, context) +
+                self._user_team_names(user, bulk_context.teams) +
+                self._user_verification_mode(user, context, bulk_context.enrollments) +
+                self._user_certificate_info(user, context, course_grade, bulk_context.certs) +
+                [_user_enrollment_status(user, context.course_id)]
+                for user, course_grade, user_grades in zip(
+                    graded_users, course_grades, self._users_grades(course_grades, context),
+                )
+            ]
             return success_rows, error_rows
 
 
-class ProblemGradeReport(GradeReportBase):
+class ProblemGradeReport(_ShardedGradeReportMixin, GradeReportBase):
     """
     Class to encapsulate functionality related to generating Problem Grade Reports.
     """
+    REPORT_TYPE = 'problem_grade_report'
+    CONTEXT_CLASS = _ProblemGradeReportContext
 
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
@@ -722,6 +897,11 @@ class ProblemGradeReport(GradeReportBase):
         Generate a CSV containing all students' problem grades within a given
         `course_id`.
         """
+        if grade_reports_sharded(context.course_id):
+            progress = self._queue_shards(context)
+            if progress is not None:
+                return progress
+
         context.update_status('ProblemGradeReport - 1: Starting problem grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
@@ -767,6 +947,7 @@ class ProblemGradeReport(GradeReportBase):
             course=context.course,
             collected_block_structure=context.course_structure,
             course_key=context.course_id,
+            batch_size=len(users),
         ):
             context.task_progress.attempted += 1
             if not course_grade:
@@ -814,6 +995,163 @@ class ProblemGradeReport(GradeReportBase):
             get_cache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
 
 
+_SHARDED_GRADE_REPORTS = {
+    report_class.REPORT_TYPE: report_class
+    for report_class in (CourseGradeReport, ProblemGradeReport)
+}
+
+
+def _queue_grade_report_shard(entry_id, report_type, shard, subtask_status, xmodule_instance_args):
+    """
+    Queues the subtask generating the given shard of a grade report.
+    """
+    # Import here, as the tasks module depends on this one.
+    from lms.djangoapps.instructor_task import tasks  # pylint: disable=import-outside-toplevel
+    tasks.generate_grade_report_shard.apply_async(
+        (entry_id, report_type, shard, subtask_status.to_dict(), xmodule_instance_args),
+        task_id=subtask_status.task_id,
+    )
+
+
+def run_grade_report_shard(entry_id, report_type, shard, subtask_status_dict, xmodule_instance_args):
+    """
+    Generates the given shard of the grade report of the InstructorTask
+    entry, and records its status in the entry.  If it is the last shard
+    of the report to succeed, merges the partial CSVs of all the shards
+    into the final reports.
+
+    Returns the subtask status of the shard, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    try:
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+    except DuplicateTaskException:
+        TASK_LOG.warning('Grade report shard %s of instructor task %s is not valid, skipping', shard, entry_id)
+        return subtask_status.to_dict()
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    report_class = _SHARDED_GRADE_REPORTS[report_type]
+    try:
+        with modulestore().bulk_operations(entry.course_id):
+            context = report_class.CONTEXT_CLASS(
+                xmodule_instance_args,
+                entry_id,
+                entry.course_id,
+                json.loads(entry.task_input),
+                json.loads(entry.task_output)['action_name'],
+            )
+            report = report_class()
+            num_succeeded, num_failed = report._generate_shard(context, shard)  # pylint: disable=protected-access
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception('Grade report shard %s of instructor task %s failed', shard, entry_id)
+        subtask_status.increment(state=FAILURE)
+    else:
+        subtask_status.increment(succeeded=num_succeeded, failed=num_failed, state=SUCCESS)
+    # The entry is left in progress until the shards are merged.
+    update_subtask_status(entry_id, current_task_id, subtask_status, finish_task=False)
+
+    _merge_grade_report_shards_if_done(entry_id)
+    return subtask_status.to_dict()
+
+
+def _merge_grade_report_shards_if_done(entry_id):
+    """
+    Merges the partial CSVs of the shards of the grade report of the given
+    InstructorTask entry into the final reports, if all the shards have
+    succeeded and they have not already been merged.  If all the shards
+    have finished but some failed, marks the entry as failed instead.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+        return
+    if subtask_dict['failed']:
+        task_output = json.loads(entry.task_output)
+        task_output['message'] = f'{subtask_dict["failed"]} of {subtask_dict["total"]} grade report shards failed'
+        entry.task_output = InstructorTask.create_output_for_success(task_output)
+        entry.task_state = FAILURE
+        entry.save_now()
+        return
+    # cache.add fails if the key already exists
+    if not cache.add(f'grade-report-merge-{entry.task_id}', 'true', SUBTASK_LOCK_EXPIRE):
+        return
+
+    report_class = _SHARDED_GRADE_REPORTS[subtask_dict['report_type']]
+    task_output = json.loads(entry.task_output)
+    task_output.pop('message', None)
+    try:
+        with modulestore().bulk_operations(entry.course_id):
+            context = report_class.CONTEXT_CLASS(
+                subtask_dict['xmodule_instance_args'],
+                entry_id,
+                entry.course_id,
+                json.loads(entry.task_input),
+                task_output['action_name'],
+            )
+            for statname in ['attempted', 'succeeded', 'failed', 'skipped', 'total']:
+                setattr(context.task_progress, statname, task_output[statname])
+            context.update_status(f'Merging {subtask_dict["total"]} grade report shards')
+            report_class()._merge_shards(context, subtask_dict['total'])  # pylint: disable=protected-access
+            context.update_status('Merged grade report shards')
+    except Exception as exc:  # pylint: disable=broad-except
+        TASK_LOG.exception('Merging the grade report shards of instructor task %s failed', entry_id)
+        # Keep the progress of the shards, so that the merge can be retried.
+        task_output['message'] = str(exc)[:500]
+        entry.task_state = FAILURE
+        cache.delete(f'grade-report-merge-{entry.task_id}')
+    else:
+        entry.task_state = SUCCESS
+    entry.task_output = InstructorTask.create_output_for_success(task_output)
+    entry.save_now()
+
+
+def retry_failed_grade_report_shards(entry_id, include_unfinished=False):
+    """
+    Requeues the failed shards of the sharded grade report of the given
+    InstructorTask entry, without regenerating the shards that succeeded.
+    If include_unfinished is True, shards that have not finished, for
+    example because their worker was restarted, are requeued as well.
+    If all the shards succeeded but merging them failed, retries the merge.
+
+    Requeued shards get new subtask ids, so that they don't run into the
+    lock still held by a worker that died, and so that a previous run of
+    the shard that is still going can't record its status once more.
+
+    Returns the number of requeued shards.
+    """
+    with outer_atomic():
+        entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+        subtask_dict = json.loads(entry.subtasks) if entry.subtasks else {}
+        shards = subtask_dict.get('shards', {})
+        retried_subtask_ids = []
+        for subtask_id in list(shards):
+            state = SubtaskStatus.from_dict(subtask_dict['status'][subtask_id]).state
+            if state == SUCCESS or (state not in READY_STATES and not include_unfinished):
+                continue
+            if state in READY_STATES:
+                subtask_dict['failed'] -= 1
+            new_subtask_id = str(uuid4())
+            shards[new_subtask_id] = shards.pop(subtask_id)
+            del subtask_dict['status'][subtask_id]
+            subtask_dict['status'][new_subtask_id] = SubtaskStatus.create(new_subtask_id).to_dict()
+            retried_subtask_ids.append(new_subtask_id)
+
+        if retried_subtask_ids:
+            entry.subtasks = json.dumps(subtask_dict)
+            entry.task_state = PROGRESS
+            entry.save()
+
+    for subtask_id in retried_subtask_ids:
+        _queue_grade_report_shard(
+            entry_id, subtask_dict['report_type'], shards[subtask_id], SubtaskStatus.create(subtask_id),
+            subtask_dict['xmodule_instance_args'],
+        )
+    if shards and not retried_subtask_ids and entry.task_state == FAILURE:
+        _merge_grade_report_shards_if_done(entry_id)
+    return len(retried_subtask_ids)
+
+
 class ProblemResponses:
     """
     Class to encapsulate functionality related to generating Problem Responses Reports.
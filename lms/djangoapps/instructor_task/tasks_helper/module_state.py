@@ -5,8 +5,12 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from functools import partial
 from time import time
+from uuid import uuid4
 
+from celery.states import FAILURE, READY_STATES, SUCCESS
+from django.conf import settings
 from django.utils.translation import ugettext_noop
 from opaque_keys.edx.keys import UsageKey
 from xblock.runtime import KvsFieldData
@@ -21,17 +25,31 @@ from lms.djangoapps.courseware.courses import get_course_by_id, get_problems_in_
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.module_render import get_module_for_descriptor_internal
+from lms.djangoapps.grades.api import defer_subsection_updates
 from lms.djangoapps.grades.api import events as grades_events
 from xmodule.modulestore.django import modulestore
 
-from ..exceptions import UpdateProblemModuleStateError
+from ..config.waffle import module_state_updates_in_chunks, rescore_in_batches
+from ..exceptions import DuplicateTaskException, UpdateProblemModuleStateError
+from ..models import PROGRESS, InstructorTask
+from ..subtasks import (
+    SubtaskStatus,
+    _release_subtask_lock,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    update_subtask_status
+)
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
+# Number of student modules updated by a chunk subtask between two checkpoints of its progress.
+MODULE_STATE_UPDATE_CHECKPOINT_INTERVAL = 100
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+
+def perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name,
+                                batch_update_fcn=None, chunk_update_type=None, xmodule_instance_args=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -43,6 +61,18 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `batch_update_fcn` is provided and the course has the rescore_in_batches waffle flag enabled, it is
+    called instead of `update_fcn`, with the course as an additional first argument. The course is then only
+    loaded once, and the student modules are updated in batches of RESCORE_STUDENT_MODULES_PER_BATCH, each in
+    a single transaction after which the subsection grade updates of the batch are enqueued.
+
+    If `chunk_update_type` is provided and the course has the update_module_state_in_chunks waffle flag
+    enabled, the student modules are instead split into ranges of ids, each of which is updated by an
+    update_module_state_chunk subtask with the update functions registered for `chunk_update_type` (and the
+    `xmodule_instance_args`). The progress of each chunk is checkpointed to the InstructorTask, so that
+    requeue_module_state_update_chunks can resume the chunks where they stopped. Running this again for the
+    same InstructorTask, e.g. when the task is restarted, requeues its unfinished chunks.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -60,31 +90,29 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
-    usage_keys = []
-    problem_url = task_input.get('problem_url')
-    entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
     override_score_task = action_name == ugettext_noop('overridden')
-    problems = {}
-
-    # if problem_url is present make a usage key from it
-    if problem_url:
-        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
-        usage_keys.append(usage_key)
-
-        # find the problem descriptor:
-        problem_descriptor = modulestore().get_item(usage_key)
-        problems[str(usage_key)] = problem_descriptor
-
-    # if entrance_exam is present grab all problems in it
-    if entrance_exam_url:
-        problems = get_problems_in_section(entrance_exam_url)
-        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
 
     modules_to_update = _get_modules_to_update(
         course_id, usage_keys, student_identifier, filter_fcn, override_score_task
     )
 
+    if (
+        chunk_update_type is not None and not isinstance(modules_to_update, list) and
+        module_state_updates_in_chunks(course_id)
+    ):
+        progress = _queue_module_state_update_chunks(
+            entry_id, chunk_update_type, modules_to_update, action_name, xmodule_instance_args
+        )
+        if progress is not None:
+            return progress
+
+    if batch_update_fcn is not None and rescore_in_batches(course_id):
+        return _perform_module_state_update_in_batches(
+            batch_update_fcn, course_id, problems, modules_to_update, task_input, action_name, start_time
+        )
+
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
@@ -94,20 +122,93 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
         # There is no try here:  if there's an error, we let it throw, and the task will
         # be marked as FAILED, with a stack trace.
         update_status = update_fcn(module_descriptor, module_to_update, task_input)
-        if update_status == UPDATE_STATUS_SUCCEEDED:
-            # If the update_fcn returns true, then it performed some kind of work.
-            # Logging of failures is left to the update_fcn itself.
-            task_progress.succeeded += 1
-        elif update_status == UPDATE_STATUS_FAILED:
-            task_progress.failed += 1
-        elif update_status == UPDATE_STATUS_SKIPPED:
-            task_progress.skipped += 1
-        else:
-            raise UpdateProblemModuleStateError(f"Unexpected update_status returned: {update_status}")
+        _record_update_status(task_progress, update_status)
 
     return task_progress.update_task_state()
 
 
+def _perform_module_state_update_in_batches(batch_update_fcn, course_id, problems, modules_to_update, task_input,
+                                            action_name, start_time):
+    """
+    Visits the `modules_to_update` StudentModule instances with the `batch_update_fcn` provided, in
+    batches of RESCORE_STUDENT_MODULES_PER_BATCH, and returns the task's results.
+
+    Each batch is updated in a single transaction, see _update_batch_of_modules.
+    """
+    batch_size = settings.RESCORE_STUDENT_MODULES_PER_BATCH
+    if isinstance(modules_to_update, list):
+        total = len(modules_to_update)
+        batches = (
+            modules_to_update[index:index + batch_size] for index in range(0, total, batch_size)
+        )
+    else:
+        total = modules_to_update.count()
+        batches = _get_batches_of_modules(modules_to_update.select_related('student'), batch_size)
+
+    task_progress = TaskProgress(action_name, total, start_time)
+    task_progress.update_task_state()
+
+    course = None
+    for batch in batches:
+        if course is None:
+            course = get_course_by_id(course_id)
+        _update_batch_of_modules(batch_update_fcn, course_id, course, problems, batch, task_input, task_progress)
+        task_progress.update_task_state(extra_meta={'attempted_per_second': task_progress.attempted_per_second})
+
+    return task_progress.update_task_state(extra_meta={'attempted_per_second': task_progress.attempted_per_second})
+
+
+def _update_batch_of_modules(batch_update_fcn, course_id, course, problems, batch, task_input, progress):
+    """
+    Updates the StudentModule instances of the `batch` with the `batch_update_fcn` in a single transaction,
+    and counts their update statuses in `progress`. The subsection grade updates caused by the batch are
+    enqueued once it is committed, so that they read the new scores, and none are enqueued if it fails.
+    """
+    with defer_subsection_updates():
+        with outer_atomic():
+            with modulestore().bulk_operations(course_id):
+                for module_to_update in batch:
+                    progress.attempted += 1
+                    module_descriptor = problems[str(module_to_update.module_state_key)]
+                    update_status = batch_update_fcn(course, module_descriptor, module_to_update, task_input)
+                    _record_update_status(progress, update_status)
+
+
+def _get_batches_of_modules(student_modules, batch_size):
+    """
+    Yields lists of at most `batch_size` of the `student_modules` queryset, in order of id.
+
+    Each batch is fetched by its own query, starting after the last id of the previous batch, so
+    that the rows updated by a batch don't move the following ones.
+    """
+    student_modules = student_modules.order_by('id')
+    last_id = None
+    while True:
+        batch_query = student_modules if last_id is None else student_modules.filter(id__gt=last_id)
+        batch = list(batch_query[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
+def _record_update_status(task_progress, update_status):
+    """
+    Counts the `update_status` returned by an update function in `task_progress`, which may be a
+    TaskProgress or the SubtaskStatus of a chunk.
+    """
+    if update_status == UPDATE_STATUS_SUCCEEDED:
+        # If the update_fcn returns true, then it performed some kind of work.
+        # Logging of failures is left to the update_fcn itself.
+        task_progress.succeeded += 1
+    elif update_status == UPDATE_STATUS_FAILED:
+        task_progress.failed += 1
+    elif update_status == UPDATE_STATUS_SKIPPED:
+        task_progress.skipped += 1
+    else:
+        raise UpdateProblemModuleStateError(f"Unexpected update_status returned: {update_status}")
+
+
 @outer_atomic
 def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
@@ -121,69 +222,70 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
     Returns True if problem was successfully rescored for the given student, and False
     if problem encountered some kind of error in rescoring.
     '''
-    # unpack the StudentModule:
     course_id = student_module.course_id
-    student = student_module.student
-    usage_key = student_module.module_state_key
-
     with modulestore().bulk_operations(course_id):
         course = get_course_by_id(course_id)
-        # TODO: Here is a call site where we could pass in a loaded course.  I
-        # think we certainly need it since grading is happening here, and field
-        # overrides would be important in handling that correctly
-        instance = _get_module_instance_for_task(
-            course_id,
-            student,
-            module_descriptor,
-            xmodule_instance_args,
-            grade_bucket_type='rescore',
-            course=course
+        return rescore_problem_module_state_in_course(
+            xmodule_instance_args, course, module_descriptor, student_module, task_input
         )
 
-        if instance is None:
-            # Either permissions just changed, or someone is trying to be clever
-            # and load something they shouldn't have access to.
-            msg = "No module {location} for student {student}--access denied?".format(
-                location=usage_key,
-                student=student
-            )
-            TASK_LOG.warning(msg)
-            return UPDATE_STATUS_FAILED
 
-        if not hasattr(instance, 'rescore'):
-            # This should not happen, since it should be already checked in the
-            # caller, but check here to be sure.
-            msg = f"Specified module {usage_key} of type {instance.__class__} does not support rescoring."
-            raise UpdateProblemModuleStateError(msg)
+def rescore_problem_module_state_in_course(xmodule_instance_args, course, module_descriptor, student_module,
+                                           task_input):
+    '''
+    Performs rescoring on the student's problem submission like rescore_problem_module_state,
+    with the already loaded `course` of the StudentModule, and in the caller's transaction.
 
-        # We check here to see if the problem has any submissions. If it does not, we don't want to rescore it
-        if not instance.has_submitted_answer():
-            return UPDATE_STATUS_SKIPPED
+    Used to rescore the problems of many students in batches.
+    '''
+    # unpack the StudentModule:
+    course_id = student_module.course_id
+    student = student_module.student
+    usage_key = student_module.module_state_key
 
-        # Set the tracking info before this call, because it makes downstream
-        # calls that create events.  We retrieve and store the id here because
-        # the request cache will be erased during downstream calls.
-        create_new_event_transaction_id()
-        set_event_transaction_type(grades_events.GRADES_RESCORE_EVENT_TYPE)
-
-        # specific events from CAPA are not propagated up the stack. Do we want this?
-        try:
-            instance.rescore(only_if_higher=task_input['only_if_higher'])
-        except (LoncapaProblemError, StudentInputError, ResponseError):
-            TASK_LOG.warning(
-                "error processing rescore call for course %(course)s, problem %(loc)s "
-                "and student %(student)s",
-                dict(
-                    course=course_id,
-                    loc=usage_key,
-                    student=student
-                )
-            )
-            return UPDATE_STATUS_FAILED
+    # The loaded course is passed in since grading is happening here, and
+    # field overrides would be important in handling that correctly
+    instance = _get_module_instance_for_task(
+        course_id,
+        student,
+        module_descriptor,
+        xmodule_instance_args,
+        grade_bucket_type='rescore',
+        course=course
+    )
 
-        instance.save()
-        TASK_LOG.debug(
-            "successfully processed rescore call for course %(course)s, problem %(loc)s "
+    if instance is None:
+        # Either permissions just changed, or someone is trying to be clever
+        # and load something they shouldn't have access to.
+        msg = "No module {location} for student {student}--access denied?".format(
+            location=usage_key,
+            student=student
+        )
+        TASK_LOG.warning(msg)
+        return UPDATE_STATUS_FAILED
+
+    if not hasattr(instance, 'rescore'):
+        # This should not happen, since it should be already checked in the
+        # caller, but check here to be sure.
+        msg = f"Specified module {usage_key} of type {instance.__class__} does not support rescoring."
+        raise UpdateProblemModuleStateError(msg)
+
+    # We check here to see if the problem has any submissions. If it does not, we don't want to rescore it
+    if not instance.has_submitted_answer():
+        return UPDATE_STATUS_SKIPPED
+
+    # Set the tracking info before this call, because it makes downstream
+    # calls that create events.  We retrieve and store the id here because
+    # the request cache will be erased during downstream calls.
+    create_new_event_transaction_id()
+    set_event_transaction_type(grades_events.GRADES_RESCORE_EVENT_TYPE)
+
+    # specific events from CAPA are not propagated up the stack. Do we want this?
+    try:
+        instance.rescore(only_if_higher=task_input['only_if_higher'])
+    except (LoncapaProblemError, StudentInputError, ResponseError):
+        TASK_LOG.warning(
+            "error processing rescore call for course %(course)s, problem %(loc)s "
             "and student %(student)s",
             dict(
                 course=course_id,
@@ -191,8 +293,20 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
                 student=student
             )
         )
+        return UPDATE_STATUS_FAILED
+
+    instance.save()
+    TASK_LOG.debug(
+        "successfully processed rescore call for course %(course)s, problem %(loc)s "
+        "and student %(student)s",
+        dict(
+            course=course_id,
+            loc=usage_key,
+            student=student
+        )
+    )
 
-        return UPDATE_STATUS_SUCCEEDED
+    return UPDATE_STATUS_SUCCEEDED
 
 
 @outer_atomic
@@ -387,6 +501,33 @@ def _get_task_id_from_xmodule_args(xmodule_instance_args):
         return xmodule_instance_args.get('task_id', UNKNOWN_TASK_ID)
 
 
+def _get_problems_to_update(course_id, task_input):
+    """
+    Returns the list of the usage keys of the problems to update, given by the `problem_url` or the
+    `entrance_exam_url` of the `task_input`, and a dict of their descriptors by usage key string.
+    """
+    usage_keys = []
+    problems = {}
+    problem_url = task_input.get('problem_url')
+    entrance_exam_url = task_input.get('entrance_exam_url')
+
+    # if problem_url is present make a usage key from it
+    if problem_url:
+        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
+        usage_keys.append(usage_key)
+
+        # find the problem descriptor:
+        problem_descriptor = modulestore().get_item(usage_key)
+        problems[str(usage_key)] = problem_descriptor
+
+    # if entrance_exam is present grab all problems in it
+    if entrance_exam_url:
+        problems = get_problems_in_section(entrance_exam_url)
+        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+
+    return usage_keys, problems
+
+
 def _get_modules_to_update(course_id, usage_keys, student_identifier, filter_fcn, override_score_task=False):
     """
     Fetches a StudentModule instances for a given `course_id`, `student` object, and `usage_keys`.
@@ -430,3 +571,259 @@ def _get_modules_to_update(course_id, usage_keys, student_identifier, filter_fcn
             for key in usage_keys
         ]
     return student_modules
+
+
+# The update functions of the module state updates that can be performed in chunks, by update type.
+# They are the update_fcn and batch_update_fcn of perform_module_state_update, before binding their
+# xmodule_instance_args.
+_CHUNKED_MODULE_STATE_UPDATES = {
+    'rescore': (rescore_problem_module_state, rescore_problem_module_state_in_course),
+    'override_score': (override_score_module_state, None),
+    'reset_attempts': (reset_attempts_module_state, None),
+}
+
+
+def _get_module_state_update_chunks(modules_to_update):
+    """
+    Returns a list of chunks of the `modules_to_update` queryset, each a dict with the index of the chunk,
+    the range of ids of its student modules and its last checkpoint, and the total number of student modules.
+    """
+    chunks = []
+    num_modules = 0
+    module_ids = modules_to_update.values_list('id', flat=True).order_by('id')
+    for num_modules, module_id in enumerate(module_ids.iterator(), start=1):
+        if (num_modules - 1) % settings.MODULE_STATE_UPDATE_STUDENT_MODULES_PER_CHUNK == 0:
+            chunks.append({'index': len(chunks), 'min_id': module_id, 'max_id': module_id, 'checkpoint': None})
+        else:
+            chunks[-1]['max_id'] = module_id
+    return chunks, num_modules
+
+
+def _queue_module_state_update_chunks(entry_id, update_type, modules_to_update, action_name,
+                                      xmodule_instance_args):
+    """
+    Queues the subtasks updating the chunks of the `modules_to_update`, and returns the task progress as
+    stored in the InstructorTask, or None if there are no student modules to update.
+
+    If the chunks of the InstructorTask have already been queued, requeues its unfinished chunks instead.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if entry.subtasks and 'chunks' in json.loads(entry.subtasks):
+        TASK_LOG.info('Instructor task %s was restarted, resuming its unfinished chunks', entry_id)
+        requeue_module_state_update_chunks(entry_id)
+        return json.loads(InstructorTask.objects.get(pk=entry_id).task_output)
+
+    chunks, num_modules = _get_module_state_update_chunks(modules_to_update)
+    if not chunks:
+        return None
+
+    subtask_ids = [str(uuid4()) for _ in chunks]
+    with outer_atomic():
+        entry = InstructorTask.objects.get(pk=entry_id)
+        progress = initialize_subtask_info(entry, action_name, num_modules, subtask_ids)
+        subtask_dict = json.loads(entry.subtasks)
+        subtask_dict['update_type'] = update_type
+        subtask_dict['xmodule_instance_args'] = xmodule_instance_args
+        subtask_dict['chunks'] = dict(zip(subtask_ids, chunks))
+        entry.subtasks = json.dumps(subtask_dict)
+        entry.save_now()
+
+    TASK_LOG.info(
+        'Instructor task %s, Task type: %s, Queueing %s chunks of %s student modules',
+        entry_id, action_name, len(chunks), num_modules,
+    )
+    for subtask_id, chunk in zip(subtask_ids, chunks):
+        _queue_module_state_update_chunk(
+            entry_id, update_type, chunk, SubtaskStatus.create(subtask_id), xmodule_instance_args
+        )
+    return progress
+
+
+def _queue_module_state_update_chunk(entry_id, update_type, chunk, subtask_status, xmodule_instance_args):
+    """
+    Queues the subtask updating the given chunk of student modules.
+    """
+    # Import here, as the tasks module depends on this one.
+    from lms.djangoapps.instructor_task import tasks  # pylint: disable=import-outside-toplevel
+    tasks.update_module_state_chunk.apply_async(
+        (entry_id, update_type, chunk, subtask_status.to_dict(), xmodule_instance_args),
+        task_id=subtask_status.task_id,
+    )
+
+
+def run_module_state_update_chunk(entry_id, update_type, chunk, subtask_status_dict, xmodule_instance_args):
+    """
+    Updates the student modules of the given chunk of the InstructorTask entry, starting after its last
+    checkpoint, and records its status in the entry. The progress of the chunk is checkpointed every
+    MODULE_STATE_UPDATE_CHECKPOINT_INTERVAL student modules.
+
+    Returns the subtask status of the chunk, as a dict.
+
+    If the chunk is requeued under a new subtask id while it is running, it stops at its next checkpoint
+    without recording its status, and the requeued chunk resumes after that checkpoint.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    try:
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+    except DuplicateTaskException:
+        TASK_LOG.warning('Chunk %s of instructor task %s is not valid, skipping', chunk, entry_id)
+        return subtask_status.to_dict()
+
+    try:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        checkpoint = json.loads(entry.subtasks)['chunks'][current_task_id]['checkpoint']
+        last_id = None
+        if checkpoint is not None:
+            TASK_LOG.info('Resuming chunk %s of instructor task %s after student module %s', chunk, entry_id,
+                          checkpoint['last_id'])
+            last_id = checkpoint['last_id']
+            # The checkpoint may have been made under the subtask id the chunk had before it was requeued.
+            subtask_status = SubtaskStatus.from_dict(dict(checkpoint['status'], task_id=current_task_id))
+        subtask_status.increment(state=PROGRESS)
+
+        with modulestore().bulk_operations(entry.course_id):
+            _update_module_state_chunk(entry, update_type, chunk, last_id, subtask_status, xmodule_instance_args)
+    except DuplicateTaskException:
+        TASK_LOG.warning('Chunk %s of instructor task %s was requeued while running, stopping', chunk, entry_id)
+        _release_subtask_lock(current_task_id)
+        return subtask_status.to_dict()
+    except Exception:  # pylint: disable=broad-except
+        TASK_LOG.exception('Chunk %s of instructor task %s failed', chunk, entry_id)
+        subtask_status.increment(state=FAILURE)
+    else:
+        subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+
+    _finish_module_state_update_if_done(entry_id)
+    return subtask_status.to_dict()
+
+
+def _update_module_state_chunk(entry, update_type, chunk, last_id, subtask_status, xmodule_instance_args):
+    """
+    Updates the student modules of the chunk with ids greater than `last_id`, counting their update statuses
+    in `subtask_status`, and checkpoints the progress of the chunk after each batch of them.
+    """
+    course_id = entry.course_id
+    task_input = json.loads(entry.task_input)
+    update_fcn, batch_update_fcn = _CHUNKED_MODULE_STATE_UPDATES[update_type]
+    update_fcn = partial(update_fcn, xmodule_instance_args)
+    course = None
+    if batch_update_fcn is not None and rescore_in_batches(course_id):
+        batch_update_fcn = partial(batch_update_fcn, xmodule_instance_args)
+        course = get_course_by_id(course_id)
+
+    usage_keys, problems = _get_problems_to_update(course_id, task_input)
+    modules_to_update = _get_modules_to_update(course_id, usage_keys, task_input.get('student'), None).filter(
+        id__gte=chunk['min_id'],
+        id__lte=chunk['max_id'],
+    )
+    if last_id is not None:
+        modules_to_update = modules_to_update.filter(id__gt=last_id)
+
+    batches = _get_batches_of_modules(
+        modules_to_update.select_related('student'), MODULE_STATE_UPDATE_CHECKPOINT_INTERVAL
+    )
+    for batch in batches:
+        if course is not None:
+            _update_batch_of_modules(batch_update_fcn, course_id, course, problems, batch, task_input, subtask_status)
+        else:
+            for module_to_update in batch:
+                subtask_status.attempted += 1
+                module_descriptor = problems[str(module_to_update.module_state_key)]
+                update_status = update_fcn(module_descriptor, module_to_update, task_input)
+                _record_update_status(subtask_status, update_status)
+        _checkpoint_module_state_update_chunk(entry.id, subtask_status, batch[-1].id)
+
+
+def _checkpoint_module_state_update_chunk(entry_id, subtask_status, last_id):
+    """
+    Records in the InstructorTask entry that its chunk has been updated up to the student module
+    with id `last_id`, with the given subtask status.
+
+    Raises a DuplicateTaskException if the chunk has been requeued under another subtask id.
+    """
+    with outer_atomic():
+        entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+        subtask_dict = json.loads(entry.subtasks)
+        if subtask_status.task_id not in subtask_dict['chunks']:
+            raise DuplicateTaskException(
+                f'Chunk subtask {subtask_status.task_id} of instructor task {entry_id} has been requeued'
+            )
+        subtask_dict['chunks'][subtask_status.task_id]['checkpoint'] = {
+            'last_id': last_id,
+            'status': subtask_status.to_dict(),
+        }
+        subtask_dict['status'][subtask_status.task_id] = subtask_status.to_dict()
+        entry.subtasks = json.dumps(subtask_dict)
+        entry.save()
+
+
+def _finish_module_state_update_if_done(entry_id):
+    """
+    Marks the InstructorTask entry as succeeded if all its chunks have succeeded, or as failed if all its
+    chunks have finished but some failed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['succeeded'] + subtask_dict['failed'] < subtask_dict['total']:
+        return
+    task_output = json.loads(entry.task_output)
+    if subtask_dict['failed']:
+        task_output['message'] = f'{subtask_dict["failed"]} of {subtask_dict["total"]} chunks failed'
+        entry.task_state = FAILURE
+    else:
+        task_output.pop('message', None)
+        entry.task_state = SUCCESS
+    entry.task_output = InstructorTask.create_output_for_success(task_output)
+    entry.save_now()
+
+
+def requeue_module_state_update_chunks(entry_id, include_failed=False):
+    """
+    Requeues the unfinished chunks of the module state update of the given InstructorTask entry, for
+    example after their worker was restarted, each resuming after its last checkpoint. If include_failed
+    is True, the failed chunks are requeued as well. The chunks that succeeded are not updated again.
+
+    Each chunk is requeued under a new subtask id, with its checkpoint. The lock of its previous subtask
+    may still be held by a lost worker, and a copy of it that is still running stops at its next checkpoint
+    rather than updating the chunk twice.
+
+    Returns the number of requeued chunks.
+    """
+    with outer_atomic():
+        entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+        subtask_dict = json.loads(entry.subtasks) if entry.subtasks else {}
+        chunks = subtask_dict.get('chunks', {})
+        task_output = json.loads(entry.task_output)
+        requeued_subtask_ids = []
+        for subtask_id in list(chunks):
+            subtask_status = SubtaskStatus.from_dict(subtask_dict['status'][subtask_id])
+            if subtask_status.state == SUCCESS or (subtask_status.state in READY_STATES and not include_failed):
+                continue
+            if subtask_status.state in READY_STATES:
+                # The counts of the failed chunk are added again when it finishes.
+                subtask_dict['failed'] -= 1
+                for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+                    task_output[statname] -= getattr(subtask_status, statname)
+            new_subtask_id = str(uuid4())
+            chunks[new_subtask_id] = chunks.pop(subtask_id)
+            del subtask_dict['status'][subtask_id]
+            subtask_dict['status'][new_subtask_id] = SubtaskStatus.create(new_subtask_id).to_dict()
+            requeued_subtask_ids.append(new_subtask_id)
+
+        if requeued_subtask_ids:
+            task_output.pop('message', None)
+            entry.subtasks = json.dumps(subtask_dict)
+            entry.task_output = InstructorTask.create_output_for_success(task_output)
+            entry.task_state = PROGRESS
+            entry.save()
+
+    for subtask_id in requeued_subtask_ids:
+        _queue_module_state_update_chunk(
+            entry_id, subtask_dict['update_type'], chunks[subtask_id], SubtaskStatus.create(subtask_id),
+            subtask_dict['xmodule_instance_args'],
+        )
+    if chunks and not requeued_subtask_ids:
+        _finish_module_state_update_if_done(entry_id)
+    return len(requeued_subtask_ids)
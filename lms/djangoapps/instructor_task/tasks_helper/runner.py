@@ -32,6 +32,14 @@ class TaskProgress:
         self.failed = 0
         self.preassigned = 0
 
+    @property
+    def attempted_per_second(self):
+        """
+        The number of updates attempted per second since the task started.
+        """
+        duration = time() - self.start_time
+        return round(self.attempted / duration, 2) if duration > 0 else 0
+
     @property
     def state(self):
         return {
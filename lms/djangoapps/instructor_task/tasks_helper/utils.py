@@ -3,6 +3,13 @@ Utility methods for instructor tasks
 """
 
 
+import csv
+import os
+from io import StringIO
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+
+from django.core.files import File
 from eventtracking import tracker
 
 from common.djangoapps.util.file import course_filename_prefix_generator
@@ -18,6 +25,9 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# directory, within a course's report directory, in which partial CSVs are stored
+PARTIAL_REPORTS_DIRECTORY = 'partial'
+
 
 def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
     """
@@ -48,6 +58,83 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     return report_name
 
 
+def _partial_csv_name(csv_name, entry_id, part_index):
+    """
+    Returns the name, relative to the course's report directory, of a part
+    of a CSV report being generated by the given InstructorTask entry.
+    """
+    return os.path.join(PARTIAL_REPORTS_DIRECTORY, str(entry_id), f'{csv_name}_{part_index:05d}.csv')
+
+
+def upload_partial_csv_to_report_store(rows, csv_name, course_id, entry_id, part_index, config_name='GRADES_DOWNLOAD'):
+    """
+    Upload rows of a part of a CSV report using ReportStore. The parts are
+    stored out of the course's list of reports, until they are merged by
+    merge_partial_csvs_in_report_store.
+
+    Arguments:
+        rows: CSV data, without a header row
+        csv_name: Name of the CSV the rows are part of
+        course_id: ID of the course
+        entry_id: ID of the InstructorTask generating the CSV
+        part_index: Position of these rows in the CSV
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_rows(course_id, _partial_csv_name(csv_name, entry_id, part_index), rows)
+
+
+def merge_partial_csvs_in_report_store(
+    header_row,
+    csv_name,
+    course_id,
+    entry_id,
+    num_parts,
+    timestamp,
+    config_name='GRADES_DOWNLOAD',
+    skip_if_empty=False,
+):
+    """
+    Concatenates the parts of a CSV report uploaded by
+    upload_partial_csv_to_report_store, in order and after the given
+    header row, into a single CSV stored using ReportStore, and deletes
+    the parts. Parts that were not uploaded are considered empty.
+
+    Returns:
+        report_name: string - Name of the generated report, or None if
+            skip_if_empty is True and all the parts are empty.
+    """
+    report_store = ReportStore.from_config(config_name)
+    storage = report_store.storage
+    part_paths = [
+        report_store.path_to(course_id, _partial_csv_name(csv_name, entry_id, part_index))
+        for part_index in range(num_parts)
+    ]
+    part_paths = [path for path in part_paths if storage.exists(path)]
+    if skip_if_empty and not part_paths:
+        return None
+
+    report_name = "{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+    # Stream the parts through a temporary file, rather than reading the
+    # whole report into memory.
+    header_buffer = StringIO()
+    csv.writer(header_buffer).writerow([str(item) for item in header_row])
+    with TemporaryFile() as output_file:
+        output_file.write(header_buffer.getvalue().encode('utf-8'))
+        for path in part_paths:
+            with storage.open(path, 'rb') as part_file:
+                copyfileobj(part_file, output_file)
+        output_file.seek(0)
+        storage.save(report_store.path_to(course_id, report_name), File(output_file))
+    for path in part_paths:
+        storage.delete(path)
+    tracker_emit(csv_name)
+    return report_name
+
+
 def upload_zip_to_report_store(file, zip_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
     """
     Upload given file buffer as a zip file using ReportStore.
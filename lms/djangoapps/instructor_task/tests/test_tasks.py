@@ -13,14 +13,19 @@ from uuid import uuid4
 import pytest
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_noop
+from edx_toggles.toggles.testutils import override_waffle_flag
 from opaque_keys.edx.keys import i4xEncoder
 
 from common.djangoapps.course_modes.models import CourseMode
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
+from lms.djangoapps.instructor_task.api import resume_module_state_update_chunks
+from lms.djangoapps.instructor_task.config.waffle import RESCORE_IN_BATCHES, UPDATE_MODULE_STATE_IN_CHUNKS, waffle_flags
 from lms.djangoapps.instructor_task.exceptions import UpdateProblemModuleStateError
-from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import _acquire_subtask_lock
 from lms.djangoapps.instructor_task.tasks import (
     delete_problem_state,
     export_ora2_data,
@@ -31,6 +36,11 @@ from lms.djangoapps.instructor_task.tasks import (
     rescore_problem,
     reset_problem_attempts
 )
+from lms.djangoapps.instructor_task.tasks_helper.module_state import (
+    _CHUNKED_MODULE_STATE_UPDATES,
+    reset_attempts_module_state,
+    run_module_state_update_chunk
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskModuleTestCase
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -491,6 +501,44 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    @override_settings(RESCORE_STUDENT_MODULES_PER_BATCH=3)
+    def test_rescoring_in_batches(self):
+        """
+        Tests rescores a problem in a course, for all students, in batches that load the course once.
+        """
+        mock_instance = MagicMock()
+        mock_instance.has_submitted_answer.side_effect = [True] * 8 + [False] * 2
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with override_waffle_flag(waffle_flags()[RESCORE_IN_BATCHES], active=True), patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module, patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_course_by_id',
+                return_value=self.course,
+        ) as mock_get_course, patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.defer_subsection_updates'
+        ) as mock_defer:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        assert mock_get_module.call_count == num_students
+        assert mock_instance.rescore.call_count == 8
+        mock_get_course.assert_called_once_with(self.course.id)
+        # The 10 students are rescored in 4 batches.
+        assert mock_defer.call_count == 4
+        assert 'attempted_per_second' in self.current_task.update_state.call_args[1]['meta']
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=8,
+            skipped=2,
+            failed=0,
+            action_name='rescored'
+        )
+
 
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
     """Tests instructor task that resets problem attempts."""
@@ -590,6 +638,130 @@ class TestResetAttemptsInstructorTask(TestInstructorTasks):
         self._test_reset_with_student(True)
 
 
+@override_settings(MODULE_STATE_UPDATE_STUDENT_MODULES_PER_CHUNK=2)
+class TestChunkedResetAttemptsInstructorTask(TestInstructorTasks):
+    """Tests instructor task that resets problem attempts in chunks."""
+
+    def setUp(self):
+        super().setUp()
+        self.students = self._create_students_with_state(5, json.dumps({'attempts': 3}))
+        self.module_ids = list(
+            StudentModule.objects.filter(course_id=self.course.id).order_by('id').values_list('id', flat=True)
+        )
+        self.failing_module_ids = set()
+        self.lost_chunk_indices = set()
+        self.requeuing_module_ids = set()
+        self.entry_id = None
+
+        # Run the chunk subtasks synchronously, except for the ones in lost_chunk_indices
+        patcher = patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state._queue_module_state_update_chunk',
+            side_effect=self._run_chunk,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch.dict(_CHUNKED_MODULE_STATE_UPDATES, {'reset_attempts': (self._reset_attempts, None)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            'lms.djangoapps.instructor_task.tasks_helper.module_state.MODULE_STATE_UPDATE_CHECKPOINT_INTERVAL', 1
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run_chunk(self, entry_id, update_type, chunk, subtask_status, xmodule_instance_args):
+        """
+        Runs the given chunk, unless it is one of the lost chunks, whose worker dies holding their lock.
+        """
+        if chunk['index'] in self.lost_chunk_indices:
+            _acquire_subtask_lock(subtask_status.task_id)
+            return
+        run_module_state_update_chunk(entry_id, update_type, chunk, subtask_status.to_dict(), xmodule_instance_args)
+
+    def _reset_attempts(self, xmodule_instance_args, module_descriptor, student_module, task_input):
+        """
+        Resets the attempts of the student module, raising an error if it is one of the failing modules, and
+        requeuing the unfinished chunks first if it is one of the requeuing modules.
+        """
+        if student_module.id in self.failing_module_ids:
+            raise TestTaskFailure('Worker lost')
+        if student_module.id in self.requeuing_module_ids:
+            self.requeuing_module_ids.remove(student_module.id)
+            resume_module_state_update_chunks(self.entry_id)
+        return reset_attempts_module_state(xmodule_instance_args, module_descriptor, student_module, task_input)
+
+    def _run_task(self, task_entry=None):
+        """
+        Runs the reset attempts task in chunks, and returns its InstructorTask entry.
+        """
+        task_entry = task_entry or self._create_input_entry()
+        self.entry_id = task_entry.id
+        with override_waffle_flag(waffle_flags()[UPDATE_MODULE_STATE_IN_CHUNKS], active=True):
+            self._run_task_with_mock_celery(reset_problem_attempts, task_entry.id, task_entry.task_id)
+        return InstructorTask.objects.get(id=task_entry.id)
+
+    def _assert_task_succeeded(self, entry, **expected_output):
+        """
+        Checks that the task succeeded, with the given counts in its output.
+        """
+        assert entry.task_state == SUCCESS
+        output = json.loads(entry.task_output)
+        for statname, value in expected_output.items():
+            assert output[statname] == value
+        assert json.loads(entry.subtasks)['succeeded'] == 3
+        self._assert_num_attempts(self.students, 0)
+
+    def test_reset_in_chunks(self):
+        entry = self._run_task()
+        assert len(json.loads(entry.subtasks)['chunks']) == 3
+        self._assert_task_succeeded(entry, total=5, attempted=5, succeeded=5, skipped=0, failed=0)
+
+    def test_resume_failed_chunk(self):
+        self.failing_module_ids = {self.module_ids[3]}
+        entry = self._run_task()
+        assert entry.task_state == FAILURE
+        assert json.loads(entry.task_output)['message'] == '1 of 3 chunks failed'
+
+        self.failing_module_ids = set()
+        assert resume_module_state_update_chunks(entry.id) == 1
+        # The module updated before the chunk failed is not updated again, which would skip it.
+        self._assert_task_succeeded(
+            InstructorTask.objects.get(id=entry.id), total=5, attempted=5, succeeded=5, skipped=0, failed=0,
+        )
+
+    def test_restarted_task_resumes_chunks(self):
+        self.lost_chunk_indices = {1}
+        task_entry = self._create_input_entry()
+        entry = self._run_task(task_entry)
+        assert entry.task_state == PROGRESS
+
+        self.lost_chunk_indices = set()
+        entry = self._run_task(task_entry)
+        assert len(json.loads(entry.subtasks)['chunks']) == 3
+        self._assert_task_succeeded(entry, total=5, attempted=5, succeeded=5, skipped=0, failed=0)
+
+    def test_resume_lost_chunk(self):
+        self.lost_chunk_indices = {1}
+        entry = self._run_task()
+        lost_subtask_ids = set(json.loads(entry.subtasks)['chunks'])
+
+        self.lost_chunk_indices = set()
+        assert resume_module_state_update_chunks(entry.id) == 1
+        entry = InstructorTask.objects.get(id=entry.id)
+        # The lost chunk is requeued under a new id, since its lock is still held.
+        assert len(set(json.loads(entry.subtasks)['chunks']) - lost_subtask_ids) == 1
+        self._assert_task_succeeded(entry, total=5, attempted=5, succeeded=5, skipped=0, failed=0)
+
+    def test_chunk_requeued_while_running(self):
+        # The second chunk is requeued while it updates its second module, and the requeued copy of it
+        # runs to completion before the first copy reaches its next checkpoint, where it stops.
+        self.requeuing_module_ids = {self.module_ids[3]}
+        entry = self._run_task()
+        assert len(json.loads(entry.subtasks)['chunks']) == 3
+        self._assert_task_succeeded(entry, total=5, attempted=5, succeeded=5, skipped=0, failed=0)
+
+
 class TestDeleteStateInstructorTask(TestInstructorTasks):
     """Tests instructor task that deletes problem state."""
 
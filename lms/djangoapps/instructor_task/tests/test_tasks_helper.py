@@ -7,16 +7,19 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
 from collections import OrderedDict
 from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
+from unittest import TestCase
 from unittest.mock import ANY, MagicMock, Mock, patch
 from urllib.parse import quote
 
 import ddt
+import numpy
 import unicodecsv
 from django.conf import settings
 from django.test.utils import override_settings
@@ -39,6 +42,9 @@ from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsec
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
 from lms.djangoapps.instructor_analytics.basic import UNAVAILABLE, list_problem_responses
+from lms.djangoapps.instructor_task.config.waffle import GENERATE_GRADE_REPORTS_SHARDED, waffle_flags
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import _acquire_subtask_lock
 from lms.djangoapps.instructor_task.tasks_helper.certs import (
     generate_students_certificates,
     _invalidate_generated_certificates
@@ -49,7 +55,10 @@ from lms.djangoapps.instructor_task.tasks_helper.grades import (
     NOT_ENROLLED_IN_COURSE,
     CourseGradeReport,
     ProblemGradeReport,
-    ProblemResponses
+    ProblemResponses,
+    _assignment_averages,
+    retry_failed_grade_report_shards,
+    run_grade_report_shard
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
@@ -58,6 +67,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -72,6 +82,7 @@ from openedx.core.djangoapps.credit.tests.factories import CreditCourseFactory
 from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase, TestConditionalContent
 from openedx.core.lib.teams_config import TeamsConfig
+from xmodule.graders import AssignmentFormatGrader
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
@@ -434,6 +445,149 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         )
 
 
+@ddt.ddt
+@override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+class TestShardedGradeReport(InstructorGradeReportTestCase):
+    """
+    Tests that grade reports can be generated in shards.
+    """
+    def setUp(self):
+        super().setUp()
+        self.course = CourseFactory.create()
+        self.students = [self.create_student(f'student{index}') for index in range(5)]
+        self.entry = InstructorTaskFactory.create(course_id=self.course.id, task_id='sharded-report-task')
+        self.failing_shard_indices = set()
+        self.lost_shard_indices = set()
+
+        patcher = patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Run the shard subtasks synchronously, failing the ones in failing_shard_indices
+        patcher = patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades._queue_grade_report_shard',
+            side_effect=self._run_shard,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run_shard(self, entry_id, report_type, shard, subtask_status, xmodule_instance_args):
+        """
+        Runs the given shard, raising an error if it is one of the failing shards.
+        Lost shards take the subtask lock, like a worker dying while running them.
+        """
+        if shard['index'] in self.lost_shard_indices:
+            _acquire_subtask_lock(subtask_status.task_id)
+        elif shard['index'] in self.failing_shard_indices:
+            with patch.object(
+                CourseGradeReport, '_generate_shard', side_effect=Exception('Worker lost'),
+            ), patch.object(ProblemGradeReport, '_generate_shard', side_effect=Exception('Worker lost')):
+                run_grade_report_shard(entry_id, report_type, shard, subtask_status.to_dict(), xmodule_instance_args)
+        else:
+            run_grade_report_shard(entry_id, report_type, shard, subtask_status.to_dict(), xmodule_instance_args)
+
+    def _generate(self, report_class):
+        with override_waffle_flag(waffle_flags()[GENERATE_GRADE_REPORTS_SHARDED], active=True):
+            return report_class.generate(None, self.entry.id, self.course.id, {}, 'graded')
+
+    @ddt.data(CourseGradeReport, ProblemGradeReport)
+    def test_sharded_report(self, report_class):
+        progress = self._generate(report_class)
+        assert progress['total'] == len(self.students)
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        subtasks = json.loads(entry.subtasks)
+        assert (subtasks['total'], subtasks['succeeded']) == (3, 3)
+        self.assertDictContainsSubset(
+            {'attempted': len(self.students), 'succeeded': len(self.students), 'failed': 0},
+            json.loads(entry.task_output),
+        )
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+
+    def test_retry_failed_shard(self):
+        self.failing_shard_indices = {1}
+        self._generate(CourseGradeReport)
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        subtasks = json.loads(entry.subtasks)
+        assert (subtasks['succeeded'], subtasks['failed']) == (2, 1)
+        assert entry.task_state == 'FAILURE'
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        assert report_store.links_for(self.course.id) == []
+
+        self.failing_shard_indices = set()
+        assert retry_failed_grade_report_shards(self.entry.id) == 1
+        assert retry_failed_grade_report_shards(self.entry.id) == 0
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        subtasks = json.loads(entry.subtasks)
+        assert (subtasks['succeeded'], subtasks['failed']) == (3, 0)
+        assert entry.task_state == 'SUCCESS'
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+
+    def test_retry_lost_shard(self):
+        self.lost_shard_indices = {1}
+        self._generate(CourseGradeReport)
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        lost_subtask_ids = set(json.loads(entry.subtasks)['shards'])
+        assert entry.task_state == 'PROGRESS'
+
+        self.lost_shard_indices = set()
+        assert retry_failed_grade_report_shards(self.entry.id) == 0
+        assert retry_failed_grade_report_shards(self.entry.id, include_unfinished=True) == 1
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        subtasks = json.loads(entry.subtasks)
+        assert len(set(subtasks['shards']) - lost_subtask_ids) == 1
+        assert (subtasks['succeeded'], subtasks['failed']) == (3, 0)
+        assert entry.task_state == 'SUCCESS'
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in self.students],
+            ignore_other_columns=True,
+        )
+
+    def test_in_progress_until_merged(self):
+        merge_task_states = []
+
+        def merge_shards(*args):  # pylint: disable=unused-argument
+            merge_task_states.append(InstructorTask.objects.get(pk=self.entry.id).task_state)
+
+        with patch.object(CourseGradeReport, '_merge_shards', side_effect=merge_shards):
+            self._generate(CourseGradeReport)
+        assert merge_task_states == ['PROGRESS']
+        assert InstructorTask.objects.get(pk=self.entry.id).task_state == 'SUCCESS'
+
+
+@ddt.ddt
+class TestAssignmentAverages(TestCase):
+    """
+    Tests that the vectorized assignment averages of the course grade
+    report are identical to those of AssignmentFormatGrader.
+    """
+    PERCENTS = [
+        [0.1, 0.2, 0.3, 0.4, 0.5],
+        [1.0, 0.0, 0.33, 0.33, 0.67],
+        [0.0, 0.0, 0.0, 0.0, 0.0],
+        [0.07, 0.91, 0.07, 0.55, 0.12],
+    ]
+
+    @ddt.data(0, 1, 2, 4, 5, 6)
+    def test_matches_total_with_drops(self, drop_count):
+        grader = AssignmentFormatGrader('Homework', 5, drop_count)
+        attempted = [True, True, True, False]
+        averages = _assignment_averages(grader, numpy.array(self.PERCENTS), numpy.array(attempted))
+
+        expected_averages = [
+            grader.total_with_drops([{'percent': percent} for percent in user_percents])[0]
+            if user_attempted else 0.0
+            for user_percents, user_attempted in zip(self.PERCENTS, attempted)
+        ]
+        assert [str(average) for average in averages] == [str(average) for average in expected_averages]
+
+
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
 
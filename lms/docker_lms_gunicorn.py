@@ -46,3 +46,11 @@ def close_all_caches():
 
 def post_fork(_server, _worker):
     close_all_caches()
+
+
+def worker_exit(_server, _worker):
+    """
+    Send the events still queued by asynchronous event tracker backends.
+    """
+    from common.djangoapps.track.backends.asynchronous import close_all_backends
+    close_all_backends()
@@ -1048,6 +1048,20 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES
+# .. setting_default: 64 * 1024 * 1024
+# .. setting_description: Maximum total serialized size of the split modulestore course structures kept in
+#   memory by each process, in front of the course_structure_cache. Structures are immutable by id, so
+#   they are only evicted to stay under this size, least recently used first. 0 disables this cache.
+COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES = 64 * 1024 * 1024
+
+# .. setting_name: COURSE_STRUCTURE_CACHE_CODEC
+# .. setting_default: 'zpickle'
+# .. setting_description: Codec used to serialize split modulestore course structures in the
+#   course_structure_cache: 'zpickle', 'bson-zlib', or 'bson-lz4' if the lz4 package is installed. Each
+#   codec uses its own cache keys, so processes using different codecs can share the cache during a rollout.
+COURSE_STRUCTURE_CACHE_CODEC = 'zpickle'
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -1484,6 +1498,19 @@ CONTENTSTORE = {
     'DOC_STORE_CONFIG': DOC_STORE_CONFIG
 }
 
+# .. setting_name: COURSE_ASSETS_DISK_CACHE
+# .. setting_default: {'DIRECTORY': None, 'MAX_BYTES': 10 * 1024 * 1024 * 1024, 'MIN_SIZE': 1024 * 1024}
+# .. setting_description: Node-local disk cache for course assets served by the contentserver. Assets of at
+#   least MIN_SIZE bytes are copied from the contentstore into DIRECTORY in the background the first time
+#   they are served, and served from there afterwards; the least recently served files are removed to keep
+#   the directory under MAX_BYTES. DIRECTORY can be shared by all the processes of a node. The cache is disabled when DIRECTORY
+#   is None.
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_BYTES': 10 * 1024 * 1024 * 1024,
+    'MIN_SIZE': 1024 * 1024,
+}
+
 MODULESTORE = {
     'default': {
         'ENGINE': 'xmodule.modulestore.mixed.MixedModuleStore',
@@ -1577,6 +1604,17 @@ CODE_JAIL = {
     # on the /debug/run_python page, the key is 'debug_run_python').
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pools of warm sandbox workers, which run code that needs no files in
+    # the sandbox without starting a new sandboxed Python each time.
+    'pool': {
+        # Number of workers per limit overrides context. 0 disables pooling.
+        'size': 0,
+        # Number of workers for specific limit overrides contexts.
+        'size_overrides': {},
+        # Number of executions after which a worker is replaced.
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1589,6 +1627,19 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# .. setting_name: SAFE_EXEC_RESULT_CACHE
+# .. setting_default: {'MAX_ENTRIES': 1000, 'MAX_BYTES': 64 * 1024 * 1024, 'TTL': None}
+# .. setting_description: Bounds of the in-process tier of the cache of sandboxed problem code results,
+#   which sits in front of the default django cache. MAX_ENTRIES and MAX_BYTES bound the number and total
+#   size of results kept in each process, least recently used first; a MAX_ENTRIES of 0 disables the
+#   in-process tier. TTL is the number of seconds a result is kept in both tiers, or None to keep local
+#   results until evicted and use the django cache's default timeout.
+SAFE_EXEC_RESULT_CACHE = {
+    'MAX_ENTRIES': 1000,
+    'MAX_BYTES': 64 * 1024 * 1024,
+    'TTL': None,
+}
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -2683,6 +2734,16 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # .. toggle_target_removal_date: 2018-06-22
     # .. toggle_tickets: https://openedx.atlassian.net/browse/EDUCATOR-499
     PRUNING_ACTIVE=False,
+
+    # .. setting_name: BLOCK_STRUCTURES_SETTINGS['SERIALIZATION_FORMAT']
+    # .. setting_default: 'zpickle'
+    # .. setting_description: Format in which block structures are serialized into the cache and
+    #   storage. 'zpickle' pickles the structure's Python objects; 'columnar' interns usage keys
+    #   and stores relations and collected fields in typed arrays, which are much cheaper to load
+    #   for large courses. Data written in either format can be read regardless of this setting,
+    #   but the format is part of the stored schema version, so changing it causes block
+    #   structures to be recollected.
+    SERIALIZATION_FORMAT='zpickle',
 )
 
 ################################ Bulk Email ###################################
@@ -3409,6 +3470,26 @@ RECALCULATE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
 
 SOFTWARE_SECURE_VERIFICATION_ROUTING_KEY = 'edx.lms.core.default'
 
+# .. setting_name: GRADE_REPORT_USERS_PER_SHARD
+# .. setting_default: 5000
+# .. setting_description: Maximum number of learners whose rows are computed by each subtask of a
+#   sharded course or problem grade report. See the instructor_task.generate_grade_reports_sharded
+#   waffle flag.
+GRADE_REPORT_USERS_PER_SHARD = 5000
+
+# .. setting_name: RESCORE_STUDENT_MODULES_PER_BATCH
+# .. setting_default: 100
+# .. setting_description: Maximum number of learners' problem states rescored in each transaction of
+#   a rescoring task. See the instructor_task.rescore_in_batches waffle flag.
+RESCORE_STUDENT_MODULES_PER_BATCH = 100
+
+# .. setting_name: MODULE_STATE_UPDATE_STUDENT_MODULES_PER_CHUNK
+# .. setting_default: 1000
+# .. setting_description: Maximum number of learners' problem states updated by each subtask of a
+#   rescoring, score override or attempts reset task performed in chunks. See the
+#   instructor_task.update_module_state_in_chunks waffle flag.
+MODULE_STATE_UPDATE_STUDENT_MODULES_PER_CHUNK = 1000
+
 GRADES_DOWNLOAD = {
     'STORAGE_CLASS': 'django.core.files.storage.FileSystemStorage',
     'STORAGE_KWARGS': {
@@ -226,6 +226,9 @@ CACHES = {
     },
 }
 
+# Keep mongo query counts independent of the structures loaded by earlier tests.
+COURSE_STRUCTURE_CACHE_PROCESS_MAX_BYTES = 0
+
 ############################### BLOCKSTORE #####################################
 # Blockstore tests
 RUN_BLOCKSTORE_TESTS = os.environ.get('EDXAPP_RUN_BLOCKSTORE_TESTS', 'no').lower() in ('true', 'yes', '1')
@@ -26,6 +26,11 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# Name of the xBlock attribute identifying the version of the course
+# structure in which a block was last edited.  It is collected for every
+# block so that later collections can determine which blocks changed.
+BLOCK_VERSION_FIELD = 'update_version'
+
 
 class _BlockRelations(object):
     """
@@ -833,15 +838,96 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         self._xblock_map[usage_key] = xblock
 
-    def _collect_requested_xblock_fields(self):
+    def _collect_requested_xblock_fields(self, previous_block_structure=None, changed_block_keys=None):
         """
         Iterates through all instantiated xBlocks that were added and
         collects all xBlock fields that were requested.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - An
+                optional, previously collected version of this block
+                structure.  Field values of blocks that are not in
+                changed_block_keys are copied from it rather than
+                read from their xBlocks.
+
+            changed_block_keys (set(UsageKey)) - Keys of the blocks
+                whose fields are to be read from their xBlocks when a
+                previous_block_structure is given.
         """
         for xblock_usage_key, xblock in six.iteritems(self._xblock_map):
             block_data = self._get_or_create_block(xblock_usage_key)
-            for field_name in self._requested_xblock_fields:
-                self._set_xblock_field(block_data, xblock, field_name)
+            if previous_block_structure is not None and xblock_usage_key not in changed_block_keys:
+                previous_block_data = previous_block_structure._block_data_map.get(xblock_usage_key)
+                previous_fields = previous_block_data.fields if previous_block_data else {}
+                for field_name in self._requested_xblock_fields:
+                    if field_name in previous_fields:
+                        block_data.fields[field_name] = previous_fields[field_name]
+            else:
+                for field_name in self._requested_xblock_fields:
+                    self._set_xblock_field(block_data, xblock, field_name)
+
+    def _get_changed_block_keys(self, previous_block_structure):
+        """
+        Returns the set of keys of all blocks that were added or changed
+        since the given block structure was collected, along with all
+        of their descendants, since descendants may inherit field
+        values from a changed block.
+
+        A block is considered changed if its collected version is not
+        known, differs from its current version, or if its children
+        differ from those in the given block structure.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A
+                previously collected version of this block structure.
+        """
+        changed_block_keys = set()
+        for usage_key, xblock in six.iteritems(self._xblock_map):
+            if usage_key in changed_block_keys:
+                continue
+            current_version = getattr(xblock, BLOCK_VERSION_FIELD, None)
+            is_changed = (
+                current_version is None or
+                usage_key not in previous_block_structure or
+                previous_block_structure.get_xblock_field(usage_key, BLOCK_VERSION_FIELD) != current_version or
+                previous_block_structure.get_children(usage_key) != self.get_children(usage_key)
+            )
+            if is_changed:
+                stack = [usage_key]
+                while stack:
+                    block_key = stack.pop()
+                    if block_key not in changed_block_keys:
+                        changed_block_keys.add(block_key)
+                        stack.extend(self.get_children(block_key))
+        return changed_block_keys
+
+    def _create_substructure(self, block_keys):
+        """
+        Returns a new BlockStructureModulestoreData, with the same root,
+        containing the given blocks along with all of their ancestors,
+        so that data percolated down from ancestors can be collected
+        for the given blocks.
+
+        Arguments:
+            block_keys (set(UsageKey)) - Keys of the blocks to include.
+        """
+        included_keys = set()
+        stack = list(block_keys)
+        while stack:
+            block_key = stack.pop()
+            if block_key not in included_keys:
+                included_keys.add(block_key)
+                stack.extend(self.get_parents(block_key))
+
+        substructure = BlockStructureModulestoreData(self.root_block_usage_key)
+        for block_key in self.get_block_keys():
+            if block_key not in included_keys:
+                continue
+            substructure._add_xblock(block_key, self._xblock_map[block_key])
+            for child_key in self.get_children(block_key):
+                if child_key in included_keys:
+                    substructure._add_relation(block_key, child_key)
+        return substructure
 
     def _set_xblock_field(self, block_data, xblock, field_name):
         """
@@ -0,0 +1,416 @@
+"""
+Compact, array-backed serialization format for BlockStructureBlockData.
+
+The default storage format zpickles the structure's maps of
+_BlockRelations and BlockData objects, so loading a large course
+means unpickling tens of thousands of small Python objects.  This
+format instead:
+
+    * interns every usage key into an integer block id, storing only
+      the (block_type, block_id) pair for blocks within the course;
+    * stores parent/child relations as CSR-style adjacency arrays
+      (an offsets array plus a flat array of block ids);
+    * stores each collected xBlock field and transformer block field
+      as a column: an array of the block ids that have a value, plus
+      the values themselves in a typed array (bool, int, float, str).
+
+Only values that cannot be represented by a typed column (dicts,
+datetimes, etc.) and the structure-wide transformer data fall back to
+a pickled list of plain values.
+
+The serialized form starts with MAGIC so that it can be distinguished
+from zpickled data, and carries FORMAT_VERSION so that readers can
+reject data written by an incompatible version of this module.
+"""
+
+
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+from opaque_keys.edx.keys import UsageKey
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+# Prefix of all data serialized in this format.  A zlib stream (as
+# written by zpickle) never starts with these bytes.
+MAGIC = b'BSC'
+
+# Version of this serialization format.  Increment whenever the layout
+# written by serialize changes.
+FORMAT_VERSION = 1
+
+# Marker in the block type column for usage keys that are not within
+# the root block's course and are therefore stored as full strings.
+_FOREIGN_KEY = 0xFFFFFFFF
+
+# Name of the pseudo-transformer under which xBlock fields are stored.
+_XBLOCK_FIELDS = ''
+
+# Column type tags.
+_BOOL = b'b'
+_INT = b'q'
+_FLOAT = b'd'
+_STR = b's'
+_OBJECT = b'o'
+
+_INT_MIN = -(2 ** 63)
+_INT_MAX = 2 ** 63 - 1
+
+_HEADER = struct.Struct('<3sB')
+_UINT = struct.Struct('<I')
+
+
+class ColumnarFormatError(Exception):
+    """
+    Raised when data cannot be decoded as a columnar block structure.
+    """
+    pass  # lint-amnesty, pylint: disable=unnecessary-pass
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data was written in this format.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Returns the columnar serialization of the given
+    BlockStructureBlockData as bytes.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    keys = list(block_relations)
+    num_related = len(keys)
+    keys.extend(key for key in block_data_map if key not in block_relations)
+    index = {key: block_id for block_id, key in enumerate(keys)}
+
+    writer = _Writer()
+    _write_keys(writer, keys, block_structure.root_block_usage_key)
+
+    writer.write_uint(num_related)
+    for attr_name in ('children', 'parents'):
+        offsets = array('I', [0])
+        targets = array('I')
+        for key in keys[:num_related]:
+            targets.extend(index[target] for target in getattr(block_relations[key], attr_name))
+            offsets.append(len(targets))
+        writer.write_array(offsets)
+        writer.write_array(targets)
+
+    writer.write_array(array('I', (index[key] for key in block_data_map)))
+
+    # Group the per-block field values into columns keyed by
+    # (transformer name, field name).
+    present_transformers = {}
+    columns = {}
+    for usage_key, block_data in block_data_map.items():
+        block_id = index[usage_key]
+        for field_name, value in block_data.fields.items():
+            _add_to_column(columns, (_XBLOCK_FIELDS, field_name), block_id, value)
+        for transformer_name, transformer_data in block_data.transformer_data.items():
+            present_transformers.setdefault(transformer_name, array('I')).append(block_id)
+            for field_name, value in transformer_data.fields.items():
+                _add_to_column(columns, (transformer_name, field_name), block_id, value)
+
+    writer.write_uint(len(present_transformers))
+    for transformer_name, block_ids in present_transformers.items():
+        writer.write_str(transformer_name)
+        writer.write_array(block_ids)
+
+    writer.write_uint(len(columns))
+    for (transformer_name, field_name), (block_ids, values) in columns.items():
+        writer.write_str(transformer_name)
+        writer.write_str(field_name)
+        writer.write_array(block_ids)
+        _write_values(writer, values)
+
+    writer.write_bytes(pickle.dumps(
+        {name: data.fields for name, data in block_structure.transformer_data.items()},
+        4,
+    ))
+
+    return _HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(writer.getvalue())
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Decodes the given columnar serialization and returns a tuple of
+    (block_relations, transformer_data, block_data_map), as expected by
+    BlockStructureFactory.create_new.
+
+    Raises:
+        ColumnarFormatError if the data was not written in this format
+        or was written by an incompatible version of it.
+    """
+    if not is_columnar(serialized_data):
+        raise ColumnarFormatError('Data is not in the columnar block structure format.')
+    _, version = _HEADER.unpack_from(serialized_data)
+    if version != FORMAT_VERSION:
+        raise ColumnarFormatError(
+            'Unsupported columnar block structure format version {}.'.format(version)
+        )
+
+    reader = _Reader(zlib.decompress(serialized_data[_HEADER.size:]))
+    keys = _read_keys(reader, root_block_usage_key)
+
+    # Objects are built in lists indexed by block id, so that each
+    # usage key is hashed only when the final maps are assembled.
+    num_related = reader.read_uint()
+    relations = [_BlockRelations() for _ in range(num_related)]
+    for attr_name in ('children', 'parents'):
+        offsets = reader.read_array('I')
+        targets = [keys[target] for target in reader.read_array('I')]
+        for block_id, block_relations in enumerate(relations):
+            setattr(block_relations, attr_name, targets[offsets[block_id]:offsets[block_id + 1]])
+
+    block_ids_with_data = reader.read_array('I')
+    block_data_by_id = [None] * len(keys)
+    for block_id in block_ids_with_data:
+        block_data_by_id[block_id] = BlockData(keys[block_id])
+
+    for _ in range(reader.read_uint()):
+        transformer_name = reader.read_str()
+        for block_id in reader.read_array('I'):
+            block_data_by_id[block_id].transformer_data[transformer_name] = TransformerData()
+
+    for _ in range(reader.read_uint()):
+        transformer_name = reader.read_str()
+        field_name = reader.read_str()
+        block_ids = reader.read_array('I')
+        values = _read_values(reader)
+        if transformer_name == _XBLOCK_FIELDS:
+            for block_id, value in zip(block_ids, values):
+                block_data_by_id[block_id].fields[field_name] = value
+        else:
+            for block_id, value in zip(block_ids, values):
+                block_data_by_id[block_id].transformer_data[transformer_name].fields[field_name] = value
+
+    transformer_data = TransformerDataMap()
+    for transformer_name, fields in pickle.loads(reader.read_bytes()).items():
+        transformer_data[transformer_name] = TransformerData()
+        transformer_data[transformer_name].fields = fields
+
+    block_relations = dict(zip(keys, relations))
+    block_data_map = {keys[block_id]: block_data_by_id[block_id] for block_id in block_ids_with_data}
+    return block_relations, transformer_data, block_data_map
+
+
+def _write_keys(writer, keys, root_block_usage_key):
+    """
+    Writes the given usage keys, interning their block types.  Keys
+    that can be rebuilt from the root's course key are stored as a
+    (block_type, block_id) pair; any others are stored in full.
+    """
+    course_key = root_block_usage_key.course_key
+    block_types = {}
+    type_column = array('I')
+    id_column = []
+    for key in keys:
+        if course_key.make_usage_key(key.block_type, key.block_id) == key:
+            type_column.append(block_types.setdefault(key.block_type, len(block_types)))
+            id_column.append(key.block_id)
+        else:
+            type_column.append(_FOREIGN_KEY)
+            id_column.append(str(key))
+    writer.write_str_list(list(block_types))
+    writer.write_array(type_column)
+    writer.write_str_list(id_column)
+
+
+def _read_keys(reader, root_block_usage_key):
+    """
+    Reads and returns the list of usage keys written by _write_keys.
+    """
+    make_usage_key = root_block_usage_key.course_key.make_usage_key
+    block_types = reader.read_str_list()
+    type_column = reader.read_array('I')
+    id_column = reader.read_str_list()
+    return [
+        UsageKey.from_string(block_id) if type_id == _FOREIGN_KEY else make_usage_key(block_types[type_id], block_id)
+        for type_id, block_id in zip(type_column, id_column)
+    ]
+
+
+def _add_to_column(columns, column_key, block_id, value):
+    """
+    Appends the given block's value to the given column.
+    """
+    try:
+        block_ids, values = columns[column_key]
+    except KeyError:
+        block_ids, values = columns[column_key] = (array('I'), [])
+    block_ids.append(block_id)
+    values.append(value)
+
+
+def _write_values(writer, values):
+    """
+    Writes the given column values in the most compact typed
+    representation that holds all of them.
+    """
+    value_types = {type(value) for value in values}
+    if value_types == {bool}:
+        writer.write_tag(_BOOL)
+        writer.write_array(array('b', values))
+    elif value_types == {int} and _INT_MIN <= min(values) and max(values) <= _INT_MAX:
+        writer.write_tag(_INT)
+        writer.write_array(array('q', values))
+    elif value_types == {float}:
+        writer.write_tag(_FLOAT)
+        writer.write_array(array('d', values))
+    elif value_types == {str}:
+        writer.write_tag(_STR)
+        writer.write_str_list(values)
+    else:
+        writer.write_tag(_OBJECT)
+        writer.write_bytes(pickle.dumps(values, 4))
+
+
+def _read_values(reader):
+    """
+    Reads and returns the list of column values written by _write_values.
+    """
+    tag = reader.read_tag()
+    if tag == _BOOL:
+        return [bool(value) for value in reader.read_array('b')]
+    elif tag in (_INT, _FLOAT):
+        return reader.read_array(tag.decode('ascii')).tolist()
+    elif tag == _STR:
+        return reader.read_str_list()
+    elif tag == _OBJECT:
+        return pickle.loads(reader.read_bytes())
+    raise ColumnarFormatError('Unknown column type {!r}.'.format(tag))
+
+
+class _Writer(object):
+    """
+    Accumulates length-prefixed sections of the serialized data.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def getvalue(self):
+        """
+        Returns all bytes written so far.
+        """
+        return b''.join(self._chunks)
+
+    def write_uint(self, value):
+        """
+        Writes an unsigned 32-bit integer.
+        """
+        self._chunks.append(_UINT.pack(value))
+
+    def write_tag(self, tag):
+        """
+        Writes a single-byte tag.
+        """
+        self._chunks.append(tag)
+
+    def write_bytes(self, value):
+        """
+        Writes a length-prefixed byte string.
+        """
+        self.write_uint(len(value))
+        self._chunks.append(value)
+
+    def write_str(self, value):
+        """
+        Writes a length-prefixed utf-8 string.
+        """
+        self.write_bytes(value.encode('utf-8'))
+
+    def write_array(self, values):
+        """
+        Writes a typed array in little-endian byte order.
+        """
+        if sys.byteorder != 'little':
+            values = array(values.typecode, values)
+            values.byteswap()
+        self.write_uint(len(values))
+        self._chunks.append(values.tobytes())
+
+    def write_str_list(self, values):
+        """
+        Writes a list of strings as an offsets array followed by the
+        concatenation of their utf-8 encodings.
+        """
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = array('I', [0])
+        total = 0
+        for value in encoded:
+            total += len(value)
+            offsets.append(total)
+        self.write_array(offsets)
+        self.write_bytes(b''.join(encoded))
+
+
+class _Reader(object):
+    """
+    Reads the sections written by _Writer, in the same order.
+    """
+    def __init__(self, data):
+        self._data = memoryview(data)
+        self._position = 0
+
+    def _take(self, length):
+        """
+        Returns the next length bytes of the data as a memoryview.
+        """
+        start = self._position
+        self._position += length
+        if self._position > len(self._data):
+            raise ColumnarFormatError('Columnar block structure data is truncated.')
+        return self._data[start:self._position]
+
+    def read_uint(self):
+        """
+        Reads an unsigned 32-bit integer.
+        """
+        return _UINT.unpack(self._take(_UINT.size))[0]
+
+    def read_tag(self):
+        """
+        Reads a single-byte tag.
+        """
+        return bytes(self._take(1))
+
+    def read_bytes(self):
+        """
+        Reads a length-prefixed byte string.
+        """
+        return self._take(self.read_uint()).tobytes()
+
+    def read_str(self):
+        """
+        Reads a length-prefixed utf-8 string.
+        """
+        return str(self._take(self.read_uint()), 'utf-8')
+
+    def read_array(self, typecode):
+        """
+        Reads a typed array written in little-endian byte order.
+        """
+        values = array(typecode)
+        values.frombytes(self._take(self.read_uint() * values.itemsize))
+        if sys.byteorder != 'little':
+            values.byteswap()
+        return values
+
+    def read_str_list(self):
+        """
+        Reads a list of strings written by _Writer.write_str_list.
+        """
+        offsets = self.read_array('I')
+        blob = self.read_bytes()
+        return [
+            blob[offsets[i]:offsets[i + 1]].decode('utf-8')
+            for i in range(len(offsets) - 1)
+        ]
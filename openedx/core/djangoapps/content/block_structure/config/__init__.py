@@ -2,6 +2,7 @@
 This module contains various configuration settings via
 waffle switches for the Block Structure framework.
 """
+from django.conf import settings
 from edx_django_utils.cache import RequestCache
 from edx_toggles.toggles import WaffleSwitch
 
@@ -9,6 +10,10 @@ from openedx.core.lib.cache_utils import request_cached
 
 from .models import BlockStructureConfiguration
 
+# Serialization formats for block structures.
+ZPICKLE_FORMAT = 'zpickle'
+COLUMNAR_FORMAT = 'columnar'
+
 # Switches
 # .. toggle_name: block_structure.invalidate_cache_on_publish
 # .. toggle_implementation: WaffleSwitch
@@ -61,6 +66,20 @@ RAISE_ERROR_WHEN_NOT_FOUND = WaffleSwitch(
     "block_structure.raise_error_when_not_found", __name__
 )
 
+# .. toggle_name: block_structure.incremental_collect
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, a block structure that is updated after a course is published
+#   is recollected incrementally: the previously stored block structure is compared with the
+#   modulestore, and transformers whose collected data is subtree-local only recollect data for the
+#   changed blocks and their descendants. Requires the modulestore to track the version in which each
+#   block was last edited, as the split modulestore does.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+INCREMENTAL_COLLECT = WaffleSwitch(
+    "block_structure.incremental_collect", __name__
+)
+
 
 def enable_storage_backing_for_cache_in_request():
     """
@@ -85,3 +104,10 @@ def cache_timeout_in_seconds():
     Returns and caches the current setting for cache_timeout_in_seconds.
     """
     return BlockStructureConfiguration.current().cache_timeout_in_seconds
+
+
+def serialization_format():
+    """
+    Returns the configured format in which block structures are serialized.
+    """
+    return settings.BLOCK_STRUCTURES_SETTINGS.get('SERIALIZATION_FORMAT', ZPICKLE_FORMAT)
@@ -0,0 +1,105 @@
+"""
+Command to compare the load time and memory use of the block structure
+serialization formats.
+"""
+
+
+import gc
+import logging
+import timeit
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure import columnar
+from openedx.core.djangoapps.content.block_structure.config import COLUMNAR_FORMAT, ZPICKLE_FORMAT
+from openedx.core.djangoapps.content.block_structure.store import BlockStructureStore
+from openedx.core.lib.cache_utils import zpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+log = logging.getLogger(__name__)
+
+SERIALIZERS = {
+    ZPICKLE_FORMAT: lambda block_structure: zpickle((
+        block_structure._block_relations,  # pylint: disable=protected-access
+        block_structure.transformer_data,
+        block_structure._block_data_map,  # pylint: disable=protected-access
+    )),
+    COLUMNAR_FORMAT: columnar.serialize,
+}
+
+
+def _current_rss_in_kb():
+    """
+    Returns the current resident set size of this process in KB, or
+    None if it cannot be determined on this platform.
+    """
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    return None
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization 'course-v1:edX+DemoX+Demo_Course' --settings=devstack
+    """
+    args = u'<course_id course_id ...>'
+    help = u'Compares load time, size and memory use of the block structure serialization formats.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'courses',
+            nargs='+',
+            help=u'Courses whose collected block structures are to be benchmarked.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each serialized block structure is loaded.',
+            default=20,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        store = BlockStructureStore(cache=None)
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            root_block_usage_key = block_structure.root_block_usage_key
+            self.stdout.write(u'{}: {} blocks'.format(course_key, len(block_structure)))
+
+            for format_name, serialize in SERIALIZERS.items():
+                serialized_data = serialize(block_structure)
+                load = lambda: store._deserialize(serialized_data, root_block_usage_key)  # pylint: disable=cell-var-from-loop, protected-access
+
+                seconds = min(timeit.repeat(load, number=1, repeat=options['iterations']))
+
+                gc.collect()
+                rss_before = _current_rss_in_kb()
+                loaded = load()
+                rss_after = _current_rss_in_kb()
+                del loaded
+
+                gc.collect()
+                tracemalloc.start()
+                loaded = load()
+                retained_bytes, peak_bytes = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del loaded
+
+                self.stdout.write(
+                    u'  {:<10} size: {:>10,d} B  load: {:>8.2f} ms  '
+                    u'retained: {:>10,d} B  peak: {:>10,d} B  rss delta: {} KB'.format(
+                        format_name,
+                        len(serialized_data),
+                        seconds * 1000,
+                        retained_bytes,
+                        peak_bytes,
+                        rss_after - rss_before if rss_before is not None else u'n/a',
+                    )
+                )
@@ -115,22 +115,38 @@ class BlockStructureManager(object):
         """
         with self._bulk_operations():
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+                self._update_collected(incremental=config.INCREMENTAL_COLLECT.is_enabled())
 
-    def _update_collected(self):
+    def _update_collected(self, incremental=False):
         """
         The store is updated with newly collected transformers data from
         the modulestore.
+
+        Arguments:
+            incremental (bool) - Whether to reuse the data collected in
+                the block structure currently in the store, if any, for
+                blocks that have not changed since.
         """
         with self._bulk_operations():
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
             )
-            BlockStructureTransformers.collect(block_structure)
+            previous_block_structure = self._get_previous_collected() if incremental else None
+            BlockStructureTransformers.collect(block_structure, previous_block_structure)
             self.store.add(block_structure)
             return block_structure
 
+    def _get_previous_collected(self):
+        """
+        Returns the block structure currently in the store, regardless of
+        whether it is up-to-date, or None if there is none.
+        """
+        try:
+            return BlockStructureFactory.create_from_store(self.root_block_usage_key, self.store)
+        except BlockStructureNotFound:
+            return None
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
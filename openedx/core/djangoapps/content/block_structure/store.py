@@ -11,7 +11,7 @@ from django.utils.encoding import python_2_unicode_compatible
 
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import columnar, config
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -196,8 +196,12 @@ class BlockStructureStore(object):
 
     def _serialize(self, block_structure):
         """
-        Serializes the data for the given block_structure.
+        Serializes the data for the given block_structure, in the
+        configured serialization format.
         """
+        if config.serialization_format() == config.COLUMNAR_FORMAT:
+            return columnar.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -208,10 +212,17 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+        Data written in any supported serialization format is accepted,
+        regardless of the currently configured format.
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            if columnar.is_columnar(serialized_data):
+                block_relations, transformer_data, block_data_map = columnar.deserialize(
+                    serialized_data, root_block_usage_key,
+                )
+            else:
+                block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
@@ -234,7 +245,7 @@ class BlockStructureStore(object):
         if config.STORAGE_BACKING_FOR_CACHE.is_enabled():
             return six.text_type(bs_model)
         return "v{version}.root.key.{root_usage_key}".format(
-            version=six.text_type(BlockStructureBlockData.VERSION),
+            version=BlockStructureStore._schema_version(),
             root_usage_key=six.text_type(bs_model.data_usage_key),
         )
 
@@ -248,9 +259,22 @@ class BlockStructureStore(object):
             data_version=getattr(root_block, 'course_version', None),
             data_edit_timestamp=getattr(root_block, 'subtree_edited_on', None),
             transformers_schema_version=TransformerRegistry.get_write_version_hash(),
-            block_structure_schema_version=six.text_type(BlockStructureBlockData.VERSION),
+            block_structure_schema_version=BlockStructureStore._schema_version(),
         )
 
+    @staticmethod
+    def _schema_version():
+        """
+        Returns the version of the block structure schema, including the
+        serialization format when it differs from the default zpickle
+        format, so that data written in different formats is versioned
+        independently.
+        """
+        version = six.text_type(BlockStructureBlockData.VERSION)
+        if config.serialization_format() == config.COLUMNAR_FORMAT:
+            version = u'{}.{}{}'.format(version, config.COLUMNAR_FORMAT, columnar.FORMAT_VERSION)
+        return version
+
     @staticmethod
     def _version_data_of_model(bs_model):
         """
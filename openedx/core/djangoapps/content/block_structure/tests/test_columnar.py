@@ -0,0 +1,122 @@
+"""
+Tests for columnar.py
+"""
+
+# pylint: disable=protected-access
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+import pytest
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from .. import columnar
+from ..factory import BlockStructureFactory
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar block structure serialization format.
+    """
+
+    def round_trip(self, block_structure):
+        """
+        Serializes and deserializes the given block structure, returning
+        the resulting block structure.
+        """
+        serialized_data = columnar.serialize(block_structure)
+        assert columnar.is_columnar(serialized_data)
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *columnar.deserialize(serialized_data, block_structure.root_block_usage_key)
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        deserialized = self.round_trip(block_structure)
+        self.assert_block_structure(deserialized, children_map)
+        for block_key in block_structure:
+            assert deserialized.get_children(block_key) == block_structure.get_children(block_key)
+            assert deserialized.get_parents(block_key) == block_structure.get_parents(block_key)
+
+    @ddt.data(
+        True,
+        12,
+        -2 ** 70,
+        1.5,
+        u'unicode ☃',
+        None,
+        datetime(2020, 1, 1),
+        {'nested': [1, 2]},
+    )
+    def test_field_values(self, value):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        for block_id in range(len(self.SIMPLE_CHILDREN_MAP)):
+            block_key = self.block_key_factory(block_id)
+            block_structure.override_xblock_field(block_key, 'field', value)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'key', value)
+
+        deserialized = self.round_trip(block_structure)
+        for block_id in range(len(self.SIMPLE_CHILDREN_MAP)):
+            block_key = self.block_key_factory(block_id)
+            assert deserialized.get_xblock_field(block_key, 'field') == value
+            assert deserialized.get_transformer_block_field(block_key, MockTransformer, 'key') == value
+
+    def test_mixed_column_types(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        values = [True, 1, 1.0, u'1', None]
+        for block_id, value in enumerate(values):
+            block_structure.override_xblock_field(self.block_key_factory(block_id), 'field', value)
+
+        deserialized = self.round_trip(block_structure)
+        for block_id, value in enumerate(values):
+            deserialized_value = deserialized.get_xblock_field(self.block_key_factory(block_id), 'field')
+            assert deserialized_value == value
+            assert type(deserialized_value) == type(value)  # pylint: disable=unidiomatic-typecheck
+
+    def test_sparse_block_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_key = self.block_key_factory(1)
+        block_structure.override_xblock_field(block_key, 'field', 'value')
+        block_structure.transformer_data.get_or_create(MockTransformer)
+        block_structure._get_or_create_block(block_key).transformer_data.get_or_create(MockTransformer)
+
+        deserialized = self.round_trip(block_structure)
+        assert list(deserialized._block_data_map) == [block_key]
+        assert deserialized.get_xblock_field(self.block_key_factory(2), 'field') is None
+        assert deserialized.get_transformer_block_data(block_key, MockTransformer).fields == {}
+
+    def test_transformer_data(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure._add_transformer(MockTransformer)
+        block_structure.set_transformer_data(MockTransformer, 'key', {'some': 'data'})
+
+        deserialized = self.round_trip(block_structure)
+        assert deserialized._get_transformer_data_version(MockTransformer) == MockTransformer.WRITE_VERSION
+        assert deserialized.get_transformer_data(MockTransformer, 'key') == {'some': 'data'}
+
+    def test_keys_outside_course(self):
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        other_key = BlockUsageLocator(CourseLocator('other', 'course', 'run'), 'html', 'other')
+        block_structure._add_relation(self.block_key_factory(2), other_key)
+
+        deserialized = self.round_trip(block_structure)
+        assert deserialized.get_children(self.block_key_factory(2)) == [other_key]
+        assert deserialized.get_parents(other_key) == [self.block_key_factory(2)]
+
+    def test_not_columnar(self):
+        with pytest.raises(columnar.ColumnarFormatError):
+            columnar.deserialize(b'x\x9c', self.block_key_factory(0))
+
+    def test_unsupported_version(self):
+        serialized_data = bytearray(columnar.serialize(self.create_block_structure(self.SIMPLE_CHILDREN_MAP)))
+        serialized_data[len(columnar.MAGIC)] = columnar.FORMAT_VERSION + 1
+        with pytest.raises(columnar.ColumnarFormatError):
+            columnar.deserialize(bytes(serialized_data), self.block_key_factory(0))
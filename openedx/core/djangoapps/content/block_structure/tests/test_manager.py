@@ -7,9 +7,10 @@ import ddt
 import six
 from django.test import TestCase
 from edx_toggles.toggles.testutils import override_waffle_switch
+from mock import patch
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
+from ..config import INCREMENTAL_COLLECT, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -199,6 +200,23 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
 
                 self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
 
+    @ddt.data(True, False)
+    def test_update_collected_incrementally(self, incremental):
+        with override_waffle_switch(INCREMENTAL_COLLECT, active=incremental):
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected_if_needed()
+                with patch.object(
+                    BlockStructureTransformers, 'collect', wraps=BlockStructureTransformers.collect,
+                ) as mock_collect:
+                    self.bs_manager.update_collected_if_needed()
+
+        _, previous_block_structure = mock_collect.call_args[0]
+        if incremental:
+            self.assert_block_structure(previous_block_structure, self.children_map)
+            TestTransformer1.assert_collected(previous_block_structure)
+        else:
+            assert previous_block_structure is None
+
     def test_get_collected_transformer_version(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
 
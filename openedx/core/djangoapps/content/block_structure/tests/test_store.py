@@ -4,11 +4,13 @@ Tests for block_structure/cache.py
 
 import pytest
 import ddt
+from django.conf import settings
 from edx_toggles.toggles.testutils import override_waffle_switch
+from mock import patch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE
+from ..config import COLUMNAR_FORMAT, STORAGE_BACKING_FOR_CACHE, ZPICKLE_FORMAT
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
 from ..store import BlockStructureStore
@@ -60,6 +62,35 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             assert stored_value is not None
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(True, False)
+    def test_add_and_get_columnar(self, with_storage_backing):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'SERIALIZATION_FORMAT': COLUMNAR_FORMAT}):
+                self.store.add(self.block_structure)
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            assert stored_value.get_transformer_block_field(
+                self.block_key_factory(0), MockTransformer, 'test',
+            ) == u'{} val'.format(MockTransformer.name())
+
+    @ddt.data(
+        (ZPICKLE_FORMAT, COLUMNAR_FORMAT),
+        (COLUMNAR_FORMAT, ZPICKLE_FORMAT),
+    )
+    @ddt.unpack
+    def test_format_change(self, write_format, read_format):
+        with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=True):
+            with patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'SERIALIZATION_FORMAT': write_format}):
+                self.store.add(self.block_structure)
+                schema_version = self.store._schema_version()  # pylint: disable=protected-access
+            with patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'SERIALIZATION_FORMAT': read_format}):
+                # Data already written in the old format is still readable ...
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                self.assert_block_structure(stored_value, self.children_map)
+
+                # ... but is versioned separately, so it will be recollected.
+                assert self.store._schema_version() != schema_version  # pylint: disable=protected-access
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with override_waffle_switch(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
@@ -10,7 +10,31 @@ from mock import MagicMock, patch
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerDataIncompatible, TransformerException
 from ..transformers import BlockStructureTransformers
-from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
+from .helpers import (
+    ChildrenMapTestMixin,
+    MockFilteringTransformer,
+    MockTransformer,
+    MockXBlock,
+    mock_registered_transformers
+)
+
+
+class MockSubtreeLocalTransformer(MockTransformer):
+    """
+    Mock transformer with subtree-local collected data, which records
+    the blocks for which it collected data.
+    """
+    COLLECTS_SUBTREE_LOCAL_DATA = True
+    collected_block_keys = []
+
+    @classmethod
+    def collect(cls, block_structure):
+        block_structure.request_xblock_fields('field')
+        for block_key in block_structure.topological_traversal():
+            cls.collected_block_keys.append(block_key)
+            block_structure.set_transformer_block_field(
+                block_key, cls, 'field', block_structure.get_xblock(block_key).field,
+            )
 
 
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
@@ -76,3 +100,90 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             assert self.transformers.verify_versions(block_structure)
+
+
+class TestIncrementalCollect(ChildrenMapTestMixin, TestCase):
+    """
+    Test class for incrementally collecting data with BlockStructureTransformers
+    """
+    #     0
+    #    / \
+    #   1  2
+    #  / \
+    # 3   4
+    CHILDREN_MAP = ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP
+
+    def setUp(self):
+        super(TestIncrementalCollect, self).setUp()  # lint-amnesty, pylint: disable=super-with-arguments
+        MockSubtreeLocalTransformer.collected_block_keys = []
+        self.registered_transformers = [MockTransformer(), MockSubtreeLocalTransformer()]
+
+    def create_block_structure_with_xblocks(self, version_of_block, field_value):
+        """
+        Returns a block structure for CHILDREN_MAP with mock xBlocks,
+        whose update_version and field values are given by
+        version_of_block(block_key) and field_value.
+        """
+        block_structure = self.create_block_structure(self.CHILDREN_MAP, BlockStructureModulestoreData)
+        for block_key in range(len(self.CHILDREN_MAP)):
+            block_structure._add_xblock(  # pylint: disable=protected-access
+                block_key,
+                MockXBlock(block_key, {'update_version': version_of_block(block_key), 'field': field_value}),
+            )
+        return block_structure
+
+    def collect(self, block_structure, previous_block_structure=None):
+        """
+        Collects the given block structure with the registered transformers.
+        """
+        MockSubtreeLocalTransformer.collected_block_keys = []
+        with mock_registered_transformers(self.registered_transformers):
+            BlockStructureTransformers.collect(block_structure, previous_block_structure)
+
+    def test_changed_subtree(self):
+        previous = self.create_block_structure_with_xblocks(lambda block_key: 'v1', 'old')
+        self.collect(previous)
+
+        current = self.create_block_structure_with_xblocks(lambda block_key: 'v2' if block_key == 1 else 'v1', 'new')
+        self.collect(current, previous)
+
+        # Only the changed block, its descendants and its ancestors are collected.
+        assert sorted(MockSubtreeLocalTransformer.collected_block_keys) == [0, 1, 3, 4]
+        for block_key, expected_value in [(0, 'old'), (1, 'new'), (2, 'old'), (3, 'new'), (4, 'new')]:
+            assert current.get_transformer_block_field(block_key, MockSubtreeLocalTransformer, 'field') == \
+                expected_value
+            assert current.get_xblock_field(block_key, 'field') == expected_value
+        assert current.get_xblock_field(1, 'update_version') == 'v2'
+
+    def test_changed_children(self):
+        previous = self.create_block_structure_with_xblocks(lambda block_key: 'v1', 'old')
+        self.collect(previous)
+
+        current = self.create_block_structure_with_xblocks(lambda block_key: 'v1', 'new')
+        current._block_relations[2].children.append(4)  # pylint: disable=protected-access
+        current._block_relations[4].parents.append(2)  # pylint: disable=protected-access
+        self.collect(current, previous)
+
+        assert sorted(MockSubtreeLocalTransformer.collected_block_keys) == [0, 1, 2, 4]
+        assert current.get_xblock_field(1, 'field') == 'old'
+        assert current.get_xblock_field(4, 'field') == 'new'
+
+    def test_unknown_versions(self):
+        previous = self.create_block_structure_with_xblocks(lambda block_key: None, 'old')
+        self.collect(previous)
+
+        current = self.create_block_structure_with_xblocks(lambda block_key: None, 'new')
+        self.collect(current, previous)
+
+        assert sorted(MockSubtreeLocalTransformer.collected_block_keys) == list(range(len(self.CHILDREN_MAP)))
+
+    def test_outdated_previous_collection(self):
+        previous = self.create_block_structure_with_xblocks(lambda block_key: 'v1', 'old')
+        self.collect(previous)
+        previous.set_transformer_data(MockTransformer, '_version', 0)
+
+        current = self.create_block_structure_with_xblocks(lambda block_key: 'v1', 'new')
+        self.collect(current, previous)
+
+        assert sorted(MockSubtreeLocalTransformer.collected_block_keys) == list(range(len(self.CHILDREN_MAP)))
+        assert current.get_xblock_field(2, 'field') == 'new'
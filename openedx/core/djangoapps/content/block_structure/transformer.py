@@ -58,6 +58,22 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the data collected by this transformer is subtree-local,
+    # that is, whether a change to a block can only affect the data
+    # collected for that block and its descendants.  This holds for
+    # transformers whose collected data for a block depends only on the
+    # block itself and its ancestors, such as data percolated down from
+    # ancestors, and that collect no structure-wide data with
+    # set_transformer_data.
+    #
+    # When a block structure is incrementally recollected, the collect
+    # method of a subtree-local transformer is called with a block
+    # structure containing only the changed blocks, their descendants
+    # and their ancestors.  The data previously collected for all other
+    # blocks is kept as is.  All other transformers always collect over
+    # the entire block structure.
+    COLLECTS_SUBTREE_LOCAL_DATA = False
+
     @classmethod
     def name(cls):
         """
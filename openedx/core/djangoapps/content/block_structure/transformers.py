@@ -6,6 +6,7 @@ Module for a collection of BlockStructureTransformers.
 import functools  # lint-amnesty, pylint: disable=unused-import
 from logging import getLogger
 
+from .block_structure import BLOCK_VERSION_FIELD
 from .exceptions import TransformerDataIncompatible, TransformerException
 from .transformer import FilteringTransformerMixin, combine_filters
 from .transformer_registry import TransformerRegistry
@@ -72,16 +73,90 @@ class BlockStructureTransformers(object):
         return self
 
     @classmethod
-    def collect(cls, block_structure):
+    def collect(cls, block_structure, previous_block_structure=None):
         """
         Collects data for each registered transformer.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - The block
+                structure for which data is to be collected.
+
+            previous_block_structure (BlockStructureBlockData) - An
+                optional, previously collected version of the block
+                structure.  If given and collected by the current
+                versions of all registered transformers, data is only
+                recollected for the blocks that changed since, wherever
+                the transformers allow it.  See
+                BlockStructureTransformer.COLLECTS_SUBTREE_LOCAL_DATA.
         """
-        for transformer in TransformerRegistry.get_registered_transformers():
-            block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+        # pylint: disable=protected-access
+        block_structure.request_xblock_fields(BLOCK_VERSION_FIELD)
+        registered_transformers = TransformerRegistry.get_registered_transformers()
+
+        if not cls._is_compatible(previous_block_structure, registered_transformers):
+            for transformer in registered_transformers:
+                block_structure._add_transformer(transformer)
+                transformer.collect(block_structure)
+
+            # Collect all fields that were requested by the transformers.
+            block_structure._collect_requested_xblock_fields()
+            return
+
+        changed_block_keys = block_structure._get_changed_block_keys(previous_block_structure)
+        changed_structure = block_structure._create_substructure(changed_block_keys)
+        logger.info(
+            u'BlockStructure: Incrementally collecting %d of %d blocks; %s.',
+            len(changed_block_keys),
+            len(block_structure),
+            block_structure.root_block_usage_key,
+        )
+
+        for transformer in registered_transformers:
+            block_structure._add_transformer(transformer)
+            if transformer.COLLECTS_SUBTREE_LOCAL_DATA:
+                transformer.collect(changed_structure)
+                cls._merge_transformer_block_data(
+                    transformer, block_structure, changed_structure, previous_block_structure, changed_block_keys,
+                )
+            else:
+                transformer.collect(block_structure)
 
-        # Collect all fields that were requested by the transformers.
-        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        # Collect all fields that were requested by the transformers,
+        # reusing previously collected values for unchanged blocks.
+        block_structure.request_xblock_fields(*changed_structure._requested_xblock_fields)
+        block_structure._collect_requested_xblock_fields(previous_block_structure, changed_block_keys)
+
+    @classmethod
+    def _is_compatible(cls, previous_block_structure, registered_transformers):
+        """
+        Returns whether data collected in the given block structure can
+        be reused, which requires it to have been collected by the
+        current version of every registered transformer.
+        """
+        if previous_block_structure is None:
+            return False
+        return all(
+            previous_block_structure._get_transformer_data_version(transformer) == transformer.WRITE_VERSION  # pylint: disable=protected-access
+            for transformer in registered_transformers
+        )
+
+    @classmethod
+    def _merge_transformer_block_data(
+            cls, transformer, block_structure, changed_structure, previous_block_structure, changed_block_keys,
+    ):
+        """
+        Sets the given transformer's block data in block_structure from
+        changed_structure for the changed blocks, and from
+        previous_block_structure for all other blocks.
+        """
+        # pylint: disable=protected-access
+        for block_key in block_structure.get_block_keys():
+            source = changed_structure if block_key in changed_block_keys else previous_block_structure
+            try:
+                transformer_block_data = source.get_transformer_block_data(block_key, transformer)
+            except KeyError:
+                continue
+            block_structure._get_or_create_block(block_key).transformer_data[transformer] = transformer_block_data
 
     @classmethod
     def verify_versions(cls, block_structure):
@@ -7,9 +7,17 @@ import six
 
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
+from edx_django_utils.cache import RequestCache
 from opaque_keys import InvalidKeyError
 
 from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.django import contentstore
+
+# Courses with more assets than this aren't indexed, their index may not fit in the cache.
+COURSE_ASSET_INDEX_MAX_ASSETS = 5000
+# The index is invalidated when assets are changed through Studio, and expires in case they're changed otherwise.
+COURSE_ASSET_INDEX_TIMEOUT = 60 * 60
+COURSE_ASSET_INDEX_CACHE_NAMESPACE = 'contentserver.course_asset_index'
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -52,3 +60,55 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    del_course_asset_index(location.course_key)
+
+
+def _course_asset_index_cache_key(course_key):
+    """
+    Return the cache key of the asset index of the given course.
+    """
+    return u'course_asset_index.{}'.format(six.text_type(course_key.for_branch(None))).encode("utf-8")
+
+
+def get_course_asset_index(course_key):
+    """
+    Return a dict from the name of each asset of the given course to its
+    (locked, content_digest), as expected by StaticContent.get_canonicalized_asset_path,
+    or None if the course has too many assets to be indexed.
+
+    The index is built with a single contentstore query, and kept in the cache
+    until the assets of the course change, and for the rest of the request.
+    """
+    cache_key = _course_asset_index_cache_key(course_key)
+    request_cache = RequestCache(COURSE_ASSET_INDEX_CACHE_NAMESPACE)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    # An empty tuple marks a course with too many assets, as None can't be told from a cache miss.
+    asset_index = CONTENT_CACHE.get(cache_key, version=STATIC_CONTENT_VERSION)
+    if asset_index is None:
+        assets, count = contentstore().get_all_content_for_course(
+            course_key, maxresults=COURSE_ASSET_INDEX_MAX_ASSETS
+        )
+        if count > COURSE_ASSET_INDEX_MAX_ASSETS:
+            asset_index = ()
+        else:
+            asset_index = {
+                asset['asset_key'].block_id: (asset.get('locked', False), asset.get('md5'))
+                for asset in assets
+            }
+        CONTENT_CACHE.set(cache_key, asset_index, COURSE_ASSET_INDEX_TIMEOUT, version=STATIC_CONTENT_VERSION)
+
+    asset_index = asset_index if asset_index != () else None
+    request_cache.set(cache_key, asset_index)
+    return asset_index
+
+
+def del_course_asset_index(course_key):
+    """
+    Delete the asset index of the given course, after its assets were added, changed or deleted.
+    """
+    cache_key = _course_asset_index_cache_key(course_key)
+    CONTENT_CACHE.delete(cache_key, version=STATIC_CONTENT_VERSION)
+    RequestCache(COURSE_ASSET_INDEX_CACHE_NAMESPACE).delete(cache_key)
@@ -0,0 +1,327 @@
+"""
+A node-local, size-bounded disk cache for large course assets.
+
+Assets too large for the ``course_assets`` django cache are otherwise read
+from GridFS on every request.  With ``COURSE_ASSETS_DISK_CACHE['DIRECTORY']``
+set, the contentserver serves the first request for such an asset from GridFS
+as before, and copies the asset into that directory in the background.  Later
+requests are served from the copy: full responses are sent with a
+:class:`~django.http.FileResponse` (which the WSGI server can send with
+``sendfile``), and byte ranges are sliced from a memory map of the file.
+
+Files are named after the asset location and its ``content_digest``, so a
+changed asset is never served from a stale copy.  The directory can be shared
+by all the processes of a node: a lock file lets only one of them copy each
+asset, files are written to a temporary name and renamed into place, and the
+least recently served files are removed when the directory grows past
+``MAX_BYTES``.  Each process keeps a running total of the size of the
+directory, and only lists it to evict files.
+"""
+
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, STREAM_DATA_CHUNK_SIZE, StaticContentStream
+
+log = logging.getLogger(__name__)
+
+# Files in the directory which aren't cached assets have names starting with a dot.
+_TEMP_PREFIX = '.tmp-'
+_LOCK_PREFIX = '.lock-'
+
+# Number of threads of each process copying assets into the cache.
+FILL_THREADS = 2
+
+# Seconds after which the lock file of a copy is assumed to be left by a
+# process which died, and is removed.
+FILL_LOCK_TIMEOUT = 15 * 60
+
+_DISK_CACHE = None
+_DISK_CACHE_LOCK = threading.Lock()
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    A :class:`~StaticContentStream` whose data is read from a file in the disk cache.
+    """
+    def __init__(self, content, path, disk_cache):
+        super(DiskCachedContent, self).__init__(  # lint-amnesty, pylint: disable=super-with-arguments
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self.path = path
+        self._disk_cache = disk_cache
+
+    def open(self):
+        """
+        Return the cached file, opened for reading.
+        """
+        self._disk_cache.record_served(self.length)
+        return open(self.path, 'rb')
+
+    def stream_data(self):
+        with self.open() as cached_file:
+            while True:
+                chunk = cached_file.read(STREAM_DATA_CHUNK_SIZE)
+                if len(chunk) == 0:
+                    break
+                yield chunk
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included), from a
+        memory map of the cached file.
+        """
+        self._disk_cache.record_served(last_byte - first_byte + 1)
+        with open(self.path, 'rb') as cached_file:
+            with mmap.mmap(cached_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for position in range(first_byte, last_byte + 1, STREAM_DATA_CHUNK_SIZE):
+                    yield data[position:min(position + STREAM_DATA_CHUNK_SIZE, last_byte + 1)]
+
+    def close(self):
+        pass
+
+    def copy_to_in_mem(self):
+        with open(self.path, 'rb') as cached_file:
+            self._stream = cached_file
+            try:
+                return super(DiskCachedContent, self).copy_to_in_mem()  # pylint: disable=super-with-arguments
+            finally:
+                self._stream = None
+
+
+class DiskAssetCache(object):
+    """
+    Keeps copies of the assets of at least `min_size` bytes in `directory`,
+    using at most `max_bytes` bytes.
+    """
+    def __init__(self, directory, max_bytes, min_size):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_size = min_size
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'bytes_served': 0, 'bytes_written': 0, 'evictions': 0}
+        self._executor = None
+        # Paths of the assets this process is about to copy.
+        self._pending = set()
+        os.makedirs(directory, exist_ok=True)
+        # The size of the directory when it was last listed, plus the files
+        # this process has written since.
+        self._total_bytes = sum(size for _, size, _ in self._list_files())
+
+    def path(self, content):
+        """
+        Return the path of the cached copy of `content`.
+        """
+        key = u'{}:{}:{}'.format(STATIC_CONTENT_VERSION, content.location, content.content_digest)
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def is_cacheable(self, content):
+        """
+        Return whether `content` should be kept in this cache.
+        """
+        return (
+            content.content_digest is not None and
+            content.length is not None and
+            self.min_size <= content.length <= self.max_bytes
+        )
+
+    def get(self, content):
+        """
+        Return a :class:`~DiskCachedContent` for the cached copy of `content`, a
+        :class:`~StaticContentStream` found in the contentstore, or None if
+        it isn't cached.
+        """
+        path = self.path(content)
+        try:
+            # The modification time of a cached file is the last time it was served.
+            os.utime(path, None)
+        except OSError:
+            self._increment('misses')
+            return None
+        self._increment('hits')
+        return DiskCachedContent(content, path, self)
+
+    def fill_in_background(self, content, load_content):
+        """
+        Copy the asset `content` into the cache from another thread, unless it
+        is being copied already.  `load_content` is called in that thread to
+        read the asset again, as `content` is being served.
+
+        Returns a :class:`~concurrent.futures.Future` of the copy, or None.
+        """
+        path = self.path(content)
+        with self._lock:
+            if path in self._pending:
+                return None
+            self._pending.add(path)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=FILL_THREADS)
+        return self._executor.submit(self._fill_pending, path, content, load_content)
+
+    def fill(self, content, load_content):
+        """
+        Copy the asset `content`, read with `load_content`, into the cache,
+        unless it is cached already or another process is copying it.
+
+        Returns whether the asset was copied.
+        """
+        path = self.path(content)
+        if os.path.exists(path):
+            return False
+        lock_path = os.path.join(self.directory, _LOCK_PREFIX + os.path.basename(path))
+        if not self._acquire_fill_lock(lock_path):
+            return False
+        try:
+            self.put(load_content())
+        finally:
+            os.remove(lock_path)
+        return True
+
+    def put(self, content):
+        """
+        Copy `content`, a :class:`~StaticContentStream`, into the cache and
+        return a :class:`~DiskCachedContent` reading the copy.
+        """
+        path = self.path(content)
+        temp_file = tempfile.NamedTemporaryFile(dir=self.directory, prefix=_TEMP_PREFIX, delete=False)
+        try:
+            with temp_file:
+                for chunk in content.stream_data():
+                    temp_file.write(chunk)
+            if os.path.getsize(temp_file.name) != content.length:
+                raise IOError(u'Read {} bytes of {} from the contentstore, expected {}'.format(
+                    os.path.getsize(temp_file.name), content.location, content.length,
+                ))
+            os.chmod(temp_file.name, 0o644)
+            os.rename(temp_file.name, path)
+        except Exception:
+            os.remove(temp_file.name)
+            raise
+        finally:
+            content.close()
+
+        self._increment('bytes_written', content.length)
+        with self._lock:
+            self._total_bytes += content.length
+            full = self._total_bytes > self.max_bytes
+        if full:
+            self.evict()
+        return DiskCachedContent(content, path, self)
+
+    def evict(self):
+        """
+        Remove the least recently served files until the cache uses at most
+        `max_bytes` bytes.
+        """
+        entries = self._list_files()
+        total_bytes = sum(size for _, size, _ in entries)
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_bytes -= size
+            self._increment('evictions')
+
+        with self._lock:
+            self._total_bytes = total_bytes
+
+    def record_served(self, num_bytes):
+        """
+        Count `num_bytes` bytes served from this cache.
+        """
+        self._increment('bytes_served', num_bytes)
+
+    def stats(self):
+        """
+        Return the counters of this cache in this process.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _increment(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+
+    def _list_files(self):
+        """
+        Return a list of the (last served time, size, path) of the cached files.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('.'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _fill_pending(self, path, content, load_content):
+        """
+        Copy `content` to `path`, as submitted by fill_in_background.
+        """
+        try:
+            return self.fill(content, load_content)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u"Could not copy %s to the asset disk cache", content.location)
+            return False
+        finally:
+            with self._lock:
+                self._pending.discard(path)
+
+    def _acquire_fill_lock(self, lock_path):
+        """
+        Create the lock file `lock_path`, replacing it if it is stale, and
+        return whether it was created.
+        """
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+                return True
+            except FileExistsError:
+                pass
+            try:
+                if os.path.getmtime(lock_path) > time.time() - FILL_LOCK_TIMEOUT:
+                    return False
+                os.remove(lock_path)
+            except OSError:
+                pass
+        return False
+
+
+def get_disk_asset_cache():
+    """
+    Return the disk cache configured by ``settings.COURSE_ASSETS_DISK_CACHE``,
+    or None if it isn't enabled.
+    """
+    global _DISK_CACHE  # pylint: disable=global-statement
+    config = getattr(settings, 'COURSE_ASSETS_DISK_CACHE', None) or {}
+    if not config.get('DIRECTORY'):
+        return None
+
+    with _DISK_CACHE_LOCK:
+        if _DISK_CACHE is None or _DISK_CACHE.directory != config['DIRECTORY']:
+            _DISK_CACHE = DiskAssetCache(
+                config['DIRECTORY'],
+                config.get('MAX_BYTES', 10 * 1024 * 1024 * 1024),
+                config.get('MIN_SIZE', 1024 * 1024),
+            )
+        return _DISK_CACHE
@@ -0,0 +1,122 @@
+"""
+Command to measure the bytes transferred and latency of the contentserver for
+the range requests that PDF.js makes when it opens a document.
+"""
+
+
+import time
+
+from django.contrib.auth.models import AnonymousUser, User  # lint-amnesty, pylint: disable=imported-auth-user
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import AssetKey
+
+from openedx.core.djangoapps.contentserver.middleware import StaticContentServer
+from xmodule.assetstore.assetmgr import AssetManager
+from xmodule.exceptions import NotFoundError
+from xmodule.modulestore.exceptions import ItemNotFoundError
+
+# PDF.js loads documents in aligned chunks of this many bytes.
+PDFJS_CHUNK_SIZE = 65536
+
+
+def _chunk(length, fraction):
+    """
+    Returns the (first, last) byte of the chunk holding the byte found at
+    `fraction` of a document of `length` bytes.
+    """
+    first = min(int(length * fraction), length - 1) // PDFJS_CHUNK_SIZE * PDFJS_CHUNK_SIZE
+    return first, min(first + PDFJS_CHUNK_SIZE, length) - 1
+
+
+# The chunks requested by each request made to open a document (its trailer,
+# then its header), show its first page, and jump to pages further in, as
+# functions of the document's length.
+PDFJS_ACCESS_PATTERNS = (
+    ('open', lambda length: [
+        [_chunk(length, 1.0)],
+        [_chunk(length, 0)],
+    ]),
+    ('first_page', lambda length: [
+        [_chunk(length, 0), _chunk(length, 0.3), _chunk(length, 0.95)],
+    ]),
+    ('seek', lambda length: [
+        [_chunk(length, 0.4), _chunk(length, 0.45), _chunk(length, 0.6), _chunk(length, 0.9)],
+        [_chunk(length, 0.7), _chunk(length, 0.75)],
+    ]),
+)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms benchmark_asset_ranges 'asset-v1:edX+DemoX+Demo_Course+type@asset+block@handouts.pdf'
+    """
+    help = u'Measures bytes transferred and latency of the range requests PDF.js makes for course assets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'assets',
+            nargs='+',
+            help=u'Keys of the assets to request, e.g. PDF handouts and textbooks.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times each access pattern is requested.',
+            default=20,
+            type=int,
+        )
+        parser.add_argument(
+            '--username',
+            help=u'User making the requests, needed for locked assets. Requests are anonymous by default.',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.get(username=options['username']) if options['username'] else AnonymousUser()
+        request_factory = RequestFactory()
+        content_server = StaticContentServer()
+
+        for asset in options['assets']:
+            try:
+                asset_key = AssetKey.from_string(asset)
+                length = AssetManager.find(asset_key, as_stream=True).length
+            except InvalidKeyError:
+                raise CommandError(u'Invalid asset key: {}'.format(asset))  # pylint: disable=raise-missing-from
+            except (ItemNotFoundError, NotFoundError):
+                raise CommandError(u'Asset not found: {}'.format(asset))  # pylint: disable=raise-missing-from
+            self.stdout.write(u'{}: {:,d} B'.format(asset_key, length))
+
+            for pattern_name, pattern in PDFJS_ACCESS_PATTERNS:
+                requests = pattern(length)
+                transferred = 0
+                seconds = 0.0
+                for _ in range(options['iterations']):
+                    for chunks in requests:
+                        range_header = u'bytes=' + u', '.join(u'{}-{}'.format(first, last) for first, last in chunks)
+                        request = request_factory.get(u'/' + str(asset_key), HTTP_RANGE=range_header)
+                        request.user = user
+                        start = time.monotonic()
+                        response = content_server.process_request(request)
+                        transferred += sum(len(chunk) for chunk in response)
+                        seconds += time.monotonic() - start
+                        if response.status_code != 206:
+                            raise CommandError(u'{} responded {} to Range: {}'.format(
+                                asset_key, response.status_code, range_header
+                            ))
+
+                # Before multipart/byteranges responses, requests for several ranges got the full content.
+                full_content_transferred = sum(
+                    length if len(set(chunks)) > 1 else chunks[0][1] - chunks[0][0] + 1
+                    for chunks in requests
+                )
+                self.stdout.write(
+                    u'  {:<12} requests: {:>3}  transferred: {:>13,d} B  full content fallback: {:>13,d} B  '
+                    u'latency: {:>8.2f} ms'.format(
+                        pattern_name,
+                        len(requests),
+                        transferred // options['iterations'],
+                        full_content_transferred,
+                        seconds / (options['iterations'] * len(requests)) * 1000,
+                    )
+                )
@@ -5,9 +5,12 @@ Middleware to serve assets.
 
 import datetime
 import logging
+import uuid
+from functools import partial
 
 import six
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
@@ -29,6 +32,7 @@ from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from .caching import get_cached_content, set_cached_content
+from .disk_cache import DiskCachedContent, get_disk_asset_cache
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 log = logging.getLogger(__name__)
@@ -43,6 +47,9 @@ except ImportError:
 
 HTTP_DATE_FORMAT = u"%a, %d %b %Y %H:%M:%S GMT"
 
+# The most ranges sent back for a single request, once overlapping and adjacent ranges are merged.
+MAX_BYTE_RANGES = 50
+
 
 class StaticContentServer(MiddlewareMixin):
     """
@@ -129,15 +136,13 @@ class StaticContentServer(MiddlewareMixin):
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]...]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
-            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
+            # Several ranges are sent back as a multipart/byteranges message, with a Content-Range in each part.
+            # https://tools.ietf.org/html/rfc7233
             response = None
+            content_type = content.content_type
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -148,40 +153,52 @@ class StaticContentServer(MiddlewareMixin):
                         text_type(exception), header_value, six.text_type(loc)
                     )
                 else:
+                    # Ranges that can't be satisfied are ignored, unless none of them can be.
+                    ranges = coalesce_ranges(
+                        (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                    )
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif not ranges:
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, text_type(loc)
+                            u"Cannot satisfy ranges in Range header: %s for content: %s",
+                            header_value, text_type(loc)
+                        )
+                        return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Many small ranges cost more to send than the content, so send back the full content.
+                        log.warning(
+                            u"More than %d ranges in Range header: %s for content: %s",
+                            MAX_BYTE_RANGES, header_value, text_type(loc)
                         )
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
                             response = HttpResponse(content.stream_data_in_range(first, last))
                             response['Content-Range'] = u'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s",
-                                header_value, text_type(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            boundary = uuid.uuid4().hex
+                            body, length = multipart_byteranges(content, ranges, boundary)
+                            response = HttpResponse(body)
+                            response['Content-Length'] = str(length)
+                            content_type = u'multipart/byteranges; boundary={}'.format(boundary)
+                        response.status_code = 206  # Partial Content
+
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+                            newrelic.agent.add_custom_parameter('contentserver.range_count', len(ranges))
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # Lets the WSGI server send the file with sendfile, when it supports it.
+                    response = FileResponse(content.open())
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -190,7 +207,7 @@ class StaticContentServer(MiddlewareMixin):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            response['Content-Type'] = content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -301,9 +318,30 @@ class StaticContentServer(MiddlewareMixin):
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                content = self.load_asset_from_disk_cache(location, content)
 
         return content
 
+    def load_asset_from_disk_cache(self, location, content):
+        """
+        Returns the copy of the asset `content` kept in the node's disk cache, or
+        `content` if it isn't cached.  An asset which isn't cached yet is copied
+        there in the background, while this request is served from `content`.
+        """
+        disk_cache = get_disk_asset_cache()
+        if disk_cache is None or not disk_cache.is_cacheable(content):
+            return content
+
+        cached_content = disk_cache.get(content)
+        if newrelic:
+            newrelic.agent.add_custom_parameter('contentserver.disk_cache_hit', cached_content is not None)
+
+        if cached_content is None:
+            disk_cache.fill_in_background(content, partial(AssetManager.find, location, as_stream=True))
+            return content
+        return cached_content
+
 
 def parse_range_header(header_value, content_length):
     """
@@ -346,3 +384,49 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def coalesce_ranges(ranges):
+    """
+    Returns the (start, end) tuples of `ranges` sorted by start, with overlapping
+    and adjacent ranges merged.
+    """
+    coalesced = []
+    for first, last in sorted(ranges):
+        if coalesced and first <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(last, coalesced[-1][1]))
+        else:
+            coalesced.append((first, last))
+    return coalesced
+
+
+def multipart_byteranges(content, ranges, boundary):
+    """
+    Returns an iterator over the multipart/byteranges body sending the `ranges`
+    of `content`, separated by `boundary`, and the length of that body.
+
+    See spec for details: https://tools.ietf.org/html/rfc7233#appendix-A
+    """
+    headers = [
+        (
+            u'--{boundary}\r\n'
+            u'Content-Type: {content_type}\r\n'
+            u'Content-Range: bytes {first}-{last}/{length}\r\n'
+            u'\r\n'
+        ).format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        ).encode('utf-8')
+        for first, last in ranges
+    ]
+    closing = u'--{}--\r\n'.format(boundary).encode('utf-8')
+
+    def body():
+        for header, (first, last) in zip(headers, ranges):
+            yield header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield b'\r\n'
+        yield closing
+
+    length = sum(len(header) + (last - first + 1) + 2 for header, (first, last) in zip(headers, ranges)) + len(closing)
+    return body(), length
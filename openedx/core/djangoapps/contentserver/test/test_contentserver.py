@@ -30,7 +30,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..middleware import coalesce_ranges, parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -244,18 +244,73 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message
+        with each range.
         """
-        first_byte = self.length_unlocked / 4
-        last_byte = self.length_unlocked / 2
-        # lint-amnesty, pylint: disable=bad-option-value, unicode-format-string
-        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
+        first_byte = self.length_unlocked // 4
+        last_byte = self.length_unlocked // 2
+        full_resp = self.client.get(self.url_unlocked)
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=-10, {first}-{last}'.format(
             first=first_byte, last=last_byte))
 
+        assert resp.status_code == 206
+        assert 'Content-Range' not in resp
+        content_type, boundary = resp['Content-Type'].split('; boundary=')
+        assert content_type == 'multipart/byteranges'
+        assert resp['Content-Length'] == str(len(resp.content))
+
+        parts = resp.content.split(u'--{}'.format(boundary).encode('utf-8'))
+        assert parts[0] == b''
+        assert parts[-1] == b'--\r\n'
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 10, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, data = part.split(b'\r\n\r\n', 1)
+            assert headers.split(b'\r\n')[1:] == [
+                u'Content-Type: {}'.format(full_resp['Content-Type']).encode('utf-8'),
+                u'Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked).encode('utf-8'),
+            ]
+            assert data == full_resp.content[first:last + 1] + b'\r\n'
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping and adjacent ranges are sent back as a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=20-29, 0-9, 5-19')
+
+        assert resp.status_code == 206
+        assert resp['Content-Range'] == u'bytes 0-29/{}'.format(self.length_unlocked)
+        assert resp['Content-Length'] == '30'
+
+    def test_range_request_unsatisfiable_ranges_ignored(self):
+        """
+        Test that the ranges that can't be satisfied are ignored when others can.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={length}-, 0-9'.format(
+            length=self.length_unlocked))
+
+        assert resp.status_code == 206
+        assert resp['Content-Range'] == u'bytes 0-9/{}'.format(self.length_unlocked)
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_BYTE_RANGES', 2)
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that too many ranges in request outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-1, 3-4, 6-7')
+
         assert resp.status_code == 200
         assert 'Content-Range' not in resp
         assert resp['Content-Length'] == str(self.length_unlocked)
 
+    def test_range_request_served_from_memory(self):
+        """
+        Test that range requests for assets copied in memory don't read them from the contentstore again.
+        """
+        with patch.object(AssetManager, 'find', wraps=AssetManager.find) as mock_find:
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, 20-29')
+        assert resp.status_code == 206
+        assert mock_find.call_count == 1
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
@@ -450,3 +505,21 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegex(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+@ddt.ddt
+class CoalesceRangesTestCase(unittest.TestCase):
+    """
+    Tests for the coalesce_ranges function.
+    """
+
+    @ddt.data(
+        ([(100, 199)], [(100, 199)]),
+        ([(200, 299), (100, 199)], [(100, 299)]),
+        ([(100, 199), (150, 159)], [(100, 199)]),
+        ([(100, 199), (150, 249), (300, 399)], [(100, 249), (300, 399)]),
+        ([(300, 399), (100, 199)], [(100, 199), (300, 399)]),
+    )
+    @ddt.unpack
+    def test_coalesce_ranges(self, ranges, expected_ranges):
+        assert coalesce_ranges(ranges) == expected_ranges
@@ -0,0 +1,152 @@
+"""
+Tests for the contentserver's disk cache
+"""
+
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.test.utils import override_settings
+from mock import Mock, patch
+from opaque_keys.edx.locator import CourseLocator
+
+from xmodule.contentstore.content import StaticContentStream
+
+from ..disk_cache import DiskAssetCache, DiskCachedContent, get_disk_asset_cache
+
+COURSE_KEY = CourseLocator('edX', 'toy', '2012_Fall')
+
+
+def make_content(name, data, content_digest='digest'):
+    """
+    Returns a StaticContentStream for an asset named `name` containing `data`.
+    """
+    return StaticContentStream(
+        COURSE_KEY.make_asset_key('asset', name), name, 'application/pdf', io.BytesIO(data),
+        length=len(data), content_digest=content_digest,
+    )
+
+
+class DiskAssetCacheTestCase(unittest.TestCase):
+    """
+    Tests for DiskAssetCache.
+    """
+
+    def setUp(self):
+        super(DiskAssetCacheTestCase, self).setUp()  # lint-amnesty, pylint: disable=super-with-arguments
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = DiskAssetCache(self.directory, max_bytes=2500, min_size=100)
+
+    def test_put_and_get(self):
+        data = os.urandom(1000)
+        assert self.cache.get(make_content('handout.pdf', data)) is None
+
+        cached_content = self.cache.put(make_content('handout.pdf', data))
+        assert isinstance(cached_content, DiskCachedContent)
+        assert b''.join(cached_content.stream_data()) == data
+
+        cached_content = self.cache.get(make_content('handout.pdf', data))
+        assert cached_content.length == 1000
+        assert cached_content.content_digest == 'digest'
+        with cached_content.open() as cached_file:
+            assert cached_file.read() == data
+        assert cached_content.copy_to_in_mem().data == data
+
+        stats = self.cache.stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+        assert stats['bytes_written'] == 1000
+        assert stats['bytes_served'] == 2000
+
+    def test_changed_asset_not_served(self):
+        self.cache.put(make_content('handout.pdf', b'a' * 1000, content_digest='one'))
+        assert self.cache.get(make_content('handout.pdf', b'b' * 1000, content_digest='two')) is None
+
+    def test_stream_data_in_range(self):
+        data = bytes(bytearray(range(256))) * 4
+        cached_content = self.cache.put(make_content('handout.pdf', data))
+        assert b''.join(cached_content.stream_data_in_range(0, 0)) == data[0:1]
+        assert b''.join(cached_content.stream_data_in_range(10, 1023)) == data[10:]
+        assert b''.join(cached_content.stream_data_in_range(100, 500)) == data[100:501]
+
+    def test_is_cacheable(self):
+        assert self.cache.is_cacheable(make_content('handout.pdf', b'a' * 1000))
+        assert not self.cache.is_cacheable(make_content('small.pdf', b'a' * 10))
+        assert not self.cache.is_cacheable(make_content('large.pdf', b'a' * 3000))
+        assert not self.cache.is_cacheable(make_content('handout.pdf', b'a' * 1000, content_digest=None))
+
+    def test_least_recently_served_evicted(self):
+        first_path = self.cache.put(make_content('first.pdf', b'a' * 1000)).path
+        second_path = self.cache.put(make_content('second.pdf', b'b' * 1000)).path
+        os.utime(first_path, (1, 1))
+        os.utime(second_path, (2, 2))
+        self.cache.get(make_content('first.pdf', b'a' * 1000))
+
+        self.cache.put(make_content('third.pdf', b'c' * 1000))
+        assert os.path.exists(first_path)
+        assert not os.path.exists(second_path)
+        assert self.cache.stats()['evictions'] == 1
+
+    def test_size_tracked_without_listing(self):
+        with patch('openedx.core.djangoapps.contentserver.disk_cache.os.scandir', wraps=os.scandir) as mock_scandir:
+            self.cache.put(make_content('first.pdf', b'a' * 1000))
+            self.cache.put(make_content('second.pdf', b'b' * 1000))
+            assert not mock_scandir.called
+            self.cache.put(make_content('third.pdf', b'c' * 1000))
+            assert mock_scandir.call_count == 1
+        assert self.cache.stats()['evictions'] == 1
+
+    def test_fill(self):
+        data = b'a' * 1000
+        load_content = Mock(side_effect=lambda: make_content('handout.pdf', data))
+        assert self.cache.fill(make_content('handout.pdf', data), load_content)
+        assert not self.cache.fill(make_content('handout.pdf', data), load_content)
+        assert load_content.call_count == 1
+        assert b''.join(self.cache.get(make_content('handout.pdf', data)).stream_data()) == data
+        assert os.listdir(self.directory) == [os.path.basename(self.cache.path(make_content('handout.pdf', data)))]
+
+    def test_fill_locked_by_other_process(self):
+        content = make_content('handout.pdf', b'a' * 1000)
+        load_content = Mock(side_effect=lambda: make_content('handout.pdf', b'a' * 1000))
+        lock_path = os.path.join(self.directory, '.lock-' + os.path.basename(self.cache.path(content)))
+        open(lock_path, 'w').close()
+        assert not self.cache.fill(content, load_content)
+        assert not load_content.called
+
+        # A lock left by a process which died is replaced.
+        os.utime(lock_path, (1, 1))
+        assert self.cache.fill(content, load_content)
+        assert not os.path.exists(lock_path)
+
+    def test_fill_in_background(self):
+        data = b'a' * 1000
+        content = make_content('handout.pdf', data)
+        assert self.cache.fill_in_background(content, lambda: make_content('handout.pdf', data)).result()
+        assert self.cache.get(content) is not None
+
+        # Failed copies are logged, and leave nothing behind.
+        other_content = make_content('other.pdf', data)
+        short_content = make_content('other.pdf', data)
+        short_content.length = 2000
+        with patch('openedx.core.djangoapps.contentserver.disk_cache.log') as mock_log:
+            assert not self.cache.fill_in_background(other_content, lambda: short_content).result()
+        assert mock_log.exception.called
+        assert len(os.listdir(self.directory)) == 1
+
+    def test_short_read_not_cached(self):
+        content = make_content('handout.pdf', b'a' * 1000)
+        content.length = 2000
+        with self.assertRaises(IOError):
+            self.cache.put(content)
+        assert os.listdir(self.directory) == []
+
+    def test_get_disk_asset_cache(self):
+        assert get_disk_asset_cache() is None
+        with override_settings(COURSE_ASSETS_DISK_CACHE={'DIRECTORY': self.directory}):
+            disk_cache = get_disk_asset_cache()
+            assert disk_cache.directory == self.directory
+            assert disk_cache.min_size == 1024 * 1024
+            assert get_disk_asset_cache() is disk_cache
@@ -60,13 +60,30 @@ class ContentTypeGatingService(object):
         Else:
             Return None
         """
+        return self.check_items_for_content_type_gating_paywall([item], course_id)[0]
+
+    def check_items_for_content_type_gating_paywall(self, items, course_id):
+        """
+        Arguments:
+            items (list of xblocks such as sequence or vertical blocks)
+            course_id (CourseLocator)
+
+        Returns a list with the result of check_children_for_content_type_gating_paywall
+        for each of the items, looking up the user and their enrollment only once.
+        """
         user = self._get_user()
         if not user:
-            return None
+            return [None] * len(items)
 
         if not self._enabled_for_enrollment(user=user, course_key=course_id):
-            return None
+            return [None] * len(items)
+
+        return [self._content_type_gating_paywall_for_item(user, item, course_id) for item in items]
 
+    def _content_type_gating_paywall_for_item(self, user, item, course_id):
+        """
+        Returns the content of the first content type gate (if any) of the children of the given item
+        """
         # Check children for content type gated content
         for block in traverse_pre_order(item, get_children, leaf_filter):
             gate_fragment = self._content_type_gate_for_block(user, block, course_id)
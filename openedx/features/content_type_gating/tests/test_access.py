@@ -1188,3 +1188,37 @@ class TestContentTypeGatingService(ModuleStoreTestCase):
 
         # The method returns None for blocks that should not be gated
         assert 'content-paywall' in ContentTypeGatingService().check_children_for_content_type_gating_paywall(blocks_dict['vertical'], course['course'].id)
+
+    @patch.object(ContentTypeGatingService, '_get_user', return_value=UserFactory.build())
+    def test_check_items_for_content_type_gating_paywall(self, mocked_user):  # pylint: disable=unused-argument
+        ''' Verify that the method returns the content type gate of each item, if any '''
+        course = self._create_course()
+        blocks_dict = course['blocks']
+        CourseEnrollmentFactory.create(
+            user=self.user,
+            course_id=course['course'].id,
+            mode='audit'
+        )
+        blocks_dict['ungated_vertical'] = ItemFactory.create(
+            parent=blocks_dict['sequential'],
+            category='vertical',
+        )
+        ItemFactory.create(
+            parent=blocks_dict['ungated_vertical'],
+            category='problem',
+            graded=False,
+            metadata=METADATA,
+        )
+        blocks_dict['graded_1'] = ItemFactory.create(
+            parent=blocks_dict['vertical'],
+            category='problem',
+            graded=True,
+            metadata=METADATA,
+        )
+
+        gates = ContentTypeGatingService().check_items_for_content_type_gating_paywall(
+            [blocks_dict['vertical'], blocks_dict['ungated_vertical']], course['course'].id
+        )
+        assert len(gates) == 2
+        assert 'content-paywall' in gates[0]
+        assert gates[1] is None